@@ -28,7 +28,8 @@ __docformat__ = 'epytext en'
 ###############################################################################
 
 
-import sys
+from svgdata import Dataset
+from svgerrors import InputError
 
 
 ###############################################################################
@@ -38,23 +39,24 @@ import sys
 
 def readinputfile(path):
     """
-        Returns a list of column data input file.
+        Returns a list of column data input file. The list is a
+        C{svgdata.Dataset} that keeps the statistics of each column.
         @param path: It is the path to the input data file
         @type path: C{string}
         @return: list of column data input file.
         @rtype: C{list}
+        @raise InputError: If the file can not be read or its lines do not
+        have the same number of values.
     """
 
     cad = []
     finalcad = []
+    cad1 = []
     try:
         datafile = open(path, "r")
     except IOError:
-        print("Inputfile= " + str(path) + "\nNo such file or directory")
-        print("For help use --help or -h")
-        print("pysvg 0.0.4-Nov2011\nCopyright (C) 2011 Isabel Rodriguez")
-        print("You can see the full documentation at URL: \"http://www.pysvg/orgfree.com\"")
-        sys.exit(2)
+        raise InputError("Inputfile= " + str(path) +
+                         "\nNo such file or directory")
     fileline = datafile.readline()
     while fileline != "":
         cad1 = fileline.split()
@@ -68,10 +70,9 @@ def readinputfile(path):
                 auxcad.append(cad[poscad][poscad1])
             finalcad.append(auxcad)
     except IndexError:
-        print("The number of values of the parameters x, x2, y or y2 must" + \
-        "be equal," + " please review the input data \nFor help use --help")
-        sys.exit(2)
-    return finalcad
+        raise InputError("The number of values of the parameters x, x2, y "
+                         "or y2 must be equal, please review the input data")
+    return Dataset(finalcad)
 
 
 def writesvgfile(path, outstring):
@@ -87,7 +88,3 @@ def writesvgfile(path, outstring):
     datafile = open(path, "w")
     datafile.write(outstring)
     datafile.close()
-    print("Done: outputFile=" + str(path))
-    print("pysvg 0.0.4-Nov2011\nCopyright (C) 2011 Isabel Rodriguez")
-    print("You can see the full documentation at URL:" + \
-    "\"http://www.pysvg/orgfree.com\"")
@@ -57,6 +57,64 @@
             - C{E{-}-filtered:} Graphic shows the effects of filtering
        I{B{5. Helping}}
             - C{E{-}h,--help:} prints this help. 
+       I{B{6. Writing numbers}}
+            - C{E{-}-precision=<value>:} number of decimals of the coordinates
+                                         written in the SVG document. By
+                                         default all the digits are written.
+       I{B{7. Scaling the axes}}
+            - C{E{-}-width=<value>:} length in pixels of the X axis. Only for
+                                     scat and lines chart. By default an
+                                     axis has a pixel for each unit of the
+                                     data, up to 4096 pixels.
+            - C{E{-}-height=<value>:} length in pixels of the Y axis. Not for
+                                      pie chart.
+            - C{E{-}-xscale=linear | log | time:} scale of the X axis. Only
+                                           for scat and lines chart. The log
+                                           scale has 100 pixels for each
+                                           power of ten by default, it is
+                                           numbered with the powers of ten
+                                           and its values must be positive.
+                                           The time scale reads epoch
+                                           seconds or ISO-8601 timestamps
+                                           (2011-11-17T09:30:15, in UTC
+                                           unless a zone is given), it has
+                                           600 pixels by default and it is
+                                           numbered with round minutes,
+                                           hours, days, months or years.
+            - C{E{-}-yscale=linear | log:} scale of the Y axis. Not for pie
+                                           chart. With a log scale the
+                                           option C{E{-}-corr} can not be
+                                           used.
+       I{B{8. Drawing several charts}}
+            - C{E{-}-batch=<manifest>:} draw all the charts of the manifest,
+                                        a file with a JSON object in each
+                                        line: C{{"input": "data.txt",
+                                        "prefab": "scat", "output":
+                                        "a.svg", "options": {"corr":
+                                        true}}}. The options are named as
+                                        in the command line, without
+                                        dashes. The input files shared by
+                                        several charts are read once, and
+                                        the result of each chart is
+                                        written at the end. The other
+                                        options are ignored.
+            - C{E{-}-jobs=<value>:} with C{E{-}-batch}, number of
+                                    processes that draw the charts, the
+                                    largest input files first. The result
+                                    of each chart is written when it is
+                                    finished. 1 by default.
+       I{B{9. Cache of the charts}}
+            - C{E{-}-cache=<directory>:} keep the SVG documents in the
+                                         directory, by the digest of the
+                                         input file and the options, so a
+                                         chart drawn again is copied from
+                                         the cache without reading its
+                                         input file. Also with
+                                         C{E{-}-batch}.
+            - C{E{-}-cachesize=<value>:} maximum size of the cache in
+                                         megabytes; the charts used the
+                                         longest time ago are removed when
+                                         it is full. 100 by default.
 
    
    Chart Parameters:
@@ -74,7 +132,9 @@
       - C{E{-}-yrange=<value>:} Specify an explicit axis numeric range usually 
                                 the minimum and must be numeric.
       - C{E{-}-yinc=<value>:} Specify a numeric axis increment amount. Value
-                              must be numeric.
+                              must be numeric. If it is not positive or it
+                              gives more than 50 numbers, the axis is
+                              numbered with about 10 round numbers.
       - C{E{-}-ygrid=<value>:} If "yes" specified, grid lines will be drawn.
                               
    C{B{[I{PIECHART}]}} Parameters:
@@ -105,6 +165,29 @@
       - C{E{-}-pt2color=<value>:} Controls the color of the second data set
                                   point symbol.
       - C{E{-}-corr:} Compute and display correlation and regression curve.
+      - C{E{-}-corrband:} With C{E{-}-corr}, display the 95% confidence band
+                          of the regression line.
+      - C{E{-}-series=<x:y,...>:} Draw a data set for each pair of data
+                                  fields X:Y, in place of the fields of
+                                  C{E{-}-x}, C{E{-}-y} and C{E{-}-x2}. The
+                                  first two sets take the symbols, the
+                                  colors and the names of the options above.
+      - C{E{-}-colors=<value,...>:} Colors of the data sets of
+                                    C{E{-}-series}, in order.
+      - C{E{-}-names=<value,...>:} Legend labels of the data sets of
+                                   C{E{-}-series}, in order.
+      - C{E{-}-density=hex[:<value>]:} Draw the density of the points in
+                                       place of the points: hexagons of the
+                                       given radius in pixels (10 by
+                                       default) filled with the color of
+                                       their number of points.
+      - C{E{-}-density=grid[:<value>]:} As C{E{-}-density=hex} with squares
+                                        of the given side.
+      - C{E{-}-density=raster[:<value>]:} As C{E{-}-density=grid} with an
+                                          embedded PNG image of pixels of
+                                          the given side (1 by default).
+      - C{E{-}-cull:} Do not write the points hidden by a later point of the
+                      same data set at the same pixel.
     
    C{B{[I{LINES}]}} Parameters:
       - C{E{-}-x2=<value>:} Identifies the data field that will hold X2
@@ -127,6 +210,23 @@
                               line to be filled with the given color.
       - C{E{-}-fill2=<value>:} If specified, the area under the plotted second 
                                line to be filled with the given color.      
+      - C{E{-}-downsample=lttb:<value>:} Reduce each line to the given number
+                                         of points that keep its shape
+                                         (Largest Triangle Three Buckets).
+      - C{E{-}-downsample=minmax[:<value>]:} Keep the first, the minimum, the
+                                             maximum and the last point of
+                                             each column of the given number
+                                             of pixels (1 by default).
+      - C{E{-}-simplify=<value>:} Remove the points of the nearly straight
+                                  stretches of the lines closer than the
+                                  given number of pixels (Douglas-Peucker).
+      - C{E{-}-series=<x:y,...>:} Draw a line for each pair of data fields
+                                  X:Y, as in the C{SCAT} parameters. The
+                                  first two lines are filled with the colors
+                                  of C{E{-}-fill} and C{E{-}-fill2}.
+      - C{E{-}-colors=<value,...>:} Colors of the lines of C{E{-}-series}.
+      - C{E{-}-names=<value,...>:} Legend labels of the lines of
+                                   C{E{-}-series}.
     
    Examples:
    =========        
@@ -150,9 +250,24 @@ __license__ = 'GPL Open Source License'
 
 import sys
 import getopt
-import svgelements
 import filetext
 import os
+import svgrender
+from svgbatch import getjobs, iterbatch
+from svgcache import getcache
+from svgerrors import InputError, OptionError
+from svgrender import getseries
+
+
+###############################################################################
+# Constants
+###############################################################################
+
+OUTPUTS = {"bardiagram": "vbars2D.svg", "pie": "piechart.svg",
+           "bardiagram3d": "vbars3D.svg", "scat": "scatterplot.svg",
+           "lines": "lineplot.svg"}
+"""Names of the output files of the charts, written in the directory of the
+input file."""
 
 
 ###############################################################################
@@ -171,154 +286,101 @@ def getprocessargs(args, prefab, xcolumn, ycolumn, xcolumn2, ycolumn2,
                    barwidth, xorigin, yorigin, delim, vals, yinc, yrange,
                    ygrid, radius, values, labels, colorfld, title,
                    legend, animate, filtered, ptsize, ptsym, pt2sym, ptcolor,
-                   pt2color, corr, xlabel, ylabel, name, name2, color, color2):
+                   pt2color, corr, xlabel, ylabel, name, name2, color, color2,
+                   precision=None, corrband=False, downsample=None,
+                   simplify=0, series=None, names="", colors="",
+                   density=None, cull=False, width=None, height=None,
+                   xscale=None, yscale=None, cache=None):
     """
-    Helper responsible for returning the entire document SVG code. 
+    Helper responsible for writing the entire document SVG code. 
     Its main functions are:
     
         1. Read the input data by calling the function "readinputfile" 
            module filetext
-        2. Add the header and the end of svg document
-        \t>>>     cab=svgelements.SVGElements()
-            ...     begin,end=cab.printSVG()
-        3. Include diagram svg code selected by the user through the command 
-           line using the option "-- prefab" and stored in the variable of type
-           string c{"chartSVG"}
-           
-         \t>>> if prefab == "bardiagram":
-           ...    BarDiagram=svgelements.Bardiagram(....)
-           ... elif prefab == "pie":
-           ...    pieChart=svgelements.PieChart(....)                  
-           ... elif prefab == "bardiagram3d":
-           ...    BarDiagram3d=svgelements.Bardiagram3d(....)
-           ... elif prefab == "scat":
-           ...    scatterplot=svgelements.Scatterplot(....)
-           ... elif prefab == "lines":
-           ...    lineplot=svgelements.Lineplot(....)
-           
-           If the user enters a wrong option, program execution will stop 
-           reporting on this situation the user with a message to standard
-           output through.
-           
-         \t>>> else:
-           ...    try:
-           ...        raise ValueError
-           ...        except ValueError as e:
-           ...        print("The name of the chart must be: \"bardiagram\", 
-           ...        \"bardiabram3d\", \"pie\", \"scat\", or \"lines\", for 
-           ...        help use --help"
-           ...        sys.exit(2)
-           
-        4. Write the svg code stored in the variable "charSVG" in the output 
-           file by default set for each graph.
+        2. Draw the chart selected by the user through the command line
+           using the option "--prefab" with the function C{svgrender.render},
+           that returns the whole document with the header and the end of
+           the svg document. With the option C{--cache} the document is
+           taken from the cache of C{svgcache} if it is there, and then the
+           input file is not read.
+
+         \t>>> svgdoc = svgrender.render(prefab, lval, x=xcolumn, ...)
+
+        3. Write the document in the output file by default set for each
+           graph, in the directory of the input file.
            
-         \t>>> filetext.writeSVGFile(path,begin+chartSVG+end)
-    
-    @raise ValueError: If the user enters a wrong option.
-    @return: Entire document SVG code       
+         \t>>> filetext.writesvgfile(path, svgdoc)
+
+    The errors are not written here: they are raised to the function
+    C{main}, that writes them and exits.
     
+    @raise OptionError: If the user enters a wrong option.
+    @raise InputError: If the input data can not be read or drawn.
+    @return: path of the output file
+    @rtype: C{string}
     """
     # read input files
-    inputargs = ""
-    for inputargs in args:
-        lval = filetext.readinputfile(inputargs)
-    svgdoc = svgelements.Svgelements()
-    begin, end = svgdoc.printsvg()
-    try:
-        (dirname, filename) = os.path.split(inputargs)
-        # raise UnboundLocalError
-    except UnboundLocalError as error:
-        print("Incorrect options")
-        print("Usage: pysvg [options] inputFile\nFor help use [-h | --help]\n" % error)
-        print("pysvg 0.0.2-Oct2011\nCopyright (C) 2011 Isabel Rodriguez")
-        print("You can see the full documentation at URL:\"http://www.pysvg/orgfree.com\"")
-        sys.exit(2)
-    if prefab == "bardiagram":
-        try:
-            path = os.path.join(str(dirname), 'vbars2D.svg')
-            if path == filename:
-                raise UnboundLocalError
-            bardiagram = svgelements.Bardiagram(lval=lval, xorigin=xorigin,
-                                                yorigin=yorigin, xcolumn=xcolumn, ycolumn=ycolumn,
-                                                ycolumn2=ycolumn2, barwidth=barwidth, delim=delim,
-                                                vals=vals, yinc=yinc, yrange=yrange, ygrid=ygrid,
-                                                fillcolor=color, fillcolor2=color2, name=name,
-                                                name2=name2, title=title, legend=legend)
-            chartsvg = bardiagram.printsvg()
-        except UnboundLocalError:
-            print_usage()
-            sys.exit(2)
-    elif prefab == "pie":
-        try:
-            path = os.path.join(str(dirname), 'piechart.svg')
-            if path == filename:
-                raise UnboundLocalError
-            piechart = svgelements.Piechart(xorigin=xorigin, yorigin=yorigin,
-                                            radius=radius, listvalues=lval, values=values,
-                                            labels=labels, colorfld=colorfld, legend=legend,
-                                            animate=animate, filtered=filtered, title=title)
-            chartsvg = piechart.printsvg()
-        except UnboundLocalError:
-            print_usage()
-            sys.exit(2)
-    elif prefab == "bardiagram3d":
-        try:
-            path = os.path.join(str(dirname), 'vbars3D.svg')
-            if path == filename:
-                raise UnboundLocalError
-            bardiagram3d = svgelements.Bardiagram3d(lval=lval, xcolumn=xcolumn,
-                                                    ycolumn=ycolumn, barwidth=barwidth,
-                                                    xorigin=xorigin, yorigin=yorigin, delim=delim,
-                                                    vals=vals, yinc=yinc, yrange=yrange,
-                                                    ygrid=ygrid, filtered=filtered, fillcolor=color,
-                                                    title=title, legend=legend, name=name)
-            chartsvg = bardiagram3d.printsvg()
-        except UnboundLocalError:
-            print_usage()
-            sys.exit(2)
-    elif prefab == "scat":
-        try:
-            path = os.path.join(str(dirname), 'scatterplot.svg')
-            if path == filename:
-                raise UnboundLocalError
-            scatterplot = svgelements.Scatterplot(lval=lval, xorigin=xorigin,
-                                                  yorigin=yorigin, xcolumn=xcolumn, ycolumn=ycolumn,
-                                                  xcolumn2=xcolumn2, ycolumn2=ycolumn2, yinc=yinc,
-                                                  ptsize=ptsize, ptsym=ptsym, pt2sym=pt2sym,
-                                                  ptcolor=ptcolor, pt2color=pt2color, corr=corr,
-                                                  xlabel=xlabel, ylabel=ylabel, name=name,
-                                                  name2=name2, legend=legend, title=title)
-            chartsvg = scatterplot.printsvg()
-        except UnboundLocalError:
-            print_usage()
-            sys.exit(2)
-    elif prefab == "lines":
-        try:
-            path = os.path.join(str(dirname), 'lineplot.svg')
-            if path == filename:
-                raise UnboundLocalError
-            lineplot = svgelements.Lineplot(lval=lval, xorigin=xorigin,
-                                            yorigin=yorigin, xcolumn=xcolumn, ycolumn=ycolumn,
-                                            xcolumn2=xcolumn2, ycolumn2=ycolumn2, yinc=yinc,
-                                            ptsize=ptsize, ptsym=ptsym, pt2sym=pt2sym,
-                                            ptcolor=ptcolor, pt2color=pt2color, xlabel=xlabel,
-                                            ylabel=ylabel, name=name, name2=name2,
-                                            legend=legend, title=title, fillcolor=color,
-                                            fillcolor2=color2)
-            chartsvg = lineplot.printsvg()
-        except UnboundLocalError:
-            print_usage()
-            sys.exit(2)
+    if not args:
+        raise OptionError("Incorrect options")
+    if cache is None:
+        draw = svgrender.render
+        for inputargs in args:
+            lval = filetext.readinputfile(inputargs)
     else:
-        try:
-            raise ValueError
-        except ValueError as error:
-            print("PREFABNAME= [bardiagram | bardiabram3d | pie | scat |lines]")
-            print("Usage: pysvg --prefab=PREFABNAME [--option=argument] inputFile \n%sFor help use [-h | --help]" % error)
-            print("pysvg 0.0.4-Nov2011\nCopyright (C) 2011 Isabel Rodriguez")
-            print("You can see the full documentation at URL:\"http://www.pysvg/orgfree.com\"")
-            sys.exit(2)
-    filetext.writesvgfile(path, begin + chartsvg + end)
+        draw = cache.render
+        lval = inputargs = args[-1]
+    (dirname, filename) = os.path.split(inputargs)
+    if prefab not in OUTPUTS:
+        raise OptionError("PREFABNAME= [bardiagram | bardiabram3d | pie | "
+                          "scat |lines]")
+    path = os.path.join(str(dirname), OUTPUTS[prefab])
+    if path == filename:
+        raise OptionError("The input file can not be the output file")
+    svgdoc = draw(prefab, lval, x=xcolumn, y=ycolumn, x2=xcolumn2,
+                  y2=ycolumn2, barwidth=barwidth, xorigin=xorigin,
+                  yorigin=yorigin, delim=delim, vals=vals, yinc=yinc,
+                  yrange=yrange, ygrid=ygrid, radius=radius, values=values,
+                  labels=labels, colorfld=colorfld, title=title,
+                  legend=legend, animate=animate, filtered=filtered,
+                  ptsize=ptsize, ptsym=ptsym, pt2sym=pt2sym,
+                  ptcolor=ptcolor, pt2color=pt2color, corr=corr, xlbl=xlabel,
+                  ylbl=ylabel, name=name, name2=name2, color=color,
+                  color2=color2, precision=precision, corrband=corrband,
+                  downsample=downsample, simplify=simplify, series=series,
+                  names=names, colors=colors, density=density, cull=cull,
+                  width=width, height=height, xscale=xscale, yscale=yscale)
+    filetext.writesvgfile(path, svgdoc)
+    return path
+
+
+def printbatch(path, jobs=1, cache=None):
+    """
+    Draws the charts of the manifest of the option C{--batch} with the
+    function C{svgbatch.iterbatch} and writes the result of each chart as
+    soon as it is finished: the output file, or the error that stopped it.
+
+    @param path: is the path of the manifest
+    @type path: C{string}
+    @param jobs: is the number of processes of the option C{--jobs}
+    @type jobs: C{number}
+    @param cache: is the cache of the option C{--cache}, or None
+    @type cache: C{svgcache.Rendercache}
+    @raise InputError: If the manifest can not be read.
+    @return: the number of charts that were not drawn
+    @rtype: C{number}
+    """
+    done, errors = 0, 0
+    for number, output, error in iterbatch(path, jobs, cache):
+        if error is None:
+            done += 1
+            print("Line " + str(number) + ": Done: outputFile=" + output)
+        else:
+            errors += 1
+            print("Line " + str(number) + ": Error: " +
+                  " ".join(error.split("\n")))
+        sys.stdout.flush()
+    print(str(done) + " charts done, " + str(errors) + " errors")
+    return errors
 
 
 # {Interface
@@ -338,11 +400,16 @@ def main():
                                                           "yinc=",
                                                           "ygrid=", "barwidth=", "values=", "labels=", "color=",
                                                           "color2=",
-                                                          "colorfld=", "legend", "animate", "filtered", "corr",
+                                                          "colorfld=", "legend", "animate", "filtered", "corr", "corrband",
                                                           "ptsize=",
                                                           "ptsym=", "pt2sym=", "ptcolor=", "pt2color=", "xlbl=",
                                                           "ylbl=",
-                                                          "fill=", "fill2=", "name=", "name2=", "title="])
+                                                          "fill=", "fill2=", "name=", "name2=", "title=",
+                                                          "precision=", "downsample=", "simplify=",
+                                                          "series=", "names=", "colors=", "density=",
+                                                          "cull", "width=", "height=", "xscale=",
+                                                          "yscale=", "batch=", "jobs=",
+                                                          "cache=", "cachesize="])
     except getopt.GetoptError as error:
         print("Usage: pysvg [--option=argument] inputFile \n%sFor help use [-h | --help]" % error)
         print("pysvg 0.0.2-Oct2011\nCopyright (C) 2011 Isabel Rodriguez")
@@ -353,17 +420,25 @@ def main():
     delim, xcolumn, ycolumn, xcolumn2, ycolumn2 = 25, 1, 2, 3, 3
     vals, yorigin, xorigin = False, 100, 100
     # VBAR AND VBAR3D OPTIONS
-    yrange, yinc, ygrid = 0, 10, False
+    yrange, yinc, ygrid = 0, 10, "no"
     barwidth, color, color2 = 25, "none", "none"
     # PIECHART OPTIONS
     colorfld, values, labels, radius = 3, 2, 1, 100
     legend, name, name2, title = False, "Enter_text", "Enter_text", ""
     animate, filtered = False, False
     # SCATTERPLOT AND LINEPLOT OPTIONS
-    corr = False
+    corr, corrband = False, False
     ptsize, ptsym, pt2sym = 4, "circle", "square"
     ptcolor, pt2color = "red", "blue"
     xlbl, ylbl = "", ""
+    downsample, simplify = None, 0
+    series, names, colors = None, "", ""
+    density, cull = None, False
+    width, height = None, None
+    xscale, yscale = None, None
+    precision = None
+    batch, jobs = None, 1
+    cache, cachesize = None, 100
     for option, arg in options:
         if option in ("-h", "--help"):
             print(__doc__)
@@ -408,6 +483,8 @@ def main():
             filtered = True
         if option == "--corr":
             corr = True
+        if option == "--corrband":
+            corrband = True
         if option == "--ptsize":
             ptsize = arg
         if option == "--ptsym":
@@ -428,18 +505,91 @@ def main():
             name2 = arg
         if option == "--title":
             title = arg
+        if option == "--precision":
+            precision = arg
+        if option == "--downsample":
+            downsample = arg
+        if option == "--simplify":
+            simplify = arg
+        if option == "--series":
+            series = arg
+        if option == "--names":
+            names = arg
+        if option == "--colors":
+            colors = arg
+        if option == "--density":
+            density = arg
+        if option == "--cull":
+            cull = True
+        if option == "--width":
+            width = arg
+        if option == "--height":
+            height = arg
+        if option == "--xscale":
+            xscale = arg
+        if option == "--yscale":
+            yscale = arg
+        if option == "--batch":
+            batch = arg
+        if option == "--jobs":
+            jobs = arg
+        if option == "--cache":
+            cache = arg
+        if option == "--cachesize":
+            cachesize = arg
 
-    getprocessargs(args=args, prefab=prefab, xcolumn=xcolumn,
-                   ycolumn=ycolumn, xcolumn2=xcolumn2, ycolumn2=ycolumn2,
-                   barwidth=barwidth, xorigin=xorigin, yorigin=yorigin,
-                   delim=delim, vals=vals, yinc=yinc, yrange=yrange,
-                   ygrid=ygrid, radius=radius, values=values,
-                   labels=labels, colorfld=colorfld, title=title,
-                   legend=legend, animate=animate, filtered=filtered,
-                   ptsize=ptsize, ptsym=ptsym, pt2sym=pt2sym,
-                   ptcolor=ptcolor, pt2color=pt2color, corr=corr,
-                   xlabel=xlbl, ylabel=ylbl, name=name,
-                   name2=name2, color=color, color2=color2)
+    if batch is not None:
+        try:
+            errors = printbatch(batch, getjobs(jobs),
+                                getcache(cache, cachesize))
+        except OptionError as error:
+            print(error)
+            print_usage()
+            sys.exit(2)
+        except InputError as error:
+            print(error)
+            print("For help use --help or -h")
+            errors = 1
+        print("pysvg 0.0.4-Nov2011\nCopyright (C) 2011 Isabel Rodriguez")
+        print("You can see the full documentation at URL:" + \
+        "\"http://www.pysvg/orgfree.com\"")
+        if errors:
+            sys.exit(2)
+        return
+    try:
+        path = getprocessargs(args=args, prefab=prefab, xcolumn=xcolumn,
+                              ycolumn=ycolumn, xcolumn2=xcolumn2,
+                              ycolumn2=ycolumn2, barwidth=barwidth,
+                              xorigin=xorigin, yorigin=yorigin, delim=delim,
+                              vals=vals, yinc=yinc, yrange=yrange,
+                              ygrid=ygrid, radius=radius, values=values,
+                              labels=labels, colorfld=colorfld, title=title,
+                              legend=legend, animate=animate,
+                              filtered=filtered, ptsize=ptsize, ptsym=ptsym,
+                              pt2sym=pt2sym, ptcolor=ptcolor,
+                              pt2color=pt2color, corr=corr, xlabel=xlbl,
+                              ylabel=ylbl, name=name, name2=name2,
+                              color=color, color2=color2,
+                              precision=precision, corrband=corrband,
+                              downsample=downsample, simplify=simplify,
+                              series=series, names=names, colors=colors,
+                              density=density, cull=cull, width=width,
+                              height=height, xscale=xscale, yscale=yscale,
+                              cache=getcache(cache, cachesize))
+    except InputError as error:
+        print(error)
+        print("For help use --help or -h")
+        print("pysvg 0.0.4-Nov2011\nCopyright (C) 2011 Isabel Rodriguez")
+        print("You can see the full documentation at URL: \"http://www.pysvg/orgfree.com\"")
+        sys.exit(2)
+    except OptionError as error:
+        print(error)
+        print_usage()
+        sys.exit(2)
+    print("Done: outputFile=" + str(path))
+    print("pysvg 0.0.4-Nov2011\nCopyright (C) 2011 Isabel Rodriguez")
+    print("You can see the full documentation at URL:" + \
+    "\"http://www.pysvg/orgfree.com\"")
 
 
 if __name__ == '__main__':
@@ -0,0 +1,413 @@
+# pySVG is vector graphics program for python that converts data
+# entered by a .txt file in an SVG graphic.
+#
+# Copyright (C) 2011 Isabel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+This module contains the batch mode of pySVG (option C{--batch}): the
+charts of a manifest are drawn one after another in the same interpreter
+with C{svgrender.render}, so the modules are imported once for all of
+them.
+
+The manifest is a text file with a chart in each line, written as a JSON
+object with the input data file, the name of the chart, the output file
+and the options of the chart, named as in C{svgrender.render}::
+
+    {"input": "data.txt", "prefab": "scat", "output": "a.svg",
+     "options": {"corr": true, "xlbl": "Time"}}
+
+The relative paths are taken from the directory of the manifest. The input
+files used by several charts are read once and kept until their last chart
+is drawn, so the charts share the statistics of their columns. The error
+of a chart does not stop the batch: it is kept in the result of the chart.
+
+With the option C{--jobs} each chart is drawn as a task of a pool of
+processes, the charts of the most expensive input files first, and the
+result of each chart is written as soon as it is finished. The charts are
+not grouped by input file: a process reads the input file of each chart it
+draws, unless its previous chart had the same one. If a process of the
+pool dies (killed by the system or crashed), the charts that were not
+finished are drawn again, each one in a process of its own, so only the
+chart that kills its process again is given as an error and the batch
+does not hang. With the option
+C{--cache} the charts already drawn are taken from the cache of
+C{svgcache}, and their input files are not read.
+"""
+__docformat__ = 'epytext en'
+
+
+###############################################################################
+## Imports
+###############################################################################
+
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from filetext import readinputfile, writesvgfile
+from svgerrors import InputError, OptionError
+from svgrender import render
+
+
+###############################################################################
+## Constants
+###############################################################################
+
+
+KEYS = ("input", "prefab", "output")
+"""Keys that every chart of a manifest must have."""
+COSTS = {"scat": 1, "lines": 3, "bardiagram": 10, "bardiagram3d": 20,
+         "pie": 50}
+"""Weight of each chart in the estimated cost of drawing it, measured with
+the same input file."""
+workerdatasets = {}
+"""Input file read by the last chart drawn by a process of the pool of
+C{iterbatch}, by path. It is used again only if the next chart of the
+process has the same input file."""
+
+
+###############################################################################
+## Functions
+###############################################################################
+
+
+def getspec(line, directory=""):
+    """
+    Returns the chart of a line of a manifest: a dictionary with the paths
+    of the input and output files, taken from C{directory} if they are
+    relative, the name of the chart and its options.
+
+    \>>> getspec('{"input": "d.txt", "prefab": "pie", "output": "p.svg"}')
+    ... {'input': 'd.txt', 'prefab': 'pie', 'output': 'p.svg', 'options': {}}
+
+    @param line: is the line of the manifest
+    @type line: C{string}
+    @param directory: is the directory of the manifest
+    @type directory: C{string}
+    @rtype: C{dictionary}
+    @raise OptionError: If the line is not a JSON object with the keys
+    C{KEYS} and, optionally, the object C{options}.
+    """
+    try:
+        spec = json.loads(line)
+    except ValueError as error:
+        raise OptionError("Invalid JSON: " + str(error))
+    if not isinstance(spec, dict):
+        raise OptionError("The chart must be a JSON object")
+    for key in spec:
+        if key not in KEYS and key != "options":
+            raise OptionError("Unknown key: " + str(key))
+    for key in KEYS:
+        if not isinstance(spec.get(key), str):
+            raise OptionError("The chart needs the key " + key)
+    options = spec.get("options", {})
+    if not isinstance(options, dict):
+        raise OptionError("The options must be a JSON object")
+    return {"input": os.path.join(directory, spec["input"]),
+            "prefab": spec["prefab"],
+            "output": os.path.join(directory, spec["output"]),
+            "options": options}
+
+
+def readmanifest(path):
+    """
+    Returns the charts of a manifest, one for each line that is not blank:
+    the number of the line and the chart given by C{getspec}, or the error
+    of the line in place of the chart.
+
+    @param path: is the path of the manifest
+    @type path: C{string}
+    @rtype: C{list of (number, dictionary or OptionError)}
+    @raise InputError: If the manifest can not be read.
+    """
+    try:
+        datafile = open(path, "r")
+    except IOError:
+        raise InputError("Manifest= " + str(path) +
+                         "\nNo such file or directory")
+    directory = os.path.dirname(path)
+    specs = []
+    for number, line in enumerate(datafile):
+        if line.strip() != "":
+            try:
+                specs.append((number + 1, getspec(line, directory)))
+            except OptionError as error:
+                specs.append((number + 1, error))
+    datafile.close()
+    return specs
+
+
+def getcost(spec):
+    """
+    Returns the estimated cost of drawing a chart: the size in bytes of its
+    input file times the weight of the chart in C{COSTS}. The input files
+    that can not be read cost nothing.
+
+    @param spec: is the chart, given by C{getspec}
+    @type spec: C{dictionary}
+    @rtype: C{number}
+    """
+    try:
+        size = os.path.getsize(spec["input"])
+    except OSError:
+        size = 0
+    return size * COSTS.get(spec["prefab"], 1)
+
+
+def drawspec(spec, datasets, cache=None):
+    """
+    Draws a chart and writes its output file. The input file is taken from
+    C{datasets}, or read and kept in it; an input file that can not be read
+    is kept as its error, so all its charts give the same error. If the
+    chart is in the cache, it is written without reading the input file.
+
+    Any error of the chart is returned and not raised, so a chart can not
+    stop the batch.
+
+    @param spec: is the chart, given by C{getspec}
+    @type spec: C{dictionary}
+    @param datasets: are the input files already read, by path
+    @type datasets: C{dictionary}
+    @param cache: is the cache of the charts, or None
+    @type cache: C{svgcache.Rendercache}
+    @return: the message of the error of the chart, or None if it was
+    written
+    @rtype: C{string}
+    """
+    try:
+        key = None
+        if cache is not None:
+            key = cache.getkey(spec["prefab"], spec["input"],
+                               spec["options"])
+            svgdoc = cache.get(key)
+            if svgdoc is not None:
+                writesvgfile(spec["output"], svgdoc)
+                return None
+        lval = datasets.get(spec["input"])
+        if lval is None:
+            try:
+                lval = readinputfile(spec["input"])
+            except InputError as exception:
+                lval = exception
+            datasets[spec["input"]] = lval
+        if isinstance(lval, InputError):
+            raise lval
+        svgdoc = render(spec["prefab"], lval, **spec["options"])
+        if key is not None:
+            cache.put(key, svgdoc)
+        writesvgfile(spec["output"], svgdoc)
+    except Exception as exception:
+        # the errors of the code of a chart are isolated too
+        return str(exception) or exception.__class__.__name__
+    return None
+
+
+def drawtask(spec, cache=None):
+    """
+    Draws a chart in a process of the pool of C{iterbatch}. The process
+    keeps the input file of its last chart in C{workerdatasets}, so it is
+    not read again if the next chart drawn by the same process has the same
+    input file; the charts of an input file submitted one after another are
+    usually taken by different processes, which read it each one.
+
+    @param spec: is the chart, given by C{getspec}
+    @type spec: C{dictionary}
+    @param cache: is the cache of the charts, or None
+    @type cache: C{svgcache.Rendercache}
+    @return: the message of the error of the chart, or None if it was
+    written
+    @rtype: C{string}
+    """
+    if spec["input"] not in workerdatasets:
+        workerdatasets.clear()
+    return drawspec(spec, workerdatasets, cache)
+
+
+def getgroups(tasks, jobs):
+    """
+    Returns the charts of a batch divided in groups for a pool of C{jobs}
+    processes, the most expensive group first. The charts of a group have
+    the same input file and each group costs at most the total cost divided
+    by C{jobs} unless it has only one chart, so the expensive input files
+    are started first and the charts of a large one are spread over all the
+    processes.
+
+    @param tasks: are the number of the line and the chart of each chart
+    @type tasks: C{list of (number, dictionary)}
+    @param jobs: is the number of processes
+    @type jobs: C{number}
+    @rtype: C{list of list of (number, dictionary)}
+    """
+    inputs = {}
+    for task in tasks:
+        inputs.setdefault(task[1]["input"], []).append(task)
+    costs = dict([(task[0], getcost(task[1])) for task in tasks])
+    limit = sum(costs.values()) / float(jobs)
+    groups = []
+    for path in sorted(inputs):
+        group, cost = [], 0
+        for task in inputs[path]:
+            if group and cost + costs[task[0]] > limit:
+                groups.append((cost, group))
+                group, cost = [], 0
+            group.append(task)
+            cost += costs[task[0]]
+        groups.append((cost, group))
+    groups.sort(key=lambda group: -group[0])
+    return [group for cost, group in groups]
+
+
+def iterbatch(path, jobs=1, cache=None):
+    """
+    Draws the charts of a manifest and returns the result of each one as
+    soon as it is written. The lines that are not valid charts are returned
+    first.
+
+    With one job the charts are drawn in the order of the manifest. Each
+    input file is read once, the first time a chart needs it, and it is
+    released after its last chart. With more jobs each chart is a task of a
+    pool of C{jobs} processes (C{drawtask}), submitted in the order of the
+    groups of C{getgroups}, the most expensive ones first (C{getcost}), and
+    the result of each chart is returned as soon as it is finished. If a
+    process of the pool dies, the pool can not draw more charts: the charts
+    that were not finished are drawn again by C{retrytasks}, and only a
+    chart that kills its own process is returned with an error.
+
+    @param path: is the path of the manifest
+    @type path: C{string}
+    @param jobs: is the number of processes
+    @type jobs: C{number}
+    @param cache: is the cache of the charts, or None
+    @type cache: C{svgcache.Rendercache}
+    @return: iterator of the number of the line, the output file and the
+    message of the error of each chart, None if it was written
+    @rtype: C{iterator of (number, string, string)}
+    @raise InputError: If the manifest can not be read.
+    @raise OptionError: If the number of processes is not positive.
+    """
+    jobs = getjobs(jobs)
+    tasks = []
+    for number, spec in readmanifest(path):
+        if isinstance(spec, dict):
+            tasks.append((number, spec))
+        else:
+            yield number, None, str(spec)
+    if jobs > 1 and len(tasks) > 1:
+        executor = ProcessPoolExecutor(min(jobs, len(tasks)))
+        futures, broken = {}, set()
+        try:
+            for group in getgroups(tasks, jobs):
+                for task in group:
+                    futures[executor.submit(drawtask, task[1], cache)] = task
+            for future in as_completed(futures):
+                if isinstance(future.exception(), BrokenProcessPool):
+                    broken.add(future)
+                else:
+                    number, spec = futures[future]
+                    yield number, spec["output"], future.result()
+        finally:
+            executor.shutdown(cancel_futures=True)
+        retry = [futures[future] for future in futures if future in broken]
+        for result in retrytasks(retry, jobs, cache):
+            yield result
+        return
+    last = {}
+    for position, (number, spec) in enumerate(tasks):
+        last[spec["input"]] = position
+    datasets = {}
+    for position, (number, spec) in enumerate(tasks):
+        error = drawspec(spec, datasets, cache)
+        if last[spec["input"]] == position:
+            datasets.pop(spec["input"], None)
+        yield number, spec["output"], error
+
+
+def retrytasks(tasks, jobs, cache=None):
+    """
+    Draws again the charts that were not finished when a process of the
+    pool of C{iterbatch} died. Each chart is drawn in a pool with a process
+    of its own, C{jobs} charts at a time, so a chart that kills its process
+    does not stop the others and is the only one returned with an error.
+
+    @param tasks: are the number of the line and the chart of each chart
+    @type tasks: C{list of (number, dictionary)}
+    @param jobs: is the number of processes
+    @type jobs: C{number}
+    @param cache: is the cache of the charts, or None
+    @type cache: C{svgcache.Rendercache}
+    @return: iterator of the number of the line, the output file and the
+    message of the error of each chart, None if it was written
+    @rtype: C{iterator of (number, string, string)}
+    """
+    for start in range(0, len(tasks), jobs):
+        futures, executors = {}, []
+        try:
+            for number, spec in tasks[start:start + jobs]:
+                executor = ProcessPoolExecutor(1)
+                executors.append(executor)
+                future = executor.submit(drawtask, spec, cache)
+                futures[future] = (number, spec["output"])
+            for future in as_completed(futures):
+                number, output = futures[future]
+                try:
+                    error = future.result()
+                except BrokenProcessPool as exception:
+                    error = "The process of the chart stopped: " + \
+                            str(exception)
+                yield number, output, error
+        finally:
+            for executor in executors:
+                executor.shutdown(cancel_futures=True)
+
+
+def runbatch(path, jobs=1, cache=None):
+    """
+    Draws the charts of a manifest and writes their output files, with the
+    function C{iterbatch}.
+
+    @param path: is the path of the manifest
+    @type path: C{string}
+    @param jobs: is the number of processes
+    @type jobs: C{number}
+    @param cache: is the cache of the charts, or None
+    @type cache: C{svgcache.Rendercache}
+    @return: the number of the line, the output file and the message of the
+    error of each chart, None if it was written, in the order they were
+    finished
+    @rtype: C{list of (number, string, string)}
+    @raise InputError: If the manifest can not be read.
+    @raise OptionError: If the number of processes is not positive.
+    """
+    return list(iterbatch(path, jobs, cache))
+
+
+def getjobs(text):
+    """
+    Returns the number of processes given by the option C{--jobs}.
+
+    @param text: is the number of processes
+    @type text: C{string or number}
+    @rtype: C{number}
+    @raise OptionError: If it is not a positive integer.
+    """
+    try:
+        jobs = int(text)
+    except (TypeError, ValueError):
+        jobs = 0
+    if jobs < 1:
+        raise OptionError("The number of jobs must be a positive integer")
+    return jobs
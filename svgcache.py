@@ -0,0 +1,349 @@
+# pySVG is vector graphics program for python that converts data
+# entered by a .txt file in an SVG graphic.
+#
+# Copyright (C) 2011 Isabel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+This module contains the cache of the SVG documents drawn by pySVG (option
+C{--cache}): a directory with a file for each document, named by the
+digest of everything that decides its content, so a chart requested again
+is written from the cache without reading its input data nor drawing it::
+
+    \>>> cache = Rendercache("/var/cache/pysvg")
+    ... svg = cache.render("scat", "data.txt", corr=True)
+
+The key of a document is the SHA-256 digest of:
+
+    - the version of pySVG (C{VERSION}), the source code of its modules and
+      the numeric backend, so the documents of other versions are never
+      used;
+    - the name of the chart;
+    - all the options of the chart with their default values and their
+      numbers converted (C{svgrender.getoptions}), so an option given with
+      its default value is the same as an option not given, and C{--x=1}
+      is the same as C{x=1} in the library;
+    - the bytes of the input file, or the values of the columns of the
+      input data if it is not a file.
+
+The cache holds C{maxsize} bytes at most. When it is full the documents
+used the longest time ago are removed: the modification time of a document
+is updated each time it is used.
+"""
+__docformat__ = 'epytext en'
+
+
+###############################################################################
+## Imports
+###############################################################################
+
+
+import glob
+import hashlib
+import json
+import os
+import svgnumeric
+from svgnumeric import isarray, numpy
+from svgerrors import InputError, OptionError
+from svgrender import getoptions, render
+
+
+###############################################################################
+## Constants
+###############################################################################
+
+
+VERSION = "pysvg 0.0.4"
+"""Version of the documents of the cache."""
+MAXSIZE = 100 * 2 ** 20
+"""Default maximum size in bytes of the cache."""
+KEEP = 0.9
+"""Part of the maximum size kept when the cache is full."""
+BLOCKSIZE = 2 ** 20
+"""Size of the blocks read to compute the digest of an input file."""
+SUFFIX = ".svg"
+"""Suffix of the files of the documents."""
+salt = None
+"""Digest of the version, the source code and the backend, computed by
+C{getsalt}."""
+
+
+###############################################################################
+## Classes
+###############################################################################
+
+
+class Rendercache:
+    """
+    Cache of SVG documents in a directory, with the documents used the
+    longest time ago removed when it exceeds its maximum size. The size of
+    the directory is read once and then updated with the documents stored
+    by this object; the documents stored by other processes are counted the
+    next time the cache is full.
+    """
+
+    def __init__(self, directory, maxsize=MAXSIZE):
+        """
+        @param directory: is the directory of the cache, created if it does
+        not exist
+        @type directory: C{string}
+        @param maxsize: is the maximum size in bytes of the cache
+        @type maxsize: C{number}
+        @raise OptionError: If the directory can not be created or the
+        maximum size is not positive.
+        """
+        if maxsize < 1:
+            raise OptionError("The size of the cache must be a positive "
+                              "number")
+        try:
+            if not os.path.isdir(directory):
+                os.makedirs(directory)
+        except EnvironmentError as error:
+            raise OptionError("Cache= " + str(directory) + "\n" + str(error))
+        self.directory = directory
+        """@ivar: is the directory of the cache
+        @type: C{string}"""
+        self.maxsize = maxsize
+        """@ivar: is the maximum size in bytes of the cache
+        @type: C{number}"""
+        self.size = sum([size for path, size, used in self.getentries()])
+        """@ivar: is the size in bytes of the documents of the cache
+        @type: C{number}"""
+        self.digests = {}
+        """@ivar: are the size, the modification time and the digest of
+        the input files already read, by path
+        @type: C{dictionary}"""
+
+    def getentries(self):
+        """
+        Returns the documents of the cache.
+
+        @return: the path, the size and the time of the last use of each
+        document
+        @rtype: C{list of (string, number, number)}
+        """
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(SUFFIX):
+                path = os.path.join(self.directory, name)
+                try:
+                    status = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((path, status.st_size, status.st_mtime))
+        return entries
+
+    def getdigest(self, data):
+        """
+        Returns the digest of the input data: the bytes of the file if it
+        is a path, computed once while the file does not change, or the
+        values of its columns: the type, the shape and the bytes of the
+        arrays of NumPy (also the columns of NumPy numbers of a dataset),
+        without converting their values, and the JSON text of the other
+        columns.
+
+        @param data: is the input data, as in C{svgrender.render}
+        @type data: C{string or list or svgdata.Dataset}
+        @rtype: C{string}
+        @raise InputError: If the input file can not be read.
+        """
+        if not isinstance(data, str):
+            digest = hashlib.sha256()
+            for column in data:
+                if numpy is not None and not isarray(column) and \
+                        len(column) and isinstance(column[0], numpy.generic):
+                    column = numpy.array(column)
+                if isarray(column) and not column.dtype.hasobject:
+                    digest.update(json.dumps([column.dtype.str,
+                                              column.shape]).encode("utf-8"))
+                    digest.update(column.tobytes())
+                else:
+                    digest.update(json.dumps(list(column),
+                                             default=repr).encode("utf-8"))
+                digest.update(b"\n")
+            return digest.hexdigest()
+        try:
+            status = os.stat(data)
+            stamp = (status.st_size, status.st_mtime)
+            if self.digests.get(data, (None,))[:2] != stamp:
+                digest = hashlib.sha256()
+                datafile = open(data, "rb")
+                block = datafile.read(BLOCKSIZE)
+                while block:
+                    digest.update(block)
+                    block = datafile.read(BLOCKSIZE)
+                datafile.close()
+                self.digests[data] = stamp + (digest.hexdigest(),)
+        except EnvironmentError:
+            raise InputError("Inputfile= " + str(data) +
+                             "\nNo such file or directory")
+        return self.digests[data][2]
+
+    def getkey(self, prefab, data, options):
+        """
+        Returns the key of the document of a chart: the digest of the salt
+        of C{getsalt}, the name of the chart, all its options given by
+        C{svgrender.getoptions} and the digest of the input data::
+
+            \>>> cache.getkey("scat", "data.txt", {"x": "1"}) == \\
+            ...     cache.getkey("scat", "data.txt", {})
+            ... True
+
+        @param prefab: is the name of the chart
+        @type prefab: C{string}
+        @param data: is the input data, as in C{svgrender.render}
+        @type data: C{string or list or svgdata.Dataset}
+        @param options: are the options of the chart
+        @type options: C{dictionary}
+        @rtype: C{string}
+        @raise OptionError: If an option is not valid.
+        @raise InputError: If the input file can not be read.
+        """
+        text = json.dumps([getsalt(), prefab,
+                           sorted(getoptions(options).items()),
+                           self.getdigest(data)])
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """
+        Returns the document of a key and marks it as used now, or None if
+        it is not in the cache.
+
+        @param key: is the key of the document, given by C{getkey}
+        @type key: C{string}
+        @rtype: C{string}
+        """
+        path = os.path.join(self.directory, key + SUFFIX)
+        try:
+            datafile = open(path, "r")
+            svgdoc = datafile.read()
+            datafile.close()
+            os.utime(path, None)
+        except EnvironmentError:
+            return None
+        return svgdoc
+
+    def put(self, key, svgdoc):
+        """
+        Stores the document of a key. The document is written in a
+        temporary file and renamed, so the other processes never read a
+        document half written. The errors are ignored: the document is
+        simply not stored.
+
+        @param key: is the key of the document, given by C{getkey}
+        @type key: C{string}
+        @param svgdoc: is the SVG document
+        @type svgdoc: C{string}
+        """
+        path = os.path.join(self.directory, key + SUFFIX)
+        temporary = path + "." + str(os.getpid()) + ".tmp"
+        try:
+            datafile = open(temporary, "w")
+            datafile.write(svgdoc)
+            datafile.close()
+            os.rename(temporary, path)
+            self.size += os.path.getsize(path)
+        except EnvironmentError:
+            return
+        if self.size > self.maxsize:
+            self.evict()
+
+    def evict(self):
+        """
+        Removes the documents used the longest time ago until the size of
+        the cache is C{KEEP} times its maximum size.
+        """
+        entries = self.getentries()
+        entries.sort(key=lambda entry: entry[2])
+        self.size = sum([size for path, size, used in entries])
+        for path, size, used in entries:
+            if self.size <= self.maxsize * KEEP:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            self.size -= size
+
+    def render(self, prefab, data, **options):
+        """
+        Returns the SVG document of a chart as C{svgrender.render}, taken
+        from the cache if it is there and stored in it otherwise.
+
+        @param prefab: is the name of the chart
+        @type prefab: C{string}
+        @param data: is the input data
+        @type data: C{string or list or svgdata.Dataset}
+        @param options: are the options of the chart
+        @type options: C{dictionary}
+        @rtype: C{string}
+        @raise OptionError: If the chart or an option is not valid.
+        @raise InputError: If the input data can not be read or drawn.
+        """
+        key = self.getkey(prefab, data, options)
+        svgdoc = self.get(key)
+        if svgdoc is None:
+            svgdoc = render(prefab, data, **options)
+            self.put(key, svgdoc)
+        return svgdoc
+
+###############################################################################
+
+
+###############################################################################
+## Functions
+###############################################################################
+
+
+def getsalt():
+    """
+    Returns the digest of C{VERSION}, the source code of the modules of
+    pySVG and the numeric backend, computed once.
+
+    @rtype: C{string}
+    """
+    global salt
+    backend = "python" if svgnumeric.backend is None else "numpy"
+    if salt is None or salt[0] != backend:
+        digest = hashlib.sha256((VERSION + backend).encode("utf-8"))
+        directory = os.path.dirname(os.path.abspath(__file__))
+        for path in sorted(glob.glob(os.path.join(directory, "*.py"))):
+            datafile = open(path, "rb")
+            digest.update(datafile.read())
+            datafile.close()
+        salt = (backend, digest.hexdigest())
+    return salt[1]
+
+
+def getcache(directory, size=MAXSIZE // 2 ** 20):
+    """
+    Returns the cache given by the options C{--cache} and C{--cachesize}.
+
+    @param directory: is the directory of the cache, or None
+    @type directory: C{string}
+    @param size: is the maximum size of the cache in megabytes
+    @type size: C{string or number}
+    @return: the cache, or None if there is no directory
+    @rtype: C{Rendercache}
+    @raise OptionError: If the size is not a positive number or the
+    directory can not be created.
+    """
+    if directory is None:
+        return None
+    try:
+        maxsize = int(float(size) * 2 ** 20)
+    except (TypeError, ValueError):
+        maxsize = 0
+    return Rendercache(directory, maxsize)
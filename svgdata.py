@@ -0,0 +1,298 @@
+# pySVG is vector graphics program for python that converts data
+# entered by a .txt file in an SVG graphic.
+#
+# Copyright (C) 2011 Isabel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+This module contains the representation in memory of the input data: the
+list of columns read from the data file, with the summaries of each column
+kept once they are computed so that every chart drawn from the same data
+shares them.
+
+The dataset and its columns are immutable tuples, so the same parsed data
+can be given to several charts and none of them can change the values seen
+by the other ones. The selections of columns and of ranges of rows are
+views that share the values and the summaries of the dataset::
+
+    \>>> lval = Dataset([["1", "2", "3"], ["4", "6", "5"]])
+    ... rows = lval.getrows(0, 2)
+    ... list(rows[1])
+    ... ['4', '6']
+"""
+__docformat__ = 'epytext en'
+
+
+###############################################################################
+## Imports
+###############################################################################
+
+
+from collections.abc import Sequence
+from itertools import islice
+from svgnumeric import isarray
+from svgstats import Columnstats, Statistics
+
+
+###############################################################################
+## Classes
+###############################################################################
+
+
+class Columnview(Sequence):
+    """
+    Read-only view of a range of rows of a column of input data. The view
+    keeps the column and the positions of its first and last rows, so it is
+    built in constant time and it does not copy any value. The slices of a
+    view are views of the same column.
+
+    \>>> column = Columnview(("4", "6", "5", "7"), 1)
+    ... len(column), column[0], list(column[1:])
+    ... (3, '6', ['5', '7'])
+    """
+
+    __slots__ = ("values", "start", "stop")
+
+    def __init__(self, values, start=0, stop=None):
+        """
+        @param values: is the column, a tuple or another view
+        @type values: C{tuple or Columnview}
+        @param start: is the position of the first row of the view
+        @type start: C{number}
+        @param stop: is the position after the last row of the view, by
+        default the end of the column
+        @type stop: C{number}
+        """
+        start, stop, step = slice(start, stop).indices(len(values))
+        offset = 0
+        if isinstance(values, Columnview):
+            offset = values.start
+            values = values.values
+        self.values = values
+        """@ivar: is the column of the whole dataset
+        @type: C{tuple}"""
+        self.start = offset + start
+        """@ivar: is the position of the first row in C{values}
+        @type: C{number}"""
+        self.stop = offset + max(start, stop)
+        """@ivar: is the position after the last row in C{values}
+        @type: C{number}"""
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            if position.step not in (None, 1):
+                return tuple(self)[position]
+            return Columnview(self, position.start, position.stop)
+        if position < 0:
+            position += self.stop - self.start
+        if position < 0 or position >= self.stop - self.start:
+            raise IndexError("column index out of range")
+        return self.values[self.start + position]
+
+    def __iter__(self):
+        return islice(self.values, self.start, self.stop)
+
+    def __repr__(self):
+        return "Columnview(" + repr(tuple(self)) + ")"
+
+###############################################################################
+
+
+class Dataset(tuple):
+    """
+    Immutable list of the columns of the input data. It is used as the list
+    returned by C{filetext.readinputfile}, and it keeps the statistics of
+    each column and of each pair of columns the first time they are
+    requested. The columns are kept as tuples, so the charts can not modify
+    the data that they share.
+
+    The statistics are found by the column and the range of its rows, so the
+    selections of the dataset (C{lval[2:]}, C{lval.getrows(0, 10)}) share
+    them with the dataset. The statistics of a range of rows take their
+    array of the numeric backend from the array of the whole column, without
+    copying it.
+
+    \>>> lval = Dataset([["1", "2", "3"], ["4", "6", "5"]])
+    ... lval.getstats(lval[1]).getmaximum()
+    ... 6
+    """
+
+    def __new__(cls, columns=(), columnstats=None, pairstats=None):
+        return tuple.__new__(cls, [tocolumn(column) for column in columns])
+
+    def __init__(self, columns=(), columnstats=None, pairstats=None):
+        """
+        @param columns: are the columns of the input data
+        @type columns: C{list of list}
+        @param columnstats: are the statistics of the columns shared with
+        another dataset, or None
+        @type columnstats: C{dictionary}
+        @param pairstats: are the statistics of the pairs of columns shared
+        with another dataset, or None
+        @type pairstats: C{dictionary}
+        """
+        if columnstats is None:
+            columnstats = {}
+        if pairstats is None:
+            pairstats = {}
+        self.columnstats = columnstats
+        """@ivar: are the statistics of each column, by key of the column
+        (see C{getkey})
+        @type: C{dictionary}"""
+        self.pairstats = pairstats
+        """@ivar: are the statistics of each pair of columns (X,Y), by key
+        of the columns
+        @type: C{dictionary}"""
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return self.select(range(len(self))[position])
+        return tuple.__getitem__(self, position)
+
+    def select(self, positions):
+        """
+        Returns the dataset of some columns of this one, in the given order.
+        The columns are not copied and the statistics are shared with this
+        dataset.
+
+        @param positions: are the positions of the columns, from 0
+        @type positions: C{list of number}
+        @rtype: C{Dataset}
+        """
+        return Dataset([tuple.__getitem__(self, position)
+                        for position in positions],
+                       self.columnstats, self.pairstats)
+
+    def getrows(self, start, stop=None):
+        """
+        Returns the dataset of a range of rows of this one: a view of the
+        rows of each column. The values are not copied and the statistics
+        are shared with this dataset.
+
+        @param start: is the position of the first row
+        @type start: C{number}
+        @param stop: is the position after the last row, by default the end
+        of the columns
+        @type stop: C{number}
+        @rtype: C{Dataset}
+        """
+        return Dataset([Columnview(column, start, stop)
+                        for column in self], self.columnstats, self.pairstats)
+
+    def getkey(self, column):
+        """
+        Returns the key of the statistics of a column: the identity of the
+        column of the dataset and the range of rows of the view.
+
+        @param column: is the column or a view of it
+        @type column: C{tuple or Columnview}
+        @rtype: C{tuple}
+        """
+        if isinstance(column, Columnview):
+            return id(column.values), column.start, column.stop
+        return id(column), 0, len(column)
+
+    def getstats(self, column):
+        """
+        Returns the statistics of a column: minimum, maximum, sum, number of
+        values, average, variance and whether it is sorted.
+
+        @param column: is the column, a view of it or its position in the
+        dataset
+        @type column: C{tuple or Columnview or number}
+        @return: statistics of the column
+        @rtype: C{svgstats.Columnstats}
+        """
+        if isinstance(column, int):
+            column = self[column]
+        key = self.getkey(column)
+        statistics = self.columnstats.get(key)
+        if statistics is None:
+            statistics = Columnstats(column)
+            if isinstance(column, Columnview) and \
+                    len(column) < len(column.values):
+                try:
+                    array = self.getstats(column.values).getarray()
+                except ValueError:
+                    array = None
+                if isarray(array):
+                    statistics.array = array[column.start:column.stop]
+            self.columnstats[key] = statistics
+        return statistics
+
+    def getpairstats(self, xcolumn, ycolumn):
+        """
+        Returns the statistics of the points given by two columns: averages,
+        variances and covariance, used to build the regression lines. If the
+        numeric backend holds both columns the statistics are computed with
+        their arrays.
+
+        @param xcolumn: is the column of the X component
+        @type xcolumn: C{tuple or Columnview}
+        @param ycolumn: is the column of the Y component
+        @type ycolumn: C{tuple or Columnview}
+        @return: statistics of the points
+        @rtype: C{svgstats.Statistics}
+        """
+        key = (self.getkey(xcolumn), self.getkey(ycolumn))
+        entry = self.pairstats.get(key)
+        if entry is None:
+            xvalues = self.getstats(xcolumn).getarray()
+            yvalues = self.getstats(ycolumn).getarray()
+            if xvalues is False or yvalues is False:
+                xvalues, yvalues = xcolumn, ycolumn
+            entry = (xcolumn, ycolumn, Statistics(xvalues, yvalues))
+            self.pairstats[key] = entry
+        return entry[2]
+
+
+###############################################################################
+## Functions
+###############################################################################
+
+
+def getdataset(lval):
+    """
+    Returns the input data as a C{Dataset}. If it is already a dataset it is
+    returned unchanged, so the charts drawn from the same data share their
+    statistics. Otherwise the columns are copied once into the dataset and
+    later changes of the list do not affect the chart.
+
+    @param lval: is the list of columns of the input data
+    @type lval: C{list}
+    @return: the dataset of the input data
+    @rtype: C{Dataset}
+    """
+    if isinstance(lval, Dataset):
+        return lval
+    return Dataset(lval)
+
+
+def tocolumn(values):
+    """
+    Returns a column of input data as an immutable sequence: tuples and
+    views are returned unchanged and the other sequences are copied into a
+    tuple.
+
+    @param values: are the values of the column
+    @type values: C{list or tuple or Columnview}
+    @rtype: C{tuple or Columnview}
+    """
+    if type(values) is tuple or isinstance(values, Columnview):
+        return values
+    return tuple(values)
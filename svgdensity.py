@@ -0,0 +1,432 @@
+# pySVG is vector graphics program for python that converts data
+# entered by a .txt file in an SVG graphic.
+#
+# Copyright (C) 2011 Isabel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+This module contains the density maps of the scatter plots. A scatter plot
+of hundreds of thousands of points is a blot of overlapped markers, and
+writing each marker makes the SVG document as large as the input data. The
+density map divides the plane in cells, counts the points of each cell in a
+single pass over the columns and draws one cell for each non-empty one,
+filled with the colour of its number of points, so the size of the document
+depends on the number of cells instead of the number of points.
+
+The density map is chosen with a text C{method:size}, as the option
+C{--density} of the command line::
+
+    \>>> density = getdensity("hex:12")
+    ... xs, ys, counts = getcells([(xvalues, yvalues)], density)
+
+There are three methods:
+    - B{grid:S}: squares of S pixels (10 by default).
+    - B{hex:S}: hexagons of radius S pixels (10 by default), that are closer
+      to the circles around each point than the squares.
+    - B{raster:S}: an image of pixels of S pixels of the chart (1 by
+      default), written as a PNG image embedded in the document. The size
+      of the document depends only on the size of the chart.
+"""
+__docformat__ = 'epytext en'
+
+
+###############################################################################
+## Imports
+###############################################################################
+
+
+from math import floor, sqrt
+import struct
+import zlib
+from svgnumeric import isarray, numpy
+
+
+###############################################################################
+## Constants
+###############################################################################
+
+
+DENSITIES = ("hex", "grid", "raster")
+"""Names of the methods of the density maps."""
+CELLSIZE = 10
+"""Size in pixels of the cells when it is not given."""
+RASTERSIZE = 1
+"""Size in pixels of the pixels of the raster when it is not given."""
+MAXRASTER = 2 ** 26
+"""Maximum number of pixels of a raster."""
+RAMP = ("#ffffcc", "#ffeda0", "#fed976", "#feb24c", "#fd8d3c", "#fc4e2a",
+        "#e31a1c", "#b10026")
+"""Colours of the cells, from the lowest to the highest number of points."""
+
+
+###############################################################################
+## Functions
+###############################################################################
+
+
+def getdensity(text):
+    """
+    Returns the density map given by a text C{method[:size]}, where
+    C{method} is one of C{DENSITIES} and C{size} is the side of the squares
+    or the radius of the hexagons in pixels, C{CELLSIZE} if it is not given,
+    or the side of the pixels of the raster, C{RASTERSIZE} if it is not
+    given.
+
+    @param text: is the text of the density map, or None
+    @type text: C{string}
+    @return: the method and the size, or None if there is no density map
+    @rtype: C{(string, number)}
+    @raise ValueError: If the method is unknown or the size is not a
+    positive integer.
+    """
+    if text is None or text == "":
+        return None
+    method, separator, size = str(text).partition(":")
+    if method not in DENSITIES:
+        raise ValueError("Unknown density method: " + method)
+    if method == "raster":
+        size = int(size or RASTERSIZE)
+    else:
+        size = int(size or CELLSIZE)
+    if size < 1:
+        raise ValueError("The size of the cells must be positive")
+    return method, size
+
+
+def getcells(pairs, density):
+    """
+    Returns the non-empty cells of a density map of the points given by
+    some pairs of columns: the X and the Y coordinates of each cell (the
+    lower left corner of the squares, the centre of the hexagons) and its
+    number of points, in ascending order of X and then of Y. The points of
+    all the pairs are counted together.
+
+    The columns are read once. If they are arrays of the numeric backend the
+    cells of all the points are computed at once and counted by
+    C{numpy.bincount}, otherwise the points are counted one by one in a
+    dictionary. Both give the same cells.
+
+    @param pairs: are the columns (X, Y) of the points
+    @type pairs: C{list of (list or array, list or array)}
+    @param density: is the method and the size returned by C{getdensity}
+    @type density: C{(string, number)}
+    @return: X coordinates, Y coordinates and counts of the cells
+    @rtype: C{(list, list, list)}
+    """
+    method, size = density
+    cells = None
+    if len(pairs) and all([isarray(xvalues) and isarray(yvalues)
+                           for xvalues, yvalues in pairs]):
+        cells = countarraycells(pairs, method, size)
+    if cells is None:
+        cells = countcells(pairs, method, size)
+    columns, rows, counts = cells
+    if method == "grid":
+        return ([column * size for column in columns],
+                [row * size for row in rows], counts)
+    width = size * sqrt(3)
+    return ([(column + (row & 1) / 2.0) * width
+             for column, row in zip(columns, rows)],
+            [row * 1.5 * size for row in rows], counts)
+
+
+def countcells(pairs, method, size):
+    """
+    Counts the points of each cell of a density map in pure Python.
+
+    The square of a point is given by the integer division of its
+    coordinates by the size. The hexagons of radius C{size} have their
+    centres in two rectangular lattices, the even rows and the odd rows
+    shifted half a hexagon, and the hexagon of a point is the nearest of the
+    centres of both lattices, each one found by rounding the coordinates.
+
+    @param pairs: are the columns (X, Y) of the points
+    @type pairs: C{list of (list, list)}
+    @param method: is C{grid} or C{hex}
+    @type method: C{string}
+    @param size: is the size of the cells
+    @type size: C{number}
+    @return: columns, rows and counts of the cells, sorted by column and row
+    @rtype: C{(list, list, list)}
+    """
+    cells = {}
+    getcount = cells.get
+    width = size * sqrt(3)
+    height = 3.0 * size
+    for xvalues, yvalues in pairs:
+        for xvalue, yvalue in zip(xvalues, yvalues):
+            if method == "grid":
+                cell = (int(xvalue // size), int(yvalue // size))
+            else:
+                xscaled = xvalue / width
+                yscaled = yvalue / height
+                column = floor(xscaled + 0.5)
+                row = floor(yscaled + 0.5)
+                xdelta = xvalue - column * width
+                ydelta = yvalue - row * height
+                column2 = floor(xscaled)
+                row2 = floor(yscaled)
+                xdelta2 = xvalue - (column2 + 0.5) * width
+                ydelta2 = yvalue - (row2 + 0.5) * height
+                if xdelta * xdelta + ydelta * ydelta <= \
+                        xdelta2 * xdelta2 + ydelta2 * ydelta2:
+                    cell = (column, 2 * row)
+                else:
+                    cell = (column2, 2 * row2 + 1)
+            cells[cell] = getcount(cell, 0) + 1
+    keys = sorted(cells)
+    return ([key[0] for key in keys], [key[1] for key in keys],
+            [cells[key] for key in keys])
+
+
+def countarraycells(pairs, method, size):
+    """
+    Counts the points of each cell of a density map with the arrays of the
+    numeric backend, as C{countcells}. The cell of each point is a number
+    C{column * rows + row}, and the numbers are counted by C{numpy.bincount}
+    when the cells of the map are few, or by C{numpy.unique} otherwise.
+
+    @param pairs: are the columns (X, Y) of the points
+    @type pairs: C{list of (array, array)}
+    @param method: is C{grid} or C{hex}
+    @type method: C{string}
+    @param size: is the size of the cells
+    @type size: C{number}
+    @return: columns, rows and counts of the cells sorted by column and row,
+    or None if the cells can not be numbered with 64 bits integers
+    @rtype: C{(list, list, list)}
+    """
+    allcolumns = []
+    allrows = []
+    width = size * sqrt(3)
+    height = 3.0 * size
+    for xvalues, yvalues in pairs:
+        length = min(len(xvalues), len(yvalues))
+        xvalues = xvalues[:length]
+        yvalues = yvalues[:length]
+        if method == "grid":
+            columns = numpy.floor_divide(xvalues, size)
+            rows = numpy.floor_divide(yvalues, size)
+        else:
+            xscaled = xvalues / width
+            yscaled = yvalues / height
+            columns = numpy.floor(xscaled + 0.5)
+            rows = numpy.floor(yscaled + 0.5)
+            xdelta = xvalues - columns * width
+            ydelta = yvalues - rows * height
+            columns2 = numpy.floor(xscaled)
+            rows2 = numpy.floor(yscaled)
+            xdelta2 = xvalues - (columns2 + 0.5) * width
+            ydelta2 = yvalues - (rows2 + 0.5) * height
+            first = xdelta * xdelta + ydelta * ydelta <= \
+                xdelta2 * xdelta2 + ydelta2 * ydelta2
+            columns = numpy.where(first, columns, columns2)
+            rows = numpy.where(first, 2 * rows, 2 * rows2 + 1)
+        allcolumns.append(columns.astype(numpy.int64))
+        allrows.append(rows.astype(numpy.int64))
+    columns = numpy.concatenate(allcolumns)
+    rows = numpy.concatenate(allrows)
+    if len(columns) == 0:
+        return [], [], []
+    firstcolumn = int(columns.min())
+    firstrow = int(rows.min())
+    numrows = int(rows.max()) - firstrow + 1
+    numcells = (int(columns.max()) - firstcolumn + 1) * numrows
+    if numcells >= 2 ** 62:
+        return None
+    cells = (columns - firstcolumn) * numrows + (rows - firstrow)
+    if numcells <= 4 * len(cells) + 65536:
+        counts = numpy.bincount(cells, minlength=numcells)
+        cells = numpy.flatnonzero(counts)
+        counts = counts[cells]
+    else:
+        cells, counts = numpy.unique(cells, return_counts=True)
+    return ((cells // numrows + firstcolumn).tolist(),
+            (cells % numrows + firstrow).tolist(), counts.tolist())
+
+
+def getlevels(counts, levels=len(RAMP)):
+    """
+    Returns the level of the colour ramp of each cell: the counts from 1 to
+    the maximum are divided in C{levels} ranges of the same length.
+
+    \>>> getlevels([1, 4, 8, 2], 4)
+    ... [0, 1, 3, 0]
+
+    @param counts: are the numbers of points of the cells
+    @type counts: C{list of number}
+    @param levels: is the number of levels
+    @type levels: C{number}
+    @return: the level of each cell, from 0
+    @rtype: C{list of number}
+    """
+    if len(counts) == 0:
+        return []
+    maxcount = max(counts)
+    return [(count * levels - 1) // maxcount for count in counts]
+
+
+def getranges(maxcount, levels=len(RAMP)):
+    """
+    Returns the range of counts of each level of C{getlevels}, written in
+    the legend of the density map. The levels without any possible count,
+    when the maximum is lower than the number of levels, are not returned.
+
+    \>>> getranges(8, 4)
+    ... [(0, 1, 2), (1, 3, 4), (2, 5, 6), (3, 7, 8)]
+
+    @param maxcount: is the maximum number of points of a cell
+    @type maxcount: C{number}
+    @param levels: is the number of levels
+    @type levels: C{number}
+    @return: the level, the lowest and the highest count of each range
+    @rtype: C{list of (number, number, number)}
+    """
+    ranges = []
+    for level in range(levels):
+        lowest = level * maxcount // levels + 1
+        highest = (level + 1) * maxcount // levels
+        if lowest <= highest:
+            ranges.append((level, lowest, highest))
+    return ranges
+
+
+def getrastersize(xmaximum, ymaximum, size):
+    """
+    Returns the number of columns and rows of the raster of a density map
+    whose values go from 0 to the given maximums. Each pixel of the raster
+    is centred on the multiples of C{size}, so the pixel of the value 0
+    begins half a pixel before it.
+
+    @param xmaximum: is the maximum value of the X component
+    @type xmaximum: C{number}
+    @param ymaximum: is the maximum value of the Y component
+    @type ymaximum: C{number}
+    @param size: is the side of the pixels
+    @type size: C{number}
+    @return: width and height of the raster
+    @rtype: C{(number, number)}
+    @raise ValueError: If the raster has more than C{MAXRASTER} pixels.
+    """
+    width = max(int(floor(xmaximum / float(size) + 0.5)) + 1, 1)
+    height = max(int(floor(ymaximum / float(size) + 0.5)) + 1, 1)
+    if width * height > MAXRASTER:
+        raise ValueError("The raster is too large, use larger pixels")
+    return width, height
+
+
+def rasterize(pairs, width, height, size):
+    """
+    Returns the number of points of each pixel of a raster of C{width} x
+    C{height} pixels of side C{size}, by rows from the top. The pixel of a
+    point is found by rounding its coordinates divided by C{size}, and the
+    points out of the raster are ignored. The columns are read once, with
+    the arrays of the numeric backend if all of them are arrays.
+
+    @param pairs: are the columns (X, Y) of the points
+    @type pairs: C{list of (list or array, list or array)}
+    @param width: is the number of columns of the raster
+    @type width: C{number}
+    @param height: is the number of rows of the raster
+    @type height: C{number}
+    @param size: is the side of the pixels
+    @type size: C{number}
+    @return: the counts of the pixels
+    @rtype: C{list or array of int}
+    """
+    if len(pairs) and all([isarray(xvalues) and isarray(yvalues)
+                           for xvalues, yvalues in pairs]):
+        counts = numpy.zeros(width * height, numpy.int64)
+        for xvalues, yvalues in pairs:
+            length = min(len(xvalues), len(yvalues))
+            columns = numpy.floor(xvalues[:length] / float(size) + 0.5)
+            rows = numpy.floor(yvalues[:length] / float(size) + 0.5)
+            inside = (columns >= 0) & (columns < width) & (rows >= 0) & \
+                (rows < height)
+            pixels = (height - 1 - rows[inside].astype(numpy.int64)) * \
+                width + columns[inside].astype(numpy.int64)
+            counts += numpy.bincount(pixels, minlength=width * height)
+        return counts
+    counts = [0] * (width * height)
+    size = float(size)
+    for xvalues, yvalues in pairs:
+        for xvalue, yvalue in zip(xvalues, yvalues):
+            column = floor(xvalue / size + 0.5)
+            row = floor(yvalue / size + 0.5)
+            if 0 <= column < width and 0 <= row < height:
+                counts[(height - 1 - row) * width + column] += 1
+    return counts
+
+
+def getrasterpng(counts, width, height, levels=len(RAMP)):
+    """
+    Returns the PNG image of a raster: the pixels without points are
+    transparent and the rest take the colour of C{RAMP} of their level,
+    given by C{getlevels}. The image is written with a palette, one byte for
+    each pixel, and compressed by C{zlib}.
+
+    @param counts: are the counts of the pixels returned by C{rasterize}
+    @type counts: C{list or array of int}
+    @param width: is the number of columns of the raster
+    @type width: C{number}
+    @param height: is the number of rows of the raster
+    @type height: C{number}
+    @param levels: is the number of colours of the ramp
+    @type levels: C{number}
+    @return: the PNG image and the maximum count of a pixel
+    @rtype: C{(bytes, number)}
+    """
+    maxcount = int(max(counts)) if len(counts) else 0
+    if isarray(counts):
+        indexes = numpy.zeros((height, width + 1), numpy.uint8)
+        if maxcount:
+            indexes[:, 1:] = numpy.where(
+                counts > 0, (counts * levels - 1) // maxcount + 1,
+                0).reshape(height, width)
+        scanlines = indexes.tobytes()
+    else:
+        indexes = bytearray()
+        for first in range(0, width * height, width):
+            # each scanline begins with the filter type 0 (none)
+            indexes.append(0)
+            indexes.extend([(count * levels - 1) // maxcount + 1 if count
+                            else 0 for count in counts[first:first + width]])
+        scanlines = bytes(indexes)
+    palette = bytearray(3)
+    for color in RAMP[:levels]:
+        palette.extend(bytearray.fromhex(color[1:]))
+    transparency = bytearray([0] + [255] * levels)
+    return (b"\x89PNG\r\n\x1a\n" +
+            getpngchunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 3,
+                                             0, 0, 0)) +
+            getpngchunk(b"PLTE", bytes(palette)) +
+            getpngchunk(b"tRNS", bytes(transparency)) +
+            getpngchunk(b"IDAT", zlib.compress(scanlines)) +
+            getpngchunk(b"IEND", b""), maxcount)
+
+
+def getpngchunk(kind, data):
+    """
+    Returns a chunk of a PNG image: the length of the data, the type, the
+    data and the CRC of the type and the data.
+
+    @param kind: is the type of the chunk, four ASCII letters
+    @type kind: C{bytes}
+    @param data: is the data of the chunk
+    @type data: C{bytes}
+    @rtype: C{bytes}
+    """
+    return struct.pack(">I", len(data)) + kind + data + \
+        struct.pack(">I", zlib.crc32(kind + data) & 0xffffffff)
@@ -50,8 +50,169 @@ __docformat__ = 'epytext en'
 # Imports
 ###############################################################################
 
-from math import cos, sin, pi
-import sys
+from math import cos, sin, pi, sqrt
+from itertools import chain, islice
+import base64
+from svgdata import Columnview, getdataset
+from svgdensity import RAMP, getcells, getdensity, getlevels, getranges, \
+    getrasterpng, getrastersize, rasterize
+from svgnumeric import argsort, concatenate, isarray, isintegral, take, \
+    tolist, topoints, translate
+from svgsample import cull, downsample, getpositions, getsampling, simplify
+from svgscale import Scale, getkind, getlength, getlogticks, getticks, \
+    gettimeticks, isbounded
+from svgerrors import COLUMNSERROR, NUMERICERROR, InputError
+from svgstats import Columnstats
+from svgtime import formattime
+
+
+###############################################################################
+# Svgelements Functions: Number Formatting
+###############################################################################
+
+SMALLINTEGERS = [str(number) for number in range(2048)]
+"""Text of the small positive integers, written without calling C{str}.
+Most coordinates, sizes and widths of a chart are integers in this range."""
+NUMBERCACHESIZE = 4096
+"""Maximum number of values kept in C{numbercache}."""
+numbercache = {}
+"""Text of the first floats written with the default precision in a chart:
+the origins, sizes and axis positions repeated in the whole chart. Only
+floats are kept and looked up, so an integer or a boolean equal to a float
+(C{1 == 1.0 == True}) never takes its text. It is emptied by
+C{setprecision}, that C{svgrender.render} calls for each chart, so the
+charts of a long-running process do not share it."""
+numberprecision = None
+"""Default number of decimals of the numbers written in the SVG document, or
+None to write them with all their digits."""
+
+
+def setprecision(precision):
+    """
+    Changes the default number of decimals of the numbers written in the SVG
+    document by all the elements.
+
+    @param precision: is the number of decimals, or None to write all the
+    digits of each number
+    @type precision: C{number}
+    """
+    global numberprecision
+    if precision is not None:
+        precision = int(precision)
+        if precision < 0:
+            raise ValueError("The precision must be a positive number")
+    numberprecision = precision
+    numbercache.clear()
+
+
+def writenumber(value, precision):
+    """
+    Returns the text of a float rounded to C{precision} decimals without
+    trailing zeros, or with all its digits if C{precision} is None. The
+    floats without decimal part are written without point.
+
+    @param value: is the number to write
+    @type value: C{float}
+    @param precision: is the number of decimals
+    @type precision: C{number}
+    @return: the text of the number
+    @rtype: C{string}
+    """
+    if precision is None:
+        if value.is_integer() and -1e15 < value < 1e15:
+            return str(int(value))
+        return repr(value)
+    text = "%.*f" % (precision, value)
+    if "." in text:
+        text = text.rstrip("0").rstrip(".")
+    if text == "-0":
+        return "0"
+    return text
+
+
+def formatnumber(value, precision=None):
+    """
+    Returns the text of a number as it is written in the SVG document: the
+    integers and the floats without decimal part are written without point,
+    and the rest of floats are rounded to C{precision} decimals without
+    trailing zeros. Any other value (the strings read from the input file)
+    is written with C{str}.
+
+    \>>> formatnumber(150.0)
+    ... '150'
+    ... formatnumber(168.694819148, 2)
+    ... '168.69'
+
+    @param value: is the number to write
+    @type value: C{number}
+    @param precision: is the number of decimals, by default the precision
+    chosen with C{setprecision}
+    @type precision: C{number}
+    @return: the text of the number
+    @rtype: C{string}
+    """
+    if type(value) is int:
+        if 0 <= value < 2048:
+            return SMALLINTEGERS[value]
+        return str(value)
+    if not isinstance(value, float):
+        return str(value)
+    if precision is not None and precision != numberprecision:
+        return writenumber(value, precision)
+    if type(value) is not float:
+        return writenumber(value, numberprecision)
+    text = numbercache.get(value)
+    if text is None:
+        text = writenumber(value, numberprecision)
+        if len(numbercache) < NUMBERCACHESIZE:
+            numbercache[value] = text
+    return text
+
+
+def formatnumbers(values, precision=None):
+    """
+    Returns the text of each number of a list, with the same rules as
+    C{formatnumber}. Used by the batched renderers to write the coordinates
+    of many shapes at once. The arrays of the numeric backend are converted
+    to lists by C{svgnumeric.tolist} before they are written.
+
+    @param values: are the numbers to write
+    @type values: C{list or array of number}
+    @param precision: is the number of decimals, by default the precision
+    chosen with C{setprecision}
+    @type precision: C{number}
+    @return: the text of each number
+    @rtype: C{list of string}
+    """
+    values = tolist(values)
+    if precision is not None and precision != numberprecision:
+        return [formatnumber(value, precision) for value in values]
+    precision = numberprecision
+    smallintegers = SMALLINTEGERS
+    cache = numbercache
+    cachedtext = cache.get
+    texts = []
+    append = texts.append
+    for value in values:
+        kind = type(value)
+        if kind is float:
+            text = cachedtext(value)
+            if text is None:
+                if precision is None and not value.is_integer():
+                    # the common case of a coordinate with decimals
+                    text = repr(value)
+                else:
+                    text = writenumber(value, precision)
+                if len(cache) < NUMBERCACHESIZE:
+                    cache[value] = text
+            append(text)
+        elif kind is int and 0 <= value < 2048:
+            append(smallintegers[value])
+        elif isinstance(value, float):
+            append(writenumber(value, precision))
+        else:
+            append(str(value))
+    return texts
 
 
 ###############################################################################
@@ -113,6 +274,13 @@ class Text:
     be drawn in horizontal direction
     """
 
+    texttemplate = "<text id=\"%s\" x=\"%s\" y=\"%s\" text-anchor=\"start\" " \
+                   "font-size=\"%s\" font-family=\"arial\" stroke=\"%s\"> %s " \
+                   "</text>\n"
+    """@cvar: is the precompiled SVG template of the text item. It is filled
+    with the identifier, X, Y, font size, stroke and description of the text.
+    @type: C{string}"""
+
     def __init__(self, xorigin, yorigin, fontsize, text,
                  stroke="black", idtext="text"):
         self.xorigintext = xorigin
@@ -141,12 +309,11 @@ class Text:
         @return: SVG source code of the text object.
         @rtype: C{string}
         """
-        string = "<text id=\"" + str(self.idtext) + "\" x=\"" \
-                 + str(self.xorigintext) + "\" y=\"" + str(self.yorigintext) + \
-                 "\" text-anchor=\"start\" font-size=\"" + str(self.fontsizetext) + \
-                 "\" font-family=\"arial\" stroke=\"" + str(self.stroketext) + "\"> " \
-                 + str(self.text) + " </text>\n"
-        return string
+        return self.texttemplate % (self.idtext,
+                                    formatnumber(self.xorigintext),
+                                    formatnumber(self.yorigintext),
+                                    formatnumber(self.fontsizetext),
+                                    self.stroketext, self.text)
 
 
 ###############################################################################
@@ -157,6 +324,17 @@ class Line:
     generally be used to draw the axes of the graphs.
     """
 
+    linetemplate = "<line x1=\"%s\" y1= \"%s\" x2= \"%s\" y2= \"%s\" " \
+                   "stroke= \"%s\" stroke-width= \"%s\"%s />\n"
+    """@cvar: is the precompiled SVG template of the line item. It is filled
+    with the initial and final coordinates, the stroke color, the stroke
+    width and the dash part of the line.
+    @type: C{string}"""
+    linedashpart = " stroke-dasharray= \"%s\""
+    """@cvar: is the template part added to the line item when it is drawn
+    as a grid line.
+    @type: C{string}"""
+
     def __init__(self, xorigin, yorigin, endx, endy, ygrid="no",
                  strokecolor="black", strokewidth=2):
         self.xoriginline = xorigin
@@ -201,20 +379,16 @@ class Line:
         if self.ygridline == "yes":
             self.strokecolorline = "gainsboro"
             self.strokewidthline = 2
-            strokedasharray = "4, 4, 4, 4"
-            string = "<line x1=" + "\"" + str(self.xoriginline) + "\" y1= \"" \
-                     + str(self.yoriginline) + "\" x2= \"" + str(self.endxline) + \
-                     "\" y2= \"" + str(self.endyline) + "\"" + " stroke= \"" \
-                     + str(self.strokecolorline) + "\" stroke-width= \"" \
-                     + str(self.strokewidthline) + "\" stroke-dasharray= \"" \
-                     + str(strokedasharray) + "\" />" + "\n"
+            dashpart = self.linedashpart % "4, 4, 4, 4"
         else:
-            string = "<line x1=" + "\"" + str(self.xoriginline) + "\" y1= \"" \
-                     + str(self.yoriginline) + "\" x2= \"" + str(self.endxline) + \
-                     "\" y2= \"" + str(self.endyline) + "\"" + " stroke= \"" \
-                     + str(self.strokecolorline) + "\" stroke-width= \"" + \
-                     str(self.strokewidthline) + "\" />" + "\n"
-        return string
+            dashpart = ""
+        return self.linetemplate % (formatnumber(self.xoriginline),
+                                    formatnumber(self.yoriginline),
+                                    formatnumber(self.endxline),
+                                    formatnumber(self.endyline),
+                                    self.strokecolorline,
+                                    formatnumber(self.strokewidthline),
+                                    dashpart)
 
 
 ###############################################################################
@@ -223,6 +397,18 @@ class Line:
 class Rectangle:
     """ Base class to build rectangle items in SVG code."""
 
+    recttemplate = "<rect id=\"%s\" x=\"%s\" y=\"%s\" height=\"%s\" " \
+                   "width=\"%s\" stroke-width=\"%s\" stroke=\"%s\" " \
+                   "fill=\"%s\"%s/>\n"
+    """@cvar: is the precompiled SVG template of the rectangle item. It is
+    filled with the identifier, X, Y, height, width, stroke width, stroke
+    color, fill color and filter part of the rectangle.
+    @type: C{string}"""
+    rectfilterpart = "  filter=\"url(#%s);\""
+    """@cvar: is the template part added to the rectangle item when it is
+    filtered.
+    @type: C{string}"""
+
     def __init__(self, height, width, xorigin, yorigin, idrect, fill,
                  filtered=False, filterid="none"):
 
@@ -266,20 +452,16 @@ class Rectangle:
         @rtype: C{string}
 
         """
+        xorigin, yorigin, height, width = formatnumbers(
+            [self.xoriginrect, self.yoriginrect, self.heightrect,
+             self.widthrect])
         if self.rectfiltered:
-            string = "<rect id=\"" + self.idrect + "\" x=\"" \
-                     + str(self.xoriginrect) + "\" y=\"" + str(self.yoriginrect) + \
-                     "\" height=\"" + str(self.heightrect) + "\" width=\"" \
-                     + str(self.widthrect) + "\" stroke-width=\"0\" stroke=\"" + \
-                     str(self.fillrect) + "\" fill=\"" + self.fillrect + \
-                     "\"  filter=\"url(#" + self.rectfilterid + ");\"/>\n"
-        else:
-            string = "<rect id=\"" + self.idrect + "\" x=\"" \
-                     + str(self.xoriginrect) + "\" y=\"" + str(self.yoriginrect) + \
-                     "\" height=\"" + str(self.heightrect) + "\" width=\"" \
-                     + str(self.widthrect) + "\" stroke-width=\"1\" stroke=\"black\"" \
-                     + " fill=\"" + self.fillrect + "\" />\n"
-        return string
+            return self.recttemplate % (self.idrect, xorigin, yorigin, height,
+                                        width, 0, self.fillrect,
+                                        self.fillrect, self.rectfilterpart %
+                                        self.rectfilterid)
+        return self.recttemplate % (self.idrect, xorigin, yorigin, height,
+                                    width, 1, "black", self.fillrect, " ")
 
 
 ###############################################################################
@@ -288,6 +470,17 @@ class Rectangle:
 class Polygon:
     """ Base class to build polygon items in SVG code."""
 
+    polygontemplate = "<polygon id=\"%s\" points=\"%s\" style=\"stroke:black; " \
+                      "stroke-width:1; fill:%s%s\"/>\n"
+    """@cvar: is the precompiled SVG template of the polygon item. It is
+    filled with the identifier, the list of points, the fill color and the
+    filter part of the polygon.
+    @type: C{string}"""
+    polygonfilterpart = "; filter:url(#%s);"
+    """@cvar: is the template part added to the polygon item when it is
+    filtered.
+    @type: C{string}"""
+
     def __init__(self, pointlist, idpolygon, fillcolor, filtered=False,
                  filterid="none"):
         self.polygonpointlist = pointlist
@@ -319,22 +512,16 @@ class Polygon:
         @rtype: C{string}
 
         """
-        if not self.polygonfiltered:
-            string = "<polygon id=\"" + self.idpolygon + "\" points=\""
-            for i in range(len(self.polygonpointlist)):
-                string += str(self.polygonpointlist[i][0]) + "," \
-                          + str(self.polygonpointlist[i][1]) + " "
-            string += "\" style=\"stroke:black; stroke-width:1; fill:" \
-                      + self.polygonfillcolor + "\"/>\n"
+        pointlist = self.polygonpointlist
+        points = "".join(["%s,%s " % pair for pair in
+                          zip(formatnumbers([point[0] for point in pointlist]),
+                              formatnumbers([point[1] for point in pointlist]))])
+        if self.polygonfiltered:
+            filterpart = self.polygonfilterpart % self.polygonfilterid
         else:
-            string = "<polygon id=\"" + self.idpolygon + "\" points=\""
-            for i in range(len(self.polygonpointlist)):
-                string += str(self.polygonpointlist[i][0]) + "," \
-                          + str(self.polygonpointlist[i][1]) + " "
-            string += "\" style=\"stroke:black; stroke-width:1; fill:" \
-                      + self.polygonfillcolor + "; filter:url(#" + \
-                      self.polygonfilterid + ");\"/>\n"
-        return string
+            filterpart = ""
+        return self.polygontemplate % (self.idpolygon, points,
+                                       self.polygonfillcolor, filterpart)
 
 
 ###############################################################################
@@ -343,6 +530,17 @@ class Polygon:
 class Circle:
     """ Base class to build Circle items in SVG code."""
 
+    circletemplate = "<circle cx=\"%s\" cy=\"%s\" r=\"%s\"\nstyle=\"fill:%s; " \
+                     "stroke:%s; stroke-width:%s;%s\"/>\n"
+    """@cvar: is the precompiled SVG template of the circle item. It is filled
+    with the center, radius, fill color, stroke color, stroke width and
+    filter part of the circle.
+    @type: C{string}"""
+    circlefilterpart = " filter:url(#%s);"
+    """@cvar: is the template part added to the circle item when it is
+    filtered.
+    @type: C{string}"""
+
     def __init__(self, xorigin, yorigin, radius, strokewidth, strokecolor,
                  fillcolor, filtered=False, filterid="none"):
         self.xorigincircle = xorigin
@@ -384,20 +582,16 @@ class Circle:
         """
 
         if self.filteredcircle:
-            return "<circle cx=\"" + str(self.xorigincircle) + "\" cy=\"" + \
-                   str(self.yorigincircle) + "\" r=\"" \
-                   + str(self.radiuscircle) + "\"\n" + "style=\"fill:" \
-                   + self.fillcolorcircle + "; stroke:" \
-                   + self.strokecolorcircle + "; stroke-width:" \
-                   + str(self.strokewidthcircle) + "; filter:url(#" \
-                   + self.filteridcircle + ");\"/>\n"
+            filterpart = self.circlefilterpart % self.filteridcircle
         else:
-            return "<circle cx=\"" + str(self.xorigincircle) + "\" cy=\"" \
-                   + str(self.yorigincircle) + "\" r=\"" \
-                   + str(self.radiuscircle) + "\"\n" + "style=\"fill:" \
-                   + self.fillcolorcircle + "; stroke:" \
-                   + self.strokecolorcircle + "; stroke-width:" \
-                   + str(self.strokewidthcircle) + ";\"/>\n"
+            filterpart = ""
+        return self.circletemplate % (formatnumber(self.xorigincircle),
+                                      formatnumber(self.yorigincircle),
+                                      formatnumber(self.radiuscircle),
+                                      self.fillcolorcircle,
+                                      self.strokecolorcircle,
+                                      formatnumber(self.strokewidthcircle),
+                                      filterpart)
 
 
 ############################################################################### 
@@ -441,6 +635,23 @@ class Path:
     ... onmouseout="animationOff('pie0');" filter="url(#lighting);"/>
     """
 
+    pathtemplate = "<path%s d=\"M%s,%s L%s,%s A%s,%s 0 %s,1 %s,%s Z\" " \
+                   "fill=\"%s\" stroke=\"black\" stroke-width=\"%s\" " \
+                   "onmouseover=\"%s\" onmouseout=\"%s\"%s/>\n"
+    """@cvar: is the precompiled SVG template of the path item. It is filled
+    with the identifier part, the initial point, the start of the arc, the
+    radius, the large-arc-flag, the end of the arc, the fill color, the stroke
+    width, the mouse actions and the filter part of the path.
+    @type: C{string}"""
+    pathidpart = " id=\"%s\""
+    """@cvar: is the template part added to the path item when it has an
+    identifier.
+    @type: C{string}"""
+    pathfilterpart = " filter=\"url(#%s);\""
+    """@cvar: is the template part added to the path item when it is
+    filtered.
+    @type: C{string}"""
+
     def __init__(self, xorigin, yorigin, radius, listvalues, colorfld, radian,
                  pos, initianradian, idpath, mouseover="", mouseout="",
                  filtered=False, filterid="none", strokewidth=0):
@@ -530,42 +741,32 @@ class Path:
         @rtype: C{string}
                 
         """
-        finalradian = self.initianradian
+        finalradian = self.initianradian + self.radian
         if self.idpath != "":
-            string = "<path id=\"" + self.idpath + "\"" + " d=\"M" + \
-                     str(self.xorigin) + "," + str(self.yorigin) + " L" + \
-                     str(self.xorigin + cos(self.initianradian) * self.radius) + "," \
-                     + str(self.yorigin + sin(self.initianradian) * self.radius) + \
-                     " A" + str(self.radius) + "," + str(self.radius) + " 0 "
+            idpart = self.pathidpart % self.idpath
         else:
-            string = "<path d=\"M" + str(self.xorigin) + "," + \
-                     str(self.yorigin) + " L" + str(self.xorigin + \
-                                                    cos(self.initianradian) * self.radius) + "," + \
-                     str(self.yorigin + sin(self.initianradian) * self.radius) + \
-                     " A" + str(self.radius) + "," + str(self.radius) + " 0 "
+            idpart = ""
         if (self.radian > pi):
-            string += "1"
+            largearcflag = "1"
         else:
-            string += "0"
-        finalradian += self.radian
+            largearcflag = "0"
         if self.filtered:
-            string += ",1 " + str(self.xorigin + cos(finalradian) * \
-                                  self.radius) + "," + str(self.yorigin + sin(finalradian) * \
-                                                           self.radius) + " Z\" fill=\"" + \
-                      str(self.listvalues[int(self.colorfld) - 1][self.pos]) + \
-                      "\" stroke=\"black\" stroke-width=\"" + \
-                      str(self.strokewidth) + "\" onmouseover=\"" + self.mouseover + "" \
-                      + "\" onmouseout=\"" + self.mouseout + \
-                      "\" filter=\"url(#" + self.filterid + ");\"/>\n"
+            filterpart = self.pathfilterpart % self.filterid
         else:
-            string += ",1 " + str(self.xorigin + cos(finalradian) * \
-                                  self.radius) + "," + str(self.yorigin + sin(finalradian) * \
-                                                           self.radius) + " Z\" fill=\"" + \
-                      str(self.listvalues[int(self.colorfld) - 1][self.pos]) + \
-                      "\" stroke=\"black\" stroke-width=\"" + str(self.strokewidth) + \
-                      "\" onmouseover=\"" + self.mouseover + "" + "\" onmouseout=\"" + \
-                      self.mouseout + "\"/>\n"
-        return string
+            filterpart = ""
+        xorigin, yorigin, xbegin, ybegin, radius, xend, yend, strokewidth = \
+            formatnumbers([self.xorigin, self.yorigin,
+                           self.xorigin + cos(self.initianradian) * self.radius,
+                           self.yorigin + sin(self.initianradian) * self.radius,
+                           self.radius,
+                           self.xorigin + cos(finalradian) * self.radius,
+                           self.yorigin + sin(finalradian) * self.radius,
+                           self.strokewidth])
+        return self.pathtemplate % (
+            idpart, xorigin, yorigin, xbegin, ybegin, radius, radius,
+            largearcflag, xend, yend,
+            self.listvalues[int(self.colorfld) - 1][self.pos],
+            strokewidth, self.mouseover, self.mouseout, filterpart)
 
 
 ###############################################################################
@@ -595,8 +796,15 @@ class Linepath:
     ... " style="stroke:purple; stroke-width:1; fill:purple"/>
     """
 
+    lpathtemplate = "<path id=\"%s\" d=\" M%s,%s %s\" style=\"stroke:%s; " \
+                    "stroke-width:1; fill:%s\"/>\n"
+    """@cvar: is the precompiled SVG template of the line path item. It is
+    filled with the identifier, the first point, the line commands, the stroke
+    color and the fill color of the path.
+    @type: C{string}"""
+
     def __init__(self, xorigin, yorigin, idlpath, lpoints, fillcolor,
-                 strokecolor="black"):
+                 strokecolor="black", epsilon=0):
         self.xorigin = xorigin
         """@ivar: is the X-coordenate of the initial point of the path 
         @type: C{number}"""
@@ -616,7 +824,10 @@ class Linepath:
         self.strokecolor = strokecolor
         """@ivar: is the fill color of the plotted line
         @type: C{string}"""
-
+        self.epsilon = epsilon
+        """@ivar: is the tolerance in pixels of the simplification of the
+        line, or 0 to draw all its points
+        @type: C{number}"""
 
     def printsvg(self):
         """
@@ -626,25 +837,87 @@ class Linepath:
         ...       Y1-coordenate)...L(Xn-coordenate,Yn-coordenate)"
         ...       style="stroke:...; stroke-width:..; fill:...."/> 
 
-        Where C{n=length of the points list}
+        Where C{n=length of the points list}. If C{self.epsilon} is greater
+        than 0 the line is simplified first by C{svgsample.simplify}: the
+        points of the nearly straight stretches closer than C{self.epsilon}
+        pixels to the simplified line are not written.
 
         @return: SVG source code of the Linepath object.
         @rtype: C{string}
         """
 
-        string = "<path id=\"" + self.idlpath + "\" d=\" M" + \
-                 str(float(self.lpoints[0][0]) + self.xorigin) + "," + \
-                 str(float(self.lpoints[0][1]) + self.yorigin) + " "
-        for i in range(len(self.lpoints)):
-            if i == len(self.lpoints):
-                string += "L" + str(float(self.lpoints[i][0]) + self.xorigin) \
-                          + "," + str(float(self.lpoints[i][1]) + self.yorigin)
-            else:
-                string += "L" + str(float(self.lpoints[i][0]) + self.xorigin) \
-                          + "," + str(float(self.lpoints[i][1]) + self.yorigin) + " "
-        string += "\" style=\"stroke:" + self.strokecolor \
-                  + "; stroke-width:1; fill:" + self.fillcolor + "\"/>\n"
-        return string
+        xorigin = self.xorigin
+        yorigin = self.yorigin
+        xs = [float(point[0]) + xorigin for point in self.lpoints]
+        ys = [float(point[1]) + yorigin for point in self.lpoints]
+        if self.epsilon > 0:
+            positions = simplify(xs, ys, self.epsilon)
+            xs = [xs[position] for position in positions]
+            ys = [ys[position] for position in positions]
+        xs = formatnumbers(xs)
+        ys = formatnumbers(ys)
+        return self.lpathtemplate % (self.idlpath, xs[0], ys[0],
+                                     "".join(["L%s,%s " % pair
+                                              for pair in zip(xs, ys)]),
+                                     self.strokecolor, self.fillcolor)
+
+
+###############################################################################
+
+
+class Image:
+    """
+    Base class to build image items in SVG code. The image is embedded in
+    the document as a C{data:} URI encoded in base64, so the document does
+    not depend on other files.
+    """
+
+    imagetemplate = "<image id=\"%s\" x=\"%s\" y=\"%s\" width=\"%s\" " \
+                    "height=\"%s\" preserveAspectRatio=\"none\" " \
+                    "style=\"image-rendering:pixelated\" " \
+                    "xmlns:xlink=\"http://www.w3.org/1999/xlink\" " \
+                    "xlink:href=\"data:%s;base64,%s\"/>\n"
+    """@cvar: is the precompiled SVG template of the image item. It is filled
+    with the identifier, X, Y, width, height, type and data of the image.
+    @type: C{string}"""
+
+    def __init__(self, xorigin, yorigin, width, height, data,
+                 idimage="image", mimetype="image/png"):
+        self.xorigin = xorigin
+        """@ivar: is the X coordinate of the upper left corner
+        @type: C{number}"""
+        self.yorigin = yorigin
+        """@ivar: is the Y coordinate of the upper left corner
+        @type: C{number}"""
+        self.width = width
+        """@ivar: is the width of the image in the chart
+        @type: C{number}"""
+        self.height = height
+        """@ivar: is the height of the image in the chart
+        @type: C{number}"""
+        self.data = data
+        """@ivar: is the content of the image file
+        @type: C{bytes}"""
+        self.idimage = idimage
+        """@ivar: is the identifier of the image in the SVG document
+        @type: C{string}"""
+        self.mimetype = mimetype
+        """@ivar: is the media type of the image file
+        @type: C{string}"""
+
+    def printsvg(self):
+        """
+        Returns a string with the SVG code for the Image object
+
+        @return: SVG source code of the image object.
+        @rtype: C{string}
+        """
+        return self.imagetemplate % (self.idimage, formatnumber(self.xorigin),
+                                     formatnumber(self.yorigin),
+                                     formatnumber(self.width),
+                                     formatnumber(self.height), self.mimetype,
+                                     base64.b64encode(self.data).decode(
+                                         "ascii"))
 
 
 ###############################################################################
@@ -880,9 +1153,17 @@ class Verticaltext(Text):
     """
         C{Verticaltext} is an intermediate structure used to build vertical 
         text. Adds an new attribute to the element text I{writting-mode} 
-        that allows to write text in the new direction 
+        that allows to write text in the new direction
     """
 
+    verticaltexttemplate = "<text x=\"%s\" y=\"%s\" transform=\"translate(%s,0)\" " \
+                           "text-anchor=\"start\" writing-mode=\"tb\" " \
+                           "font-size=\"%s\" font-family=\"arial\"> %s </text>\n"
+    """@cvar: is the precompiled SVG template of the vertical text item. It is
+    filled with the X, Y, horizontal translation, font size and description of
+    the text.
+    @type: C{string}"""
+
     def __init__(self, xorigin, yorigin, fontsize, text, width):
         """
         @param xorigin: is the initial X-coordenate
@@ -908,13 +1189,10 @@ class Verticaltext(Text):
         @return: SVG source code of the Verticaltext object.
         @rtype: C{string}
         """
-        string = "<text x=\"" + str(self.xorigintext) + "\" y=\"" \
-                 + str(self.yorigintext) + "\" transform=\"translate(" + \
-                 str(int(self.widthverticaltext) / 2) + ",0)\" text-anchor=\"start\"" \
-                 + " writing-mode=\"tb\" font-size=\"" + \
-                 str(self.fontsizetext) + "\" font-family=\"arial\"> " + str(self.text) \
-                 + " </text>\n"
-        return string
+        return self.verticaltexttemplate % (
+            formatnumber(self.xorigintext), formatnumber(self.yorigintext),
+            formatnumber(int(self.widthverticaltext) / 2),
+            formatnumber(self.fontsizetext), self.text)
 
     ###############################################################################
 
@@ -1313,6 +1591,580 @@ class Column3d(Rectangle3d):
     ###############################################################################
 
 
+# Svgelements Functions: Batched Primitives
+###############################################################################
+
+TICKLENGTH = 10
+"""Length of the ticks of the axes, the offset of the line of C{Linetext}
+and C{Linetextvertical}."""
+TICKTEXT = 4 * TICKLENGTH
+"""Distance from a tick of the Y axis to its label, as in C{Linetext}."""
+TICKTEXTVERTICAL = 1.5 * TICKLENGTH
+"""Distance from a tick of the X axis to its vertical label, as in
+C{Linetextvertical}."""
+
+
+def rendercircles(xs, ys, radius, strokewidth, strokecolor, fillcolor):
+    """
+    Returns the SVG code of one circle for each center given by the lists of
+    coordinates C{xs} and C{ys}. All the circles share the radius and the
+    style, so they are written in a single loop through the template of the
+    Circle object instead of building one object for each shape.
+
+    @param xs: X-coordenates of the centers of the circles
+    @type xs: C{list of number}
+    @param ys: Y-coordenates of the centers of the circles
+    @type ys: C{list of number}
+    @param radius: is the radius of the circles
+    @type radius: C{number}
+    @param strokewidth: is the width of the line of the circumferences
+    @type strokewidth: C{number}
+    @param strokecolor: is the color of the line of the circumferences
+    @type strokecolor: C{string}
+    @param fillcolor: is the fill color of the circles
+    @type fillcolor: C{string}
+    @return: SVG source code of each circle.
+    @rtype: C{list of string}
+    """
+    template = Circle.circletemplate
+    radius = formatnumber(radius)
+    strokewidth = formatnumber(strokewidth)
+    return [template % (xorigin, yorigin, radius, fillcolor, strokecolor,
+                        strokewidth, "")
+            for xorigin, yorigin in zip(formatnumbers(xs), formatnumbers(ys))]
+
+
+def renderrects(xs, ys, height, width, idrect, fillcolor):
+    """
+    Returns the SVG code of one rectangle of the same size for each initial
+    point given by the lists of coordinates C{xs} and C{ys}.
+
+    @param xs: X-coordenates of the initial points of the rectangles
+    @type xs: C{list of number}
+    @param ys: Y-coordenates of the initial points of the rectangles
+    @type ys: C{list of number}
+    @param height: is the height of the rectangles
+    @type height: C{number}
+    @param width: is the width of the rectangles
+    @type width: C{number}
+    @param idrect: is the identifier of the rectangles in SVG document
+    @type idrect: C{string}
+    @param fillcolor: is the fill color of the rectangles
+    @type fillcolor: C{string}
+    @return: SVG source code of each rectangle.
+    @rtype: C{list of string}
+    """
+    template = Rectangle.recttemplate
+    height = formatnumber(height)
+    width = formatnumber(width)
+    return [template % (idrect, xorigin, yorigin, height, width, 1, "black",
+                        fillcolor, " ")
+            for xorigin, yorigin in zip(formatnumbers(xs), formatnumbers(ys))]
+
+
+def renderpolygons(pointlists, idpolygon, fillcolor):
+    """
+    Returns the SVG code of one polygon for each list of points given in
+    C{pointlists}.
+
+    @param pointlists: is the list of points (X,Y) of each polygon
+    @type pointlists: C{list of list of coordenates}
+    @param idpolygon: is the identifier of the polygons in SVG document
+    @type idpolygon: C{string}
+    @param fillcolor: is the fill color of the polygons
+    @type fillcolor: C{string}
+    @return: SVG source code of each polygon.
+    @rtype: C{list of string}
+    """
+    template = Polygon.polygontemplate
+    pairs = ["%s,%s " % pair for pair in
+             zip(formatnumbers([point[0] for points in pointlists
+                                for point in points]),
+                 formatnumbers([point[1] for points in pointlists
+                                for point in points]))]
+    polygons = []
+    first = 0
+    for points in pointlists:
+        last = first + len(points)
+        polygons.append(template % (idpolygon, "".join(pairs[first:last]),
+                                    fillcolor, ""))
+        first = last
+    return polygons
+
+
+def rendermarkers(xs, ys, sym, color, size):
+    """
+    Returns the SVG code of the data points of a chart. This is the batched
+    version of C{Scatterplot.getsvgpoint}: the shape is chosen once and all
+    the points are written by the renderer of that shape.
+
+    @param xs: X-coordenates of the points
+    @type xs: C{list or array of number}
+    @param ys: Y-coordenates of the points
+    @type ys: C{list or array of number}
+    @param sym: Is the simbol of the points.
+    @type sym: C{circle or square or triangle or diamond or invertedtriangle}
+    @param color: Is the fill color of the points.
+    @type color: C{string}
+    @param size: Is the size of the points.
+    @type size: C{number}
+    @return: SVG source code of each point.
+    @rtype: C{list of string}
+    @raise ValueError: If the simbol of the points is unknown.
+    """
+    half = size / 2
+    if sym == "circle":
+        return rendercircles(xs, ys, half, 1, "black", color)
+    if sym == "square":
+        return renderrects(translate(xs, -half), translate(ys, -half), size,
+                           size, sym, color)
+    if sym == "triangle":
+        offsets = [(0, -half), (-half, half), (half, half)]
+    elif sym == "invertedtriangle":
+        offsets = [(-half, -half), (0, half), (half, -half)]
+    elif sym == "diamond":
+        offsets = [(0, -half), (half, 0), (0, half), (-half, 0)]
+    else:
+        raise ValueError("Unknown point symbol: " + str(sym))
+    # one list of coordinates for each vertex, written at once
+    vertices = []
+    for xoffset, yoffset in offsets:
+        vertices.append(formatnumbers(translate(xs, xoffset)))
+        vertices.append(formatnumbers(translate(ys, yoffset)))
+    template = Polygon.polygontemplate
+    pointstemplate = "%s,%s " * len(offsets)
+    return [template % (sym, pointstemplate % points, color, "")
+            for points in zip(*vertices)]
+
+
+def rendercells(xs, ys, offsets, fillcolors, idcell, precision=None):
+    """
+    Returns the SVG code of the cells of a density map: one polygon without
+    stroke for each point given by the lists of coordinates C{xs} and C{ys},
+    with its vertices at the given offsets of the point and its own fill
+    color. As in C{rendermarkers}, the coordinates of each vertex of all the
+    cells are written at once.
+
+    @param xs: X-coordenates of the cells
+    @type xs: C{list or array of number}
+    @param ys: Y-coordenates of the cells
+    @type ys: C{list or array of number}
+    @param offsets: are the offsets (X,Y) of the vertices of the cells
+    @type offsets: C{list of (number, number)}
+    @param fillcolors: is the fill color of each cell
+    @type fillcolors: C{list of string}
+    @param idcell: is the identifier of the cells in SVG document
+    @type idcell: C{string}
+    @param precision: is the number of decimals of the vertices, by default
+    the precision chosen with C{setprecision}
+    @type precision: C{number}
+    @return: SVG source code of each cell.
+    @rtype: C{list of string}
+    """
+    vertices = []
+    for xoffset, yoffset in offsets:
+        vertices.append(formatnumbers(translate(xs, xoffset), precision))
+        vertices.append(formatnumbers(translate(ys, yoffset), precision))
+    template = Polygon.polygontemplate
+    pointstemplate = "%s,%s " * len(offsets)
+    return [template % (idcell, pointstemplate % points, fillcolor,
+                        "; stroke:none")
+            for points, fillcolor in zip(zip(*vertices), fillcolors)]
+
+
+def renderticks(xs, ys, fontsize, labels, vertical=False):
+    """
+    Returns the SVG code of the numbering of an axis. Each tick is written
+    as a C{Linetext} object, or as a C{Linetextvertical} object if
+    C{vertical} is specified, placed at the coordinates given by C{xs} and
+    C{ys}.
+
+    @param xs: X-coordenates of the ticks
+    @type xs: C{list of number}
+    @param ys: Y-coordenates of the ticks
+    @type ys: C{list of number}
+    @param fontsize: is the font size of the labels
+    @type fontsize: C{number}
+    @param labels: is the text written next to each tick
+    @type labels: C{list}
+    @param vertical: if specified the ticks belong to the horizontal axis and
+    its labels are written in vertical direction
+    @type vertical: C{boolean}
+    @return: SVG source code of each tick.
+    @rtype: C{list of string}
+    """
+    linetemplate = Line.linetemplate
+    fontsize = formatnumber(fontsize)
+    if vertical:
+        # Linetextvertical: a text without width, so it is not translated
+        texttemplate = Verticaltext.verticaltexttemplate
+        return [linetemplate % (xorigin, yorigin, xorigin, yend, "black", 2,
+                                "") +
+                texttemplate % (xorigin, ytext, "0", fontsize, label)
+                for xorigin, yorigin, yend, ytext, label in
+                zip(formatnumbers(xs), formatnumbers(ys),
+                    formatnumbers([yorigin + TICKLENGTH for yorigin in ys]),
+                    formatnumbers([yorigin + TICKTEXTVERTICAL
+                                   for yorigin in ys]),
+                    labels)]
+    texttemplate = Text.texttemplate
+    return [linetemplate % (xline, yorigin, xorigin, yorigin, "black", 2, "") +
+            texttemplate % ("text", xtext, yorigin, fontsize, "black", label)
+            for xline, xtext, xorigin, yorigin, label in
+            zip(formatnumbers([int(xorigin) - TICKLENGTH for xorigin in xs]),
+                formatnumbers([int(xorigin) - TICKTEXT for xorigin in xs]),
+                formatnumbers(xs), formatnumbers([int(yorigin) for yorigin in ys]),
+                labels)]
+
+
+def rendergridlines(xs, ys, endxs, endys):
+    """
+    Returns the SVG code of the background lines drawn when the grid of a
+    chart is specified, with the style of a C{Line} object whose
+    C{ygridline} is "yes".
+
+    @param xs: initial X-coordenates of the lines
+    @type xs: C{list of number}
+    @param ys: initial Y-coordenates of the lines
+    @type ys: C{list of number}
+    @param endxs: final X-coordenates of the lines
+    @type endxs: C{list of number}
+    @param endys: final Y-coordenates of the lines
+    @type endys: C{list of number}
+    @return: SVG source code of each line.
+    @rtype: C{list of string}
+    """
+    template = Line.linetemplate
+    dashpart = Line.linedashpart % "4, 4, 4, 4"
+    return [template % (xorigin, yorigin, endx, endy, "gainsboro", 2,
+                        dashpart)
+            for xorigin, yorigin, endx, endy in
+            zip(formatnumbers(xs), formatnumbers(ys), formatnumbers(endxs),
+                formatnumbers(endys))]
+
+
+def rendercolumns(xtexts, ytexts, heights, width, xs, ys, fillcolor,
+                  idprefix, vals):
+    """
+    Returns the SVG code of the bars of a bar diagram with the same output of
+    a C{Column} object for each bar. The identifier of each bar is the
+    C{idprefix} followed by its position in the lists.
+
+    @param xtexts: is the text at the bottom of each bar
+    @type xtexts: C{list of string}
+    @param ytexts: is the text above each bar
+    @type ytexts: C{list of string}
+    @param heights: is the height of each bar
+    @type heights: C{list of number}
+    @param width: is the width of the bars
+    @type width: C{number}
+    @param xs: X-coordenates of the initial points of the bars
+    @type xs: C{list of number}
+    @param ys: Y-coordenates of the initial points of the bars
+    @type ys: C{list of number}
+    @param fillcolor: is the fill color of the bars
+    @type fillcolor: C{string}
+    @param idprefix: is the prefix of the identifier of each bar
+    @type idprefix: C{string}
+    @param vals: is true if the bars need extra top text, else False.
+    @type vals: C{boolean}
+    @return: SVG source code of each bar.
+    @rtype: C{list of string}
+    """
+    offset = 10
+    fontsize = 13
+    recttemplate = Rectangle.recttemplate
+    texttemplate = Text.texttemplate
+    verticaltexttemplate = Verticaltext.verticaltexttemplate
+    translate = formatnumber(int(width) / 2)
+    textwidth = formatnumber(width)
+    columns = []
+    for cont in range(len(xs)):
+        xorigin = xs[cont]
+        yorigin = ys[cont]
+        off = formatnumber(int(xorigin) + (int(width) / 2 - offset))
+        bottom = formatnumber(int(yorigin) + (2 * offset) + int(heights[cont]))
+        string = recttemplate % ("%s%d" % (idprefix, cont),
+                                 formatnumber(xorigin), formatnumber(yorigin),
+                                 formatnumber(heights[cont]), textwidth, 1,
+                                 "black", fillcolor, " ")
+        if vals:
+            string += texttemplate % ("text", off,
+                                      formatnumber(int(yorigin) - offset),
+                                      fontsize, "black", ytexts[cont])
+        if int(width) > 25:
+            string += texttemplate % ("text", off, bottom, fontsize, "black",
+                                      xtexts[cont])
+        else:
+            string += verticaltexttemplate % (off, bottom, translate,
+                                              fontsize, xtexts[cont])
+        columns.append(string)
+    return columns
+
+
+###############################################################################
+# Svgelements Objects: Scene Graph
+###############################################################################
+
+
+class Svgcode:
+    """
+    Node of the scene graph that holds SVG source code already written, like
+    the comments or the scripts of a chart.
+    """
+
+    def __init__(self, code):
+        self.code = code
+        """@ivar: is the SVG source code of the node
+        @type: C{string}"""
+
+    def printsvg(self):
+        """
+        Returns the SVG source code stored in the node.
+
+        @return: SVG source code of the node.
+        @rtype: C{string}
+        """
+        return self.code
+
+
+###############################################################################
+
+
+class Batch:
+    """
+    Node of the scene graph that holds a set of shapes written by one of the
+    batched renderers. The renderer and its arguments (coordinates, sizes,
+    colors...) are stored in the node and the shapes are only written when
+    the node is serialized, so the geometry can be inspected or modified
+    before.
+
+    \>>> points = Batch(rendercircles, [xs, ys, 2, 1, "black", "red"],
+    ...                "points")
+    ... points.printsvg()
+    """
+
+    def __init__(self, renderer, arguments, idbatch=""):
+        self.renderer = renderer
+        """@ivar: is the function that returns the list of SVG code of the
+        shapes
+        @type: C{function}"""
+        self.arguments = arguments
+        """@ivar: is the list of arguments of the renderer
+        @type: C{list}"""
+        self.idbatch = idbatch
+        """@ivar: is the identifier of the node in the scene graph. It is not
+        written in the SVG document.
+        @type: C{string}"""
+
+    def getshapes(self):
+        """
+        Returns the SVG code of each shape of the node.
+
+        @return: SVG source code of each shape.
+        @rtype: C{list of string}
+        """
+        return self.renderer(*self.arguments)
+
+    def itersvg(self):
+        """
+        Returns an iterator over the SVG code of each shape of the node.
+
+        @return: SVG source code of each shape.
+        @rtype: C{iterator}
+        """
+        return iter(self.getshapes())
+
+    def printsvg(self):
+        """
+        Returns a string with the SVG code of all the shapes of the node.
+
+        @return: SVG source code of the Batch object.
+        @rtype: C{string}
+        """
+        return "".join(self.getshapes())
+
+
+###############################################################################
+
+
+class Group:
+    """
+    Node of the scene graph of a chart. A group contains elements (any object
+    with a printsvg method), batches of shapes and other groups, so the chart
+    is kept in memory as a tree that can be inspected and modified before
+    writing it.
+
+    The SVG code of each child is kept once written. When a child is modified
+    through the C{update} method only that child is written again, and the
+    groups above it are told through the C{touch} method.
+
+    If the group has an identifier or a style it is written as a C{<g>}
+    element, otherwise only the code of its children is written.
+
+    \>>> scene = Group("chart")
+    ... axis = scene.append(Line(100, 100, 100, 300))
+    ... scene.printsvg()
+    ... scene.update(axis, endyline=400)
+    ... scene.printsvg()
+    """
+
+    grouptemplate = "<g%s%s>\n"
+    """@cvar: is the precompiled SVG template of the opening tag of the group.
+    It is filled with the identifier part and the style part of the group.
+    @type: C{string}"""
+    groupidpart = " id=\"%s\""
+    """@cvar: is the template part added to the group when it has an
+    identifier.
+    @type: C{string}"""
+    groupstylepart = " style=\"%s\""
+    """@cvar: is the template part added to the group when it has a style.
+    @type: C{string}"""
+
+    def __init__(self, idgroup="", style="", children=None):
+        self.idgroup = idgroup
+        """@ivar: is the identifier of the group in the SVG document
+        @type: C{string}"""
+        self.style = style
+        """@ivar: is the style of the group in the SVG document
+        @type: C{string}"""
+        self.children = []
+        """@ivar: is the list of children of the group
+        @type: C{list}"""
+        self.svgcache = []
+        """@ivar: is the SVG code of each child of the group, or None if the
+        child has not been written since its last modification
+        @type: C{list of string}"""
+        self.parent = None
+        """@ivar: is the group that contains this group
+        @type: C{Group}"""
+        if children is not None:
+            for child in children:
+                self.append(child)
+
+    def append(self, child):
+        """
+        Adds an element, batch or group at the end of the group.
+
+        @param child: is the node to add
+        @type child: C{object with a printsvg method}
+        @return: the node added
+        @rtype: C{object}
+        """
+        if isinstance(child, Group):
+            child.parent = self
+        self.children.append(child)
+        self.svgcache.append(None)
+        self.touch()
+        return child
+
+    def touch(self, child=None):
+        """
+        Marks as modified the SVG code of a child of the group, or of the group
+        itself if no child is given, and of the groups above it.
+
+        @param child: is the modified child
+        @type child: C{object}
+        """
+        if child is not None:
+            for cont in range(len(self.children)):
+                if self.children[cont] is child:
+                    self.svgcache[cont] = None
+        if self.parent is not None:
+            self.parent.touch(self)
+
+    def update(self, child, **attributes):
+        """
+        Modifies the attributes of a child of the group and marks it so that
+        only its SVG code is written again.
+
+        @param child: is the child to modify
+        @type child: C{object}
+        @param attributes: are the new values of the attributes of the child
+        @type attributes: C{dictionary}
+        """
+        for name in attributes:
+            setattr(child, name, attributes[name])
+        self.touch(child)
+
+    def getelementbyid(self, idelement):
+        """
+        Returns the first node of the tree, in document order, whose
+        identifier is C{idelement}, or None if there is not any.
+
+        @param idelement: is the identifier to search
+        @type idelement: C{string}
+        @return: the node found
+        @rtype: C{object}
+        """
+        for child in self.children:
+            for attribute in ("idgroup", "idbatch", "idlpath", "idpath",
+                              "idpolygon", "idrect", "idtext"):
+                if getattr(child, attribute, None) == idelement:
+                    return child
+            if isinstance(child, Group):
+                found = child.getelementbyid(idelement)
+                if found is not None:
+                    return found
+        return None
+
+    def gettags(self):
+        """
+        Returns the opening and closing tags of the group, empty if the group
+        has neither identifier nor style.
+
+        @rtype: C{string,string}
+        """
+        if self.idgroup == "" and self.style == "":
+            return "", ""
+        idpart = stylepart = ""
+        if self.idgroup != "":
+            idpart = self.groupidpart % self.idgroup
+        if self.style != "":
+            stylepart = self.groupstylepart % self.style
+        return self.grouptemplate % (idpart, stylepart), "</g>\n"
+
+    def itersvg(self):
+        """
+        Returns an iterator over the SVG code of the group in small pieces, so
+        that a big chart can be written to a file without building the whole
+        string in memory. The code kept of each child is used when present but
+        the pieces are not kept.
+
+        @return: SVG source code of the group.
+        @rtype: C{iterator}
+        """
+        begin, end = self.gettags()
+        if begin != "":
+            yield begin
+        for cont in range(len(self.children)):
+            child = self.children[cont]
+            if self.svgcache[cont] is not None:
+                yield self.svgcache[cont]
+            elif hasattr(child, "itersvg"):
+                for piece in child.itersvg():
+                    yield piece
+            else:
+                yield child.printsvg()
+        if end != "":
+            yield end
+
+    def printsvg(self):
+        """
+        Returns a string with the SVG code of the group. Only the children
+        modified since the last call are written again.
+
+        @return: SVG source code of the Group object.
+        @rtype: C{string}
+        """
+        for cont in range(len(self.children)):
+            if self.svgcache[cont] is None:
+                self.svgcache[cont] = self.children[cont].printsvg()
+        begin, end = self.gettags()
+        return begin + "".join(self.svgcache) + end
+
+
+###############################################################################
 # Svgelements Objects: Graphics Classes
 ###############################################################################
 
@@ -1417,9 +2269,9 @@ class Piechart:
         """@ivar: is the width of the outer circle of the pie chart. 
         @type: C{number}"""
         # {Input Data
-        self.listvalues = listvalues
+        self.listvalues = getdataset(listvalues)
         """@ivar: is the list of input data
-        @type: C{list of values}"""
+        @type: C{svgdata.Dataset}"""
         self.values = values
         """@ivar: Identifies the data field that will hold numeric values for
         the pie slices.
@@ -1499,10 +2351,18 @@ class Piechart:
         @return: The sum of input data column specified by the parameter named
         values.
         @rtype: C{number} 
+        @raise InputError: If the values are not numeric or their sum is 0,
+        so the sectors can not be drawn.
         
         """
-        for value in self.listvalues[int(self.values) - 1]:
-            self.sumvalues += int(value)
+        try:
+            self.sumvalues = self.listvalues.getstats(
+                int(self.values) - 1).getsum()
+        except ValueError:
+            raise InputError(NUMERICERROR)
+        if self.sumvalues == 0:
+            raise InputError("The sum of the values of the pie chart can not "
+                             "be 0")
         return self.sumvalues
 
     def valuestoradians(self):
@@ -1522,8 +2382,9 @@ class Piechart:
         @rtype: C{list of float number}
         
         """
-        self.radianvalues = [(int(value) * 2 * pi) / self.sumvalues for value
-                             in self.listvalues[int(self.values) - 1]]
+        self.radianvalues = [(value * 2 * pi) / self.sumvalues for value
+                             in self.listvalues.getstats(int(self.values) -
+                                                         1).getnumbers()]
         return self.radianvalues
 
     def getanimationscript(self):
@@ -1709,6 +2570,85 @@ class Piechart:
        ]]>\n\
       </script>\n\n"
 
+    def getscene(self):
+        """
+        Returns the scene graph of the pie chart: a group with the animation
+        script, the filters, the outer circle, a group for each sector with its
+        percentage, gradient, path and legend, and the title, in this order.
+
+        @return: Scene graph of the pie chart.
+        @rtype: C{Group}
+        """
+        if (len(self.listvalues) != int(self.colorfld)):
+            raise InputError("Incorrect input data, please check the number "
+                             "of columns in the input file")
+        scene = Group()
+        # checking animation
+        if self.animate:
+            scene.append(Svgcode(self.getanimationscript()))
+        # Filter Instances needed to build the optical effects for the pie
+        # chart
+        scene.append(Filter("shadow", 0, 0, 120, 120, "userSpaceOnUse"))
+        scene.append(Filter("lighting", 0, 0, 120, 120))
+        scene.append(Circle(self.xradius, self.yradius, self.radius,
+                            self.strokewidth, "black", "black", self.filtered,
+                            "shadow"))
+        # Draw pie chart
+        pos = self.pos
+        initianradian = self.initianradian
+        yinitorigin = self.yinitorigin
+        for value in self.radianvalues:
+            nameid = "pie" + str(pos)
+            mouseover = "animationOn('" + nameid + "');"
+            mouseout = "animationOff('" + nameid + "');"
+            sector = scene.append(Group())
+            sectorvalue = float(float(self.listvalues[int(self.values) - 1]
+                                      [pos]) / float(self.sumvalues) * 100)
+            sectorvalue = round(sectorvalue, 1)
+            if ((initianradian + value / 2 > (3 * pi / 4)) and
+                    (initianradian + value / 2 < (5 * pi / 4))):
+                distance = self.radius * 1.4
+            else:
+                distance = self.radius * 1.2
+            sector.append(Text(self.xradius + cos(initianradian + value / 2) *
+                               distance, self.yradius +
+                               sin(initianradian + value / 2) * distance, 10,
+                               str(sectorvalue) + "%", "black",
+                               nameid + "%text"))
+            colorgrad = self.listvalues[int(self.colorfld) - 1][pos]
+            sector.append(Svgcode("<!-- ***** PATH,GRADIENT,LEGEND " +
+                                  str(pos) + " ***** -->\n"))
+            sector.append(Gradient(nameid + "gradient", colorgrad, "white", 0,
+                                   100))
+            if self.animate:
+                sector.append(Path(self.xradius, self.yradius, self.radius,
+                                   self.listvalues, self.colorfld, value, pos,
+                                   initianradian, nameid, mouseover, mouseout,
+                                   self.filtered, "lighting"))
+            else:
+                sector.append(Path(self.xradius, self.yradius, self.radius,
+                                   self.listvalues, self.colorfld, value, pos,
+                                   initianradian, nameid, "", "",
+                                   self.filtered, "lighting"))
+            initianradian += value
+            # Checking and drawning the legend
+            if self.legend:
+                if not self.animate:
+                    mouseover = mouseout = ""
+                sector.append(Hcolumn(self.listvalues[int(self.labels) - 1]
+                                      [pos], self.xradius + self.radius +
+                                      self.xtranslatefactor, yinitorigin,
+                                      colorgrad, self.pielegendsize,
+                                      self.pielegendsize, nameid + "legend",
+                                      nameid + "rect", nameid + "text",
+                                      mouseover, mouseout, self.filtered,
+                                      "lighting"))
+            pos += 1
+            yinitorigin += self.pielegendsize + self.yposlegend
+        if self.title != "":
+            scene.append(Text(self.xradius, self.yorigin / 2, 14, self.title))
+        return scene
+
     def printsvg(self):
         """Returns a string with SVG code for pie chart.
              
@@ -1817,106 +2757,9 @@ class Piechart:
         
         """
         try:
-            # Filter Instances needed to build the optical effects for the pie
-            # chart
-            string = ""
-            if (len(self.listvalues) != int(self.colorfld)):
-                try:
-                    raise ValueError
-                except ValueError:
-                    print("Incorrect input data" \
-                          + "\nPlease check the number of columns in the input" \
-                          + "file" + "\nFor help use --help or -h" \
-                          + "\nPysvg 0.0.4-Nov2011\nCopyright (C) 2011 Isabel " \
-                          + "Rodriguez \nYou can see the full documentation at URL:" \
-                          + " \"http://www.pysvg/orgfree.com\"")
-                    sys.exit(2)
-            shadowfilter = Filter("shadow", 0, 0, 120, 120, "userSpaceOnUse")
-            lightingfilter = Filter("lighting", 0, 0, 120, 120)
-            circle = Circle(self.xradius, self.yradius, self.radius,
-                            self.strokewidth, "black", "black", self.filtered,
-                            "shadow")
-            # checking animation
-            if self.animate:
-                string += self.getanimationscript()
-                # Draw filters
-            string += shadowfilter.printsvg() + lightingfilter.printsvg() + \
-                      circle.printsvg()
-            # Draw pie chart
-            for value in self.radianvalues:
-                nameid = "pie" + str(self.pos)
-                mouseover = "animationOn('" + nameid + "');"
-                mouseout = "animationOff('" + nameid + "');"
-                sectorvalue = float(float(self.listvalues[int(self.values) - 1]
-                                          [self.pos]) / float(self.sumvalues) * 100)
-                sectorvalue = round(sectorvalue, 1)
-                if ((self.initianradian + value / 2 > (3 * pi / 4)) and
-                        (self.initianradian + value / 2 < (5 * pi / 4))):
-                    percentage = Text(self.xradius + cos(self.initianradian +
-                                                         value / 2) * (self.radius * 1.4),
-                                      self.yradius + sin(self.initianradian +
-                                                         value / 2) * (self.radius * 1.4), 10,
-                                      str(sectorvalue) + "%", "black", nameid +
-                                      "%text")
-                else:
-                    percentage = Text(self.xradius + cos(self.initianradian +
-                                                         value / 2) * (self.radius * 1.2),
-                                      self.yradius + sin(self.initianradian +
-                                                         value / 2) * (self.radius * 1.2), 10,
-                                      str(sectorvalue) + "%", "black", nameid +
-                                      "%text")
-                string += percentage.printsvg()
-                colorgrad = self.listvalues[int(self.colorfld) - 1][self.pos]
-                gradient = Gradient(nameid + "gradient", colorgrad,
-                                    "white", 0, 100)
-                string += "<!-- ***** PATH,GRADIENT,LEGEND " + str(self.pos) \
-                          + " ***** -->\n" + gradient.printsvg()
-                if self.animate:
-                    piesector = Path(self.xradius, self.yradius, self.radius,
-                                     self.listvalues, self.colorfld, value,
-                                     self.pos, self.initianradian, nameid,
-                                     mouseover, mouseout, self.filtered, "lighting")
-                else:
-                    piesector = Path(self.xradius, self.yradius, self.radius,
-                                     self.listvalues, self.colorfld, value,
-                                     self.pos, self.initianradian, nameid, "", "",
-                                     self.filtered, "lighting")
-                self.initianradian += value
-                string += piesector.printsvg()
-                # Checking and drawning the legend
-                if self.legend:
-                    if self.animate:
-                        pielegend = Hcolumn(self.listvalues[int(self.labels)
-                                                            - 1][self.pos], self.xradius + self.radius
-                                            + self.xtranslatefactor, self.yinitorigin,
-                                            self.listvalues[int(self.colorfld) - 1]
-                                            [self.pos], self.pielegendsize,
-                                            self.pielegendsize, nameid + "legend",
-                                            nameid + "rect", nameid + "text",
-                                            mouseover, mouseout, self.filtered,
-                                            "lighting")
-                    else:
-                        pielegend = Hcolumn(self.listvalues[int(self.labels)
-                                                            - 1][self.pos], self.xradius + self.radius
-                                            + self.xtranslatefactor, self.yinitorigin,
-                                            self.listvalues[int(self.colorfld) - 1]
-                                            [self.pos], self.pielegendsize,
-                                            self.pielegendsize, nameid + "legend",
-                                            nameid + "rect", nameid + "text", "", "",
-                                            self.filtered, "lighting")
-                    string += pielegend.printsvg()
-
-                self.pos += 1
-                self.yinitorigin += self.pielegendsize + self.yposlegend
-            if self.title != "":
-                pietitle = Text(self.xradius, self.yorigin / 2, 14, self.title)
-                string += pietitle.printsvg()
-            return string
+            return self.getscene().printsvg()
         except IndexError:
-            print("The number of columns in data file must be equal to the " \
-                  + "maximum value indicated by the parameters x, y, x2, y2\n" \
-                  + "Please review the input data \nFor help use --help")
-            sys.exit(2)
+            raise InputError(COLUMNSERROR)
 
         ###############################################################################
 
@@ -1971,9 +2814,10 @@ class Bardiagram:
 
     def __init__(self, lval, xcolumn, ycolumn, ycolumn2, barwidth, xorigin,
                  yorigin, delim, vals, yinc, yrange, ygrid, fillcolor,
-                 fillcolor2, name, name2, title, legend):
+                 fillcolor2, name, name2, title, legend, height=None,
+                 yscale=None):
         # {Input Data
-        self.lval = lval
+        self.lval = getdataset(lval)
         """@ivar:Represents the list of input values
         @type:C{list of values}"""
         self.xcolumn = xcolumn
@@ -2043,13 +2887,22 @@ class Bardiagram:
         try:
             self.setmaximumbars(lval)
         except IndexError:
-            print("The number of columns in data file must be equal to the" \
-                  + "maximum value indicated by the parameters x, y, x2, y2\n" \
-                  + "Please review the input data \nFor help use --help" \
-                  + "\nPysvg 0.0.4-Nov2011\nCopyright (C) 2011 Isabel Rodriguez" \
-                  + "\nYou can see the full documentation at URL:" \
-                  + " \"http://www.pysvg/orgfree.com\"")
-            sys.exit(2)
+            raise InputError(COLUMNSERROR)
+        kind = getkind(yscale)
+        minimum = None
+        if kind == "log":
+            minimum = self.lval.getstats(
+                self.lval[int(ycolumn) - 1]).getminimum()
+            if len(lval) == int(ycolumn2):
+                minimum = min(minimum, self.lval.getstats(
+                    self.lval[int(ycolumn2) - 1]).getminimum())
+        self.yscale = Scale(self.heightmaxbar, getlength(height), kind,
+                            minimum)
+        """@ivar: Scale of the y-axis, from zero to the height of the bar
+        higher, with the length C{height} in pixels or a pixel for each unit
+        of the data up to C{svgscale.MAXLENGTH} pixels. If C{yscale} is
+        C{log} the scale is logarithmic.
+        @type: C{Scale}"""
 
     def setmaximumbars(self, lval):
         """
@@ -2061,24 +2914,184 @@ class Bardiagram:
         @rtype: C{string}
         """
         try:
-            self.heightmaxbar = int(lval[int(self.ycolumn) - 1][0])
-            auxmaxbar = int(lval[int(self.ycolumn) - 1][0])
-            for num in range(len(lval[int(self.ycolumn) - 1])):
-                if self.heightmaxbar < int(lval[int(self.ycolumn) - 1][num]):
-                    self.heightmaxbar = int(lval[int(self.ycolumn) - 1][num])
+            self.heightmaxbar = self.lval.getstats(
+                lval[int(self.ycolumn) - 1]).getmaximum()
             if len(lval) == int(self.ycolumn2):
-                for num2 in range(len(lval[int(self.ycolumn2) - 1])):
-                    if auxmaxbar < int(lval[int(self.ycolumn2) - 1][num2]):
-                        auxmaxbar = int(lval[int(self.ycolumn2) - 1][num2])
+                auxmaxbar = self.lval.getstats(
+                    lval[int(self.ycolumn2) - 1]).getmaximum()
                 if self.heightmaxbar < auxmaxbar:
                     self.heightmaxbar = auxmaxbar
             return self.heightmaxbar
         except ValueError:
-            print("The input values must be numeric, can not be strings:" \
-                  + "\nPysvg 0.0.4-Nov2011\nCopyright (C) 2011 Isabel Rodriguez" \
-                  + "\nYou can see the full documentation at URL:" \
-                  + " \"http://www.pysvg/orgfree.com\"")
-            sys.exit(2)
+            raise InputError(NUMERICERROR)
+
+    def getendbars(self):
+        """
+        Auxiliary function that returns the horizontal coordinate where the
+        bars end, which depends on the number of bars to draw.
+
+        @return: Coordinate of the end of the bars.
+        @rtype: C{number}
+        """
+        if len(self.lval) == int(self.ycolumn2):
+            numbars = (len(self.lval[int(self.ycolumn) - 1]) +
+                       len(self.lval[int(self.ycolumn2) - 1]))
+            return int(self.xorigin) + (int(self.delim) *
+                                        (int(numbars) / 2)) + \
+                   (int(self.barwidth) * int(numbars))
+        numbars = len(self.lval[int(self.ycolumn) - 1])
+        return int(self.xorigin) + (int(self.delim) * (int(numbars))) + \
+               (int(self.barwidth) * int(numbars))
+
+    def getbottom(self):
+        """
+        Auxiliary function that returns the pixel of the y-axis where the
+        bars start: the pixel of C{self.yrange}, or the origin of the axis if
+        it is logarithmic.
+
+        @return: Pixel of the bottom of the bars.
+        @rtype: C{number}
+        """
+        if self.yscale.kind == "log":
+            return 0
+        return int(self.yscale.getpixel(self.yrange))
+
+    def getaxisticks(self):
+        """
+        Auxiliary function that returns the values written on the vertical
+        axis: the multiples of the increment C{self.yinc} from the minimum
+        C{self.yrange} while they do not exceed the height of the bar higher.
+        If the increment is not positive or it gives more than
+        C{svgscale.MAXTICKS} values, the values are the round numbers given
+        by C{svgscale.getticks}. A logarithmic axis is numbered with the
+        powers of ten given by C{svgscale.getlogticks}.
+
+        @return: Values of the numbering of the axis
+        @rtype: C{list of number}
+        """
+        if self.yscale.kind == "log":
+            return getlogticks(self.yscale.minimum, self.heightmaxbar)
+        if not isbounded(int(self.yrange), self.heightmaxbar,
+                         int(self.yinc)):
+            return getticks(int(self.yrange), self.heightmaxbar)
+        incs = []
+        counter = 0
+        inc = int(self.yrange)
+        while inc <= self.heightmaxbar:
+            incs.append(inc)
+            counter += 1
+            inc = int(self.yrange) + int(self.yinc) * counter
+        return incs
+
+    def getaxisshapes(self, endbars, fontsize):
+        """
+        Auxiliary function that returns the SVG code of the numbering of the
+        vertical axis, followed by its background line when C{self.ygrid} is
+        "yes".
+
+        @param endbars: Is the coordinate where the bars end.
+        @type endbars: C{number}
+        @param fontsize: is the font size of the numbers.
+        @type fontsize: C{number}
+
+        @return: SVG code of each tick of the y-axis.
+        @rtype: C{list of string}
+        """
+        incs = self.getaxisticks()
+        top = self.yscale.length
+        yticks = [self.yorigin + top - self.yscale.getpixel(inc)
+                  for inc in incs]
+        ticks = renderticks([self.xorigin] * len(incs), yticks, fontsize,
+                            [str(inc) for inc in incs])
+        if self.ygrid == "yes":
+            backgroundlines = rendergridlines([self.xorigin] * len(incs),
+                                              yticks, [endbars] * len(incs),
+                                              yticks)
+            return list(chain.from_iterable(zip(ticks, backgroundlines)))
+        return ticks
+
+    def getbarshapes(self):
+        """
+        Auxiliary function that returns the SVG code of the bars, written at
+        once by the function C{rendercolumns}. When there is a second series
+        its bars are interleaved with the ones of the first series.
+
+        @return: SVG code of each bar.
+        @rtype: C{list of string}
+        """
+        xtexts = self.lval[int(self.xcolumn) - 1]
+        yvalues = Columnview(self.lval[int(self.ycolumn) - 1], 0,
+                             len(xtexts))
+        if len(self.lval) == int(self.ycolumn2):
+            step = int(self.delim) + 2 * int(self.barwidth)
+        else:
+            step = int(self.delim) + int(self.barwidth)
+        xbars = [self.xorigin + int(self.delim) + step * cont
+                 for cont in range(len(xtexts))]
+        top = self.yscale.length
+        bottom = self.getbottom()
+        ypixels = [int(self.yscale.getpixel(yvalue)) for yvalue in yvalues]
+        columns = rendercolumns(xtexts, yvalues,
+                                [ypixel - bottom for ypixel in ypixels],
+                                self.barwidth, xbars,
+                                [self.yorigin + top - ypixel
+                                 for ypixel in ypixels],
+                                self.fillcolor, "colum1_", self.vals)
+        if len(self.lval) == int(self.ycolumn2):
+            yvalues2 = Columnview(self.lval[int(self.ycolumn2) - 1], 0,
+                                  len(xtexts))
+            ypixels2 = [int(self.yscale.getpixel(yvalue2))
+                        for yvalue2 in yvalues2]
+            columns2 = rendercolumns([""] * len(xtexts), yvalues2,
+                                     [ypixel2 - bottom
+                                      for ypixel2 in ypixels2],
+                                     self.barwidth,
+                                     [int(xbar) + int(self.barwidth)
+                                      for xbar in xbars],
+                                     [self.yorigin + top - ypixel2
+                                      for ypixel2 in ypixels2],
+                                     self.fillcolor2, "colum2_", self.vals)
+            return list(chain.from_iterable(zip(columns, columns2)))
+        return columns
+
+    def getscene(self):
+        """
+        Returns the scene graph of the bar chart: a group with the vertical
+        axis, its numbering, the bars, the title and the legend, in this
+        order. The numbering and the bars are batches that will be written
+        when the scene is serialized.
+
+        @return: Scene graph of the bar chart.
+        @rtype: C{Group}
+        """
+        fontsize = 11
+        vbarsizelegend = 15
+        offsetlegend = 25
+        endbars = self.getendbars()
+        scene = Group()
+        # drawing Y-axis lines
+        scene.append(Line(self.xorigin, (self.yorigin + self.yscale.length -
+                                         self.getbottom()),
+                          self.xorigin, self.yorigin))
+        scene.append(Batch(self.getaxisshapes, [endbars, fontsize], "axis"))
+        # Draw the bars
+        scene.append(Batch(self.getbarshapes, [], "bars"))
+        # Draw the title
+        if self.title != "":
+            scene.append(Text(endbars / 2, self.yorigin / 2, 14, self.title))
+        # draw the legend
+        if self.legend:
+            scene.append(Hcolumn(self.name, endbars + offsetlegend,
+                                 self.yorigin, self.fillcolor,
+                                 vbarsizelegend, vbarsizelegend,
+                                 "vbarlegend1", "vbarect1", "vbartext1"))
+            if len(self.lval) == int(self.ycolumn2):
+                scene.append(Hcolumn(self.name2, endbars + offsetlegend,
+                                     self.yorigin + 2 * vbarsizelegend,
+                                     self.fillcolor2, vbarsizelegend,
+                                     vbarsizelegend, "vbarlegend1",
+                                     "vbarrect2", "vbartext2"))
+        return scene
 
     def printsvg(self):
         """
@@ -2193,95 +3206,10 @@ class Bardiagram:
         @return: SVG source code of the bar chart.
         @rtype: C{string}
         """
-        fontsize = 11
-        vbarsizelegend = 15
-        offsetlegend = 25
         try:
-            # drawing Y-axis lines
-            if len(self.lval) == int(self.ycolumn2):
-                numbars = (len(self.lval[int(self.ycolumn) - 1]) +
-                           len(self.lval[int(self.ycolumn2) - 1]))
-                endbars = int(self.xorigin) + (int(self.delim) *
-                                               (int(numbars) / 2)) + (int(self.barwidth) *
-                                                                      int(numbars))
-            else:
-                numbars = len(self.lval[int(self.ycolumn) - 1])
-                endbars = int(self.xorigin) + (int(self.delim) *
-                                               (int(numbars))) + (int(self.barwidth) * int(numbars))
-            vertical_line = Line(self.xorigin, (self.yorigin +
-                                                self.heightmaxbar - int(self.yrange)),
-                                 self.xorigin, self.yorigin)
-            string = vertical_line.printsvg()
-            counter = 0
-            inc = int(self.yrange)
-            while inc <= (self.heightmaxbar):
-                linetext = Linetext(self.xorigin, self.yorigin +
-                                    self.heightmaxbar - inc, fontsize,
-                                    str(inc))
-                string += linetext.printsvg()
-                if self.ygrid == "yes":
-                    backgroundline = Line(self.xorigin, int(self.yorigin) +
-                                          self.heightmaxbar - inc, endbars,
-                                          self.yorigin + self.heightmaxbar -
-                                          inc, self.ygrid)
-                    string += backgroundline.printsvg()
-                counter += 1
-                inc = int(self.yrange) + int(self.yinc) * counter
-                # Draw the bars
-            self.xorigin = self.xorigin + int(self.delim)
-            for cont in range(len(self.lval[int(self.xcolumn) - 1])):
-                # colum text
-                xvalue = self.lval[int(self.xcolumn) - 1][cont]
-                yvalue = self.lval[int(self.ycolumn) - 1][cont]
-                yoriginbar = self.yorigin + self.heightmaxbar - int(yvalue)
-                column = Column(xvalue, yvalue, int(yvalue) - int(self.yrange),
-                                self.barwidth, self.xorigin, yoriginbar,
-                                self.fillcolor, "colum1_" + str(cont),
-                                self.vals)
-                if len(self.lval) == int(self.ycolumn2):
-                    yvalue2 = self.lval[int(self.ycolumn2) - 1][cont]
-                    yoriginbar2 = (self.yorigin + self.heightmaxbar -
-                                   int(yvalue2))
-                    column2 = Column("", yvalue2, int(yvalue2) -
-                                     int(self.yrange), self.barwidth,
-                                     int(self.xorigin) + int(self.barwidth),
-                                     yoriginbar2, self.fillcolor2, "colum2_" +
-                                     str(cont), self.vals)
-                    string += column.printsvg() + column2.printsvg()
-                    self.xorigin = (self.xorigin + int(self.delim) +
-                                    2 * int(self.barwidth))
-                else:
-                    string += column.printsvg()
-                    self.xorigin = (self.xorigin + int(self.delim) +
-                                    int(self.barwidth))
-            # Draw the title
-            if self.title != "":
-                bartitle = Text(endbars / 2, self.yorigin / 2, 14, self.title)
-                string += bartitle.printsvg()
-            # draw the legend
-            if self.legend:
-                namelegend1 = Hcolumn(self.name, endbars + offsetlegend,
-                                      self.yorigin, self.fillcolor,
-                                      vbarsizelegend, vbarsizelegend,
-                                      "vbarlegend1", "vbarect1", "vbartext1")
-                if len(self.lval) == int(self.ycolumn2):
-                    namelegend2 = Hcolumn(self.name2, endbars + offsetlegend,
-                                          self.yorigin + 2 * vbarsizelegend,
-                                          self.fillcolor2, vbarsizelegend,
-                                          vbarsizelegend, "vbarlegend1",
-                                          "vbarrect2", "vbartext2")
-                    string += namelegend1.printsvg() + namelegend2.printsvg()
-                else:
-                    string += namelegend1.printsvg()
-            return string
+            return self.getscene().printsvg()
         except IndexError:
-            print("The number of columns in data file must be equal to the" \
-                  + " maximum value indicated by the parameters x, y, x2, y2\n" \
-                  + "Please review the input data \nFor help use --help" \
-                  + "\nPysvg 0.0.4-Nov2011\nCopyright (C) 2011 Isabel Rodriguez" \
-                  + "\nYou can see the full documentation at URL:" \
-                  + " \"http://www.pysvg/orgfree.com\"")
-            sys.exit(2)
+            raise InputError(COLUMNSERROR)
 
         ###############################################################################
 
@@ -2328,9 +3256,9 @@ class Bardiagram3d:
 
     def __init__(self, lval, xcolumn, ycolumn, barwidth, xorigin, yorigin,
                  delim, vals, yinc, yrange, ygrid, filtered, fillcolor, title,
-                 legend, name):
+                 legend, name, height=None, yscale=None):
         # {Input Data
-        self.lval = lval
+        self.lval = getdataset(lval)
         """@ivar:Represents the list of input values
         @type:C{list of values}"""
         self.xcolumn = xcolumn
@@ -2396,13 +3324,19 @@ class Bardiagram3d:
         try:
             self.setmaximumbars(lval[int(ycolumn) - 1])
         except IndexError:
-            print("The number of values of the parameters x, y or y2 must" \
-                  + " be equal, please review the input data" \
-                  + "\nFor help use --help" \
-                  + "\nPysvg 0.0.4-Nov2011\nCopyright (C) 2011 Isabel Rodriguez" \
-                  + "\nYou can see the full documentation at URL:" \
-                  + " \"http://www.pysvg/orgfree.com\"")
-            sys.exit(2)
+            raise InputError(COLUMNSERROR)
+        kind = getkind(yscale)
+        minimum = None
+        if kind == "log":
+            minimum = self.lval.getstats(
+                self.lval[int(ycolumn) - 1]).getminimum()
+        self.yscale = Scale(self.heightmaxbar, getlength(height), kind,
+                            minimum)
+        """@ivar: Scale of the y-axis, from zero to the height of the bar
+        higher, with the length C{height} in pixels or a pixel for each unit
+        of the data up to C{svgscale.MAXLENGTH} pixels. If C{yscale} is
+        C{log} the scale is logarithmic.
+        @type: C{Scale}"""
 
     def setmaximumbars(self, lval):
         """
@@ -2416,17 +3350,165 @@ class Bardiagram3d:
         @rtype: C{string}
         """
         try:
-            self.heightmaxbar = int(lval[0])
-            for num in range(len(lval)):
-                if self.heightmaxbar < int(lval[num]):
-                    self.heightmaxbar = int(lval[num])
+            self.heightmaxbar = self.lval.getstats(lval).getmaximum()
             return self.heightmaxbar
         except ValueError:
-            print("The input values must be numeric, can not be strings" \
-                  + "\nPysvg 0.0.4-Nov2011\nCopyright (C) 2011 Isabel Rodriguez" \
-                  + "\nYou can see the full documentation at URL:" \
-                  + " \"http://www.pysvg/orgfree.com\"")
-            sys.exit(2)
+            raise InputError(NUMERICERROR)
+
+    def getbottom(self):
+        """
+        Auxiliary function that returns the pixel of the y-axis where the
+        bars start: the pixel of C{self.yrange}, or the origin of the axis if
+        it is logarithmic.
+
+        @return: Pixel of the bottom of the bars.
+        @rtype: C{number}
+        """
+        if self.yscale.kind == "log":
+            return 0
+        return int(self.yscale.getpixel(self.yrange))
+
+    def getaxisticks(self):
+        """
+        Auxiliary function that returns the values written on the vertical
+        axis: the multiples of the increment C{self.yinc} from the minimum
+        C{self.yrange} while they do not exceed the height of the bar higher.
+        If the increment is not positive or it gives more than
+        C{svgscale.MAXTICKS} values, the values are the round numbers given
+        by C{svgscale.getticks}. A logarithmic axis is numbered with the
+        powers of ten given by C{svgscale.getlogticks}.
+
+        @return: Values of the numbering of the axis
+        @rtype: C{list of number}
+        """
+        if self.yscale.kind == "log":
+            return getlogticks(self.yscale.minimum, self.heightmaxbar)
+        if not isbounded(int(self.yrange), self.heightmaxbar,
+                         int(self.yinc)):
+            return getticks(int(self.yrange), self.heightmaxbar)
+        incs = []
+        counter = 0
+        inc = int(self.yrange)
+        while inc <= self.heightmaxbar:
+            incs.append(inc)
+            counter += 1
+            inc = int(self.yrange) + int(self.yinc) * counter
+        return incs
+
+    def getaxisshapes(self, endbars, offset, fontsize):
+        """
+        Auxiliary function that returns the SVG code of the numbering of the
+        vertical axis, followed by the background lines of the z-axis and the
+        x-axis when C{self.ygrid} is "yes".
+
+        @param endbars: Is the coordinate where the bars end.
+        @type endbars: C{number}
+        @param offset: Is the depth of the three dimensional elements.
+        @type offset: C{number}
+        @param fontsize: is the font size of the numbers.
+        @type fontsize: C{number}
+
+        @return: SVG code of each tick of the y-axis.
+        @rtype: C{list of string}
+        """
+        incs = self.getaxisticks()
+        top = self.yscale.length
+        yticks = [self.yorigin + top - self.yscale.getpixel(inc)
+                  for inc in incs]
+        ticks = renderticks([self.xorigin] * len(incs), yticks, fontsize,
+                            [str(inc) for inc in incs])
+        if self.ygrid == "yes":
+            # z-axis and x-axis background lines
+            ydepths = [int(ytick) - offset for ytick in yticks]
+            backgroundlines1 = rendergridlines([self.xorigin] * len(incs),
+                                               yticks, [self.xorigin + offset]
+                                               * len(incs), ydepths)
+            backgroundlines2 = rendergridlines([self.xorigin + offset] *
+                                               len(incs), ydepths,
+                                               [endbars + offset] *
+                                               len(incs), ydepths)
+            return list(chain.from_iterable(zip(ticks, backgroundlines1,
+                                                backgroundlines2)))
+        return ticks
+
+    def getbarshapes(self, offset):
+        """
+        Auxiliary function that returns the SVG code of the filtered bars in
+        three dimensions.
+
+        @param offset: Is the depth of the three dimensional elements.
+        @type offset: C{number}
+
+        @return: SVG code of each bar.
+        @rtype: C{list of string}
+        """
+        bars = []
+        xbar = self.xorigin + int(self.delim)
+        bottom = self.getbottom()
+        for cont in range(len(self.lval[int(self.xcolumn) - 1])):
+            xvalue = self.lval[int(self.xcolumn) - 1][cont]
+            yvalue = self.lval[int(self.ycolumn) - 1][cont]
+            ypixel = int(self.yscale.getpixel(yvalue))
+            yoriginbar = self.yorigin + self.yscale.length - ypixel
+            if int(self.yrange) <= int(yvalue):
+                column3d = Column3d(xvalue, yvalue, ypixel - bottom,
+                                    self.barwidth,
+                                    xbar, yoriginbar,
+                                    self.fillcolor, "colum3d" + str(cont),
+                                    self.filtered, "Darkness", offset,
+                                    self.vals)
+                bars.append(column3d.printsvg())
+            else:
+                raise InputError("Yrange value must be less than the minimum "
+                                 "value of the input data")
+            xbar = xbar + int(self.delim) + int(self.barwidth)
+        return bars
+
+    def getscene(self):
+        """
+        Returns the scene graph of the three dimensional bar chart: a group
+        with the filter, the vertical axis, its numbering, the bottom
+        rectangle, the bars, the title and the legend, in this order. The
+        numbering and the bars are batches that will be written when the scene
+        is serialized.
+
+        @return: Scene graph of the three dimensional bar chart.
+        @rtype: C{Group}
+        """
+        fontsize = 10
+        offset = 15
+        heighwidthlegend = 15
+        scene = Group()
+        # Create the filter for rectangle3d element
+        scene.append(Filter("Darkness", 0, 0, 120, 120, "userSpaceOnUse"))
+        # Draw the axis in three dimensions
+        numbars = len(self.lval[0])
+        endbars = int(self.xorigin) + (int(self.delim) * int(numbars)) + \
+                  (int(self.barwidth) * int(numbars))
+        bottom = self.yorigin + self.yscale.length - self.getbottom()
+        scene.append(Line(self.xorigin, self.yorigin, self.xorigin, bottom,
+                          "no"))
+        # Draw the number of the Y axis
+        scene.append(Batch(self.getaxisshapes, [endbars, offset, fontsize],
+                           "axis"))
+        # draw filtered bottom rectangle
+        scene.append(Rectangle3d(int(self.yinc) / 2, endbars - self.xorigin,
+                                 self.xorigin, bottom, "grey",
+                                 "rbottom", self.filtered, "Darkness",
+                                 offset))
+        # draw filtered bars in three dimensions
+        scene.append(Batch(self.getbarshapes, [offset], "bars"))
+        # Draw the title
+        if self.title != "":
+            scene.append(Text(endbars / 2, self.yorigin / 2, 14, self.title))
+        # Draw the legend
+        if self.legend:
+            scene.append(Hcolumn(self.name, endbars + 2 * offset,
+                                 (self.yorigin + self.yscale.length) / 2,
+                                 self.fillcolor, heighwidthlegend,
+                                 heighwidthlegend, "vbar3dlegend",
+                                 "vba3drect", "vbar3dtext"))
+        return scene
 
     def printsvg(self):
 
@@ -2475,12 +3557,9 @@ class Bardiagram3d:
                 ...                    fillcolor, "colum3d" + str(cont),
                 ...                    filtered, "Darkness", offset, vals) 
                 ...    else:
-                ...         try:
-                ...             raise ValueError
-                ...         except ValueError:
-                ...         print "yrange value must be less than the minimum
-                ...         value of the input data"
-                ...         sys.exit(2)
+                ...         raise InputError("Yrange value must be less "
+                ...                          "than the minimum value of the "
+                ...                          "input data")
 
             - If the value of the minimum range of vertical axis is less 
               than any of the values of the input data, an exception occurs
@@ -2498,106 +3577,101 @@ class Bardiagram3d:
         @return: SVG source code of the bar chart.
         @rtype: C{string}   
         
-        @raise ValueError: If the value of the minimum range of vertical axis
+        @raise InputError: If the value of the minimum range of vertical axis
         is less than any of the values of the input data.      
               
         """
-        fontsize = 10
-        offset = 15
-        heighwidthlegend = 15
         try:
-            # Create the filter for rectangle3d element
-            darknessfilter = Filter("Darkness", 0, 0, 120, 120,
-                                    "userSpaceOnUse")
-            string = darknessfilter.printsvg()
-            # Draw the axis in three dimensions
-            numbars = len(self.lval[0])
-            endbars = int(self.xorigin) + (int(self.delim) * int(numbars)) + \
-                      (int(self.barwidth) * int(numbars))
-            vertical_line = Line(self.xorigin, self.yorigin, self.xorigin,
-                                 self.yorigin + self.heightmaxbar -
-                                 int(self.yrange), "no")
-            string += vertical_line.printsvg()
-            # Draw the number of the Y axis
-            counter = 0
-            inc = int(self.yrange)
-            while inc <= self.heightmaxbar:
-                linetext = Linetext(self.xorigin, self.yorigin +
-                                    self.heightmaxbar - inc, fontsize,
-                                    str(inc))
-                string += linetext.printsvg()
-                if self.ygrid == "yes":
-                    backgroundline1 = Line(self.xorigin, int(self.yorigin) +
-                                           self.heightmaxbar - inc, self.xorigin
-                                           + offset, int(self.yorigin) +
-                                           self.heightmaxbar - inc - offset,
-                                           self.ygrid)
-                    backgroundline2 = Line(self.xorigin + offset,
-                                           int(self.yorigin) + self.heightmaxbar
-                                           - inc - offset, endbars + offset,
-                                           int(self.yorigin) + self.heightmaxbar
-                                           - inc - offset, self.ygrid)
-                    string += backgroundline1.printsvg() + \
-                              backgroundline2.printsvg()
-                counter += 1
-                inc = int(self.yrange) + int(self.yinc) * counter
-
-                # draw filtered bottom rectangle
-            rect_bottom3d = Rectangle3d(int(self.yinc) / 2, endbars -
-                                        self.xorigin, self.xorigin,
-                                        self.yorigin + self.heightmaxbar -
-                                        int(self.yrange), "grey", "rbottom",
-                                        self.filtered, "Darkness", offset)
-            string += rect_bottom3d.printsvg()
-            # draw filtered bars in three dimensions
-            self.xorigin = self.xorigin + int(self.delim)
-            for cont in range(len(self.lval[int(self.xcolumn) - 1])):
-                xvalue = self.lval[int(self.xcolumn) - 1][cont]
-                yvalue = self.lval[int(self.ycolumn) - 1][cont]
-                yoriginbar = self.yorigin + self.heightmaxbar - int(yvalue)
-                if int(self.yrange) <= int(yvalue):
-                    column3d = Column3d(xvalue, yvalue, int(yvalue) -
-                                        int(self.yrange), self.barwidth,
-                                        self.xorigin, yoriginbar,
-                                        self.fillcolor, "colum3d" + str(cont),
-                                        self.filtered, "Darkness", offset,
-                                        self.vals)
-                    string += column3d.printsvg()
-                else:
-                    try:
-                        raise ValueError
-                    except ValueError:
-                        print("Yrange value must be less than the minimum" \
-                              + "value of the input data" + "\npysvg 0.0.4-Nov2011" \
-                              + "\nCopyright (C) 2011 Isabel Rodriguez" \
-                              + "\nYou can see the full documentation at URL:" \
-                              + " \"http://www.pysvg/orgfree.com\"")
-                        sys.exit(2)
-
-                self.xorigin = self.xorigin + int(self.delim) + \
-                               int(self.barwidth)
-            # Draw the title
-            if self.title != "":
-                bar3dtitle = Text(endbars / 2, self.yorigin / 2, 14,
-                                  self.title)
-                string += bar3dtitle.printsvg()
-                # Draw the legend
-            if self.legend:
-                legend3d = Hcolumn(self.name, endbars + 2 * offset,
-                                   (self.yorigin + self.heightmaxbar) / 2,
-                                   self.fillcolor, heighwidthlegend,
-                                   heighwidthlegend, "vbar3dlegend",
-                                   "vba3drect", "vbar3dtext")
-                string += legend3d.printsvg()
-            return string
+            return self.getscene().printsvg()
         except IndexError:
-            print("The number of columns in data file must be equal to the " \
-                  + "maximum value indicated by the parameters x, y, x2, y2\n" \
-                  + "Please review the input data \nFor help use --help" \
-                  + "\npysvg 0.0.4-Nov2011\nCopyright (C) 2011 Isabel Rodriguez" \
-                  + "\nYou can see the full documentation at URL:" \
-                  + " \"http://www.pysvg/orgfree.com\"")
-            sys.exit(2)
+            raise InputError(COLUMNSERROR)
+
+        ###############################################################################
+
+
+class Series:
+    """
+    A series of points of a scatter plot or a line chart: the columns of the
+    input data that hold its X and Y components and the style of its points,
+    its dotted line and its legend.
+
+    The series do not hold any value, all of them read their columns from
+    the dataset of the chart, so many series can share the same X column
+    without copying it and the statistics of each column are computed once::
+
+        \>>> series = [Series(1, 2, "circle", "red", "January"),
+        ...           Series(1, 3, "square", "blue", "February")]
+
+    The series that are not styled take the symbols and colours of the
+    class variables C{symbols} and C{colors} in turn, see C{getstyles}.
+    """
+
+    symbols = ("circle", "square", "triangle", "diamond", "invertedtriangle")
+    """@cvar: Symbols given in turn to the series that are not styled.
+    @type: C{tuple of string}"""
+    colors = ("red", "blue", "green", "orange", "purple", "brown", "magenta",
+              "teal", "olive", "gray")
+    """@cvar: Colours given in turn to the series that are not styled.
+    @type: C{tuple of string}"""
+
+    def __init__(self, xcolumn, ycolumn, sym="circle", color="red", name="",
+                 fillcolor="none"):
+        self.xcolumn = int(xcolumn)
+        """@ivar: Number of the column of the X component, from 1.
+        @type: C{number}"""
+        self.ycolumn = int(ycolumn)
+        """@ivar: Number of the column of the Y component, from 1.
+        @type: C{number}"""
+        if self.xcolumn < 1 or self.ycolumn < 1:
+            raise ValueError("The columns of a series start at 1")
+        self.sym = sym
+        """@ivar: Shape of the points of the series
+        @type: C{circle or square or triangle or diamond or invertedtriangle}
+        """
+        self.color = color
+        """@ivar: Colour of the points, the lines and the legend
+        @type: C{string}"""
+        self.name = name
+        """@ivar: Legend label of the series
+        @type: C{string}"""
+        self.fillcolor = fillcolor
+        """@ivar: Fill colour of the lower area of the dotted line
+        @type: C{string}"""
+
+    def getstyles(cls, position):
+        """
+        Returns the symbol and the colour of the series that is in the given
+        position of a chart, from 0, when they are not specified.
+
+        @param position: is the position of the series in the chart
+        @type position: C{number}
+        @return: symbol and colour of the series
+        @rtype: C{(string, string)}
+        """
+        return (cls.symbols[position % len(cls.symbols)],
+                cls.colors[position % len(cls.colors)])
+    getstyles = classmethod(getstyles)
+
+    def getid(prefix, position):
+        """
+        Returns the identifier of an element drawn for the series that is in
+        the given position of a chart, from 0: the prefix for the first
+        series and the prefix followed by the number of the series, from 2,
+        for the other ones.
+
+        \>>> [Series.getid("regline", cont) for cont in range(3)]
+        ... ['regline', 'regline2', 'regline3']
+
+        @param prefix: is the identifier of the element of the first series
+        @type prefix: C{string}
+        @param position: is the position of the series in the chart
+        @type position: C{number}
+        @rtype: C{string}
+        """
+        if position == 0:
+            return prefix
+        return prefix + str(position + 1)
+    getid = staticmethod(getid)
 
         ###############################################################################
 
@@ -2693,13 +3767,32 @@ class Scatterplot:
         -    B{a=S{Delta}y-b*S{Delta}x}: intercept point.        
         -    B{b=(S{sigma}xy/(S{sigma}x*S{sigma}x))}: is the slope of the 
              regression line.
+
+    Series
+    ------
+    The chart draws any number of series of points given as a list of
+    L{Series}, each one with its own columns and style. If the list is not
+    given the chart draws the two series of the arguments C{xcolumn},
+    C{ycolumn}, C{ptsym}... and C{xcolumn2}, C{pt2sym}..., the second one
+    only if the input data has more columns than C{xcolumn2}.
+
+    Density map
+    -----------
+    When the points are too many to be told apart, the chart can draw a
+    density map instead of the points (module C{svgdensity}): the plane is
+    divided in squares or hexagons and each cell with points is filled with
+    the colour of its number of points, explained by a legend at the right
+    of the chart. With the method C{raster} the map is a PNG image of the
+    pixels of the chart, drawn under the axes.
     """
 
     def __init__(self, lval, xorigin, yorigin, xcolumn, ycolumn, xcolumn2,
                  ycolumn2, yinc, ptsize, ptsym, pt2sym, ptcolor,
-                 pt2color, corr, xlabel, ylabel, name, name2, legend, title):
+                 pt2color, corr, xlabel, ylabel, name, name2, legend, title,
+                 corrband=False, series=None, density=None, cull=False,
+                 width=None, height=None, xscale=None, yscale=None):
         # {Input Data
-        self.lval = lval
+        self.lval = getdataset(lval)
         """@ivar:Represents the list of input values
         @type:C{list of values}"""
         self.xcolumn = xcolumn
@@ -2768,6 +3861,110 @@ class Scatterplot:
         self.corr = corr
         """@ivar: Compute correlation and display regression line.
         @type: C{boolean}"""
+        self.corrband = corrband
+        """@ivar: Display the 95% confidence band of the regression line.
+        @type: C{boolean}"""
+        self.series = series
+        """@ivar: Series drawn by the chart, or None to draw the series given
+        by the columns and the styles of the other arguments.
+        @type: C{list of Series}"""
+        if series is not None and len(series) == 0:
+            raise ValueError("The chart needs at least one series")
+        self.density = getdensity(density)
+        """@ivar: Method (C{hex} or C{grid}) and size in pixels of the cells
+        of the density map drawn instead of the points, or None to draw the
+        points.
+        @type: C{(string, number)}"""
+        self.cull = cull
+        """@ivar: Remove the markers hidden by a later marker of the same
+        series at the same pixel.
+        @type: C{boolean}"""
+        self.width = getlength(width)
+        """@ivar: Length in pixels of the x-axis, or None to draw a pixel
+        for each unit of the data up to C{svgscale.MAXLENGTH} pixels.
+        @type: C{number}"""
+        self.height = getlength(height)
+        """@ivar: Length in pixels of the y-axis, or None as C{width}.
+        @type: C{number}"""
+        self.kinds = (getkind(xscale, True), getkind(yscale))
+        """@ivar: Kinds of the scales of the x-axis and the y-axis,
+        C{linear} or C{log}, or C{time} for the x-axis.
+        @type: C{(string, string)}"""
+        if corr and self.kinds != ("linear", "linear"):
+            raise ValueError("The regression line needs linear axes")
+        self.scales = None
+        """@ivar: Scales of the x-axis and the y-axis, given by
+        C{getscales}.
+        @type: C{(Scale, Scale)}"""
+        self.pixelcolumns = {}
+        """@ivar: Columns of the input data converted to pixels, by key of
+        the column and axis (see C{getpixels}).
+        @type: C{dictionary}"""
+        self.pixelstats = {}
+        """@ivar: Statistics of the columns of pixels, by identity of the
+        column. They are kept by the chart, not by the dataset shared with
+        other charts.
+        @type: C{dictionary}"""
+        for each in series or []:
+            if max(each.xcolumn, each.ycolumn) > len(self.lval):
+                raise ValueError("There is no column " +
+                                 str(max(each.xcolumn, each.ycolumn)))
+
+    def getseries(self):
+        """
+        Returns the list of series drawn by the chart: the list C{self.series}
+        if it is given and otherwise the series of the columns C{xcolumn} and
+        C{ycolumn}, followed by the series of the column C{xcolumn2} and the
+        last column if the input data has more columns than C{xcolumn2}.
+
+        @return: series of the chart
+        @rtype: C{list of Series}
+        """
+        if self.series is not None:
+            return self.series
+        series = [Series(self.xcolumn, self.ycolumn, self.ptsym,
+                         self.ptcolor, self.name)]
+        if (len(self.lval) > int(self.xcolumn2)):
+            series.append(Series(self.xcolumn2, len(self.lval), self.pt2sym,
+                                 self.pt2color, self.name2))
+        return series
+
+    def getcolumns(self, lval, series=None):
+        """
+        Returns the columns of the X and Y components of a series. They are
+        the columns of the dataset, not copies, so the statistics computed
+        for them are shared by all the series that use them.
+
+        @param lval: list of columns of values, used if C{series} is None
+        with the columns C{self.xcolumn} and C{self.ycolumn}
+        @type lval: C{list}
+        @param series: is the series, or None
+        @type series: C{Series}
+
+        @return: X column and Y column
+        @rtype: C{list, list}
+        """
+        if series is None:
+            return lval[int(self.xcolumn) - 1], lval[int(self.ycolumn) - 1]
+        return self.lval[series.xcolumn - 1], self.lval[series.ycolumn - 1]
+
+    def getstatistics(self, lval, series=None):
+        """
+        Returns the statistics of the points given by the X and Y components
+        of a series, computed in a single pass by the module C{svgstats} and
+        kept in the dataset.
+
+        @param lval: list of columns of values
+        @type lval: C{list}
+        @param series: is the series, or None to use the columns C{xcolumn}
+        and C{ycolumn} of C{lval}
+        @type series: C{Series}
+
+        @return: Statistics of the X and Y columns
+        @rtype: C{svgstats.Statistics}
+        """
+        xvalues, yvalues = self.getcolumns(lval, series)
+        return self.lval.getpairstats(xvalues, yvalues)
 
     def getaverage(self, lval):
         """
@@ -2778,17 +3975,14 @@ class Scatterplot:
         @type lval: C{list}
         
         @return: The average of a list of value
-        @rtype: C{number} 
+        @rtype: C{float} 
         """
-        sumlval = 0
-        for num in range(len(lval)):
-            sumlval += int(lval[num])
-        return int(sumlval / len(lval))
+        return self.lval.getstats(lval).getmean()
 
     def getvariance(self, lval):
         """
         Auxiliary function that returns the variance of a list of
-        values given. To do this use the average function as follows:
+        values given:
         
             - B{Var(X)= S{sum}((xi-S{Delta}x)*(xi-S{Delta}x))/n}
         
@@ -2798,70 +3992,95 @@ class Scatterplot:
         @type lval: C{list}
         
         @return: The variance of a list of value
-        @rtype: C{number}                 
+        @rtype: C{float}                 
         """
-
-        var = 0
-        for num in range(len(lval)):
-            var += (int(lval[num]) - int(self.getaverage(lval))) \
-                   * (int(lval[num]) - int(self.getaverage(lval)))
-        return int(var / len(lval))
+        return self.lval.getstats(lval).getvariance()
 
     def getcovariance(self, lval):
         """
-        Auxiliary function that returns the covariance of a list of
-        values given. To do this use the average and the variance
-        function as follows:
+        Auxiliary function that returns the covariance of the X and Y
+        columns of a list of values given:
         
             - B{Cov(X,Y)= S{sum}((xi-S{Delta}x)*(yi-S{Delta}y))/n}
         
         Where I{n} is the lenght of the list.
         
-        @param lval: list of values
+        @param lval: list of columns of values
         @type lval: C{list}
         
         @return: The covariance of a list of value
-        @rtype: C{number}                 
+        @rtype: C{float}                 
         """
-        covar = 0
-        for num in range(len(lval[int(self.xcolumn) - 1])):
-            # covar+=(x-promedioX)*(y-promedioY)
-            covar += (int(lval[int(self.xcolumn) - 1][num]) -
-                      int(self.getaverage(lval[int(self.xcolumn) - 1]))) * \
-                     (int(lval[int(self.ycolumn) - 1][num]) -
-                      int(self.getaverage(lval[int(self.ycolumn) - 1])))
-        return int(covar / len(lval[int(self.xcolumn) - 1]))
+        return self.getstatistics(lval).getcovariance()
 
     # dibuja recta de regression
-    def getregressionline(self, lval):
+    def getregressionline(self, lval, series=None):
 
         """
-        Returns the regression line for a given set of data. To get this list
-        of values using the above functions, variance, average and covariance.
-        The two fundamental parameters to build this line will be:
+        Returns the regression line for a given set of data. The slope and the
+        intercept are computed once from the statistics returned by the
+        function C{getstatistics}:
         
             -    B{a=S{Delta}y-b*S{Delta}x}: intercept point.        
             -    B{b=(S{sigma}xy/(S{sigma}x*S{sigma}x))}: is the slope of the
                  regression line.
+
+        As the line is straight only its two extreme points are returned, at
+        the minimum and the maximum value of X.
         
         @param lval: list of values
         @type lval: C{list}
+        @param series: is the series, or None to use the columns C{xcolumn}
+        and C{ycolumn} of C{lval}
+        @type series: C{Series}
         
         @return: The regression line for input list
         @rtype: C{list}  
         """
+        statistics = self.getstatistics(lval, series)
+        bcomponent = statistics.getslope()
+        acomponent = statistics.getintercept()
+        xstatistics = self.lval.getstats(self.getcolumns(lval, series)[0])
+        xmin = float(xstatistics.getminimum())
+        xmax = float(xstatistics.getmaximum())
+        return [[xmin, acomponent + bcomponent * xmin],
+                [xmax, acomponent + bcomponent * xmax]]
+
+    def getregressionband(self, lval, segments=16, series=None):
+        """
+        Returns the outline of the 95% confidence band of the regression line
+        for a given set of data: the upper limit from the minimum to the
+        maximum value of X followed by the lower limit back to the minimum.
+        The limits are curves, they are drawn with C{segments} straight lines
+        whatever the number of points of the data.
 
-        reglist = []
-        bcomponent = float(self.getcovariance(lval)) / \
-                     float(self.getvariance(lval[int(self.xcolumn) - 1]))
-
-        for cont in range(len(lval[int(self.xcolumn) - 1])):
-            ylist = bcomponent * (float(lval[int(self.xcolumn) - 1][cont]) - \
-                                  float(self.getaverage(lval[int(self.xcolumn) - 1]))) + \
-                    self.getaverage(lval[int(self.ycolumn) - 1])
-
-            reglist.append([float(lval[int(self.xcolumn) - 1][cont]), ylist])
-        return reglist
+        @param lval: list of values
+        @type lval: C{list}
+        @param segments: number of lines of each limit
+        @type segments: C{number}
+        @param series: is the series, or None to use the columns C{xcolumn}
+        and C{ycolumn} of C{lval}
+        @type series: C{Series}
+
+        @return: The outline of the confidence band
+        @rtype: C{list}
+        """
+        statistics = self.getstatistics(lval, series)
+        bcomponent = statistics.getslope()
+        acomponent = statistics.getintercept()
+        xstatistics = self.lval.getstats(self.getcolumns(lval, series)[0])
+        xmin = float(xstatistics.getminimum())
+        xmax = float(xstatistics.getmaximum())
+        upper = []
+        lower = []
+        for cont in range(segments + 1):
+            xvalue = xmin + (xmax - xmin) * cont / segments
+            yvalue = acomponent + bcomponent * xvalue
+            confidence = statistics.getconfidence(xvalue)
+            upper.append([xvalue, yvalue + confidence])
+            lower.append([xvalue, yvalue - confidence])
+        lower.reverse()
+        return upper + lower
 
     def getmaxpoint(self, lval):
         """
@@ -2875,21 +4094,16 @@ class Scatterplot:
                 
         """
         try:
-            maxpoint = int(lval[0])
-            for num in range(len(lval)):
-                if maxpoint < int(lval[num]):
-                    maxpoint = int(lval[num])
-            return maxpoint
+            return self.getstats(lval).getmaximum()
         except ValueError:
-            print("The input values must be numeric, can not be strings" \
-                  + "\npysvg 0.0.4-Nov2011\nCopyright (C) 2011 Isabel Rodriguez" \
-                  + "\nYou can see the full documentation at URL:" \
-                  + " \"http://www.pysvg/orgfree.com\"")
-            sys.exit(2)
+            raise InputError(NUMERICERROR)
 
     def getmaxaxis(self, lval):
         """
-        Returns the maximum value of a two list of data input.
+        Returns the maximum values of the X and Y components of all the
+        series of the chart. The maximum of each column is computed once and
+        kept in the dataset, so the columns shared by several series are
+        read only once.
 
         @param lval: list of values
         @type lval: C{list}
@@ -2898,18 +4112,110 @@ class Scatterplot:
         @rtype: C{number}         
                 
         """
-        ymaxaxis = self.getmaxpoint(lval[int(self.ycolumn) - 1])
-        xmaxaxis = self.getmaxpoint(lval[int(self.xcolumn) - 1])
-        if (len(lval) > int(self.xcolumn2)):
-            ycolumn2 = len(lval)
-            ymaxpoint2 = self.getmaxpoint(lval[int(ycolumn2) - 1])
-            xmaxpoint2 = self.getmaxpoint(lval[int(self.xcolumn2) - 1])
-            if ymaxpoint2 > ymaxaxis:
-                ymaxaxis = ymaxpoint2
-            if xmaxpoint2 > xmaxaxis:
-                xmaxaxis = xmaxpoint2
+        xmaxaxis = ymaxaxis = None
+        for series in self.getseries():
+            ymaxpoint = self.getmaxpoint(lval[series.ycolumn - 1])
+            xmaxpoint = self.getmaxpoint(lval[series.xcolumn - 1])
+            if ymaxaxis is None or ymaxpoint > ymaxaxis:
+                ymaxaxis = ymaxpoint
+            if xmaxaxis is None or xmaxpoint > xmaxaxis:
+                xmaxaxis = xmaxpoint
         return xmaxaxis, ymaxaxis
 
+    def getscales(self):
+        """
+        Returns the scales of the x-axis and the y-axis, from zero to the
+        maximum values given by C{getmaxaxis}, with the lengths
+        C{self.width} and C{self.height} and the kinds C{self.kinds}. The
+        logarithmic scales start at the power of ten below the minimum value
+        of the axis, and the time scales go from the first timestamp to the
+        last one. They are built the first time they are requested.
+
+        @return: scales of the x-axis and the y-axis
+        @rtype: C{(Scale, Scale)}
+        @raise ValueError: If an axis is logarithmic and it has a value that
+        is not positive, or it is a time axis and it has a value that is not
+        a timestamp.
+        """
+        if self.scales is None:
+            maximums = (None, None)
+            if "time" not in self.kinds:
+                maximums = self.getmaxaxis(self.lval)
+            lengths = (self.width, self.height)
+            scales = []
+            for axis, kind in enumerate(self.kinds):
+                columns = [self.lval[(series.xcolumn, series.ycolumn)[axis]
+                                     - 1] for series in self.getseries()]
+                maximum = maximums[axis]
+                minimum = None
+                if kind == "time":
+                    times = [self.lval.getstats(column).gettimes()
+                             for column in columns]
+                    minimum = min([statistics.getminimum()
+                                   for statistics in times])
+                    maximum = max([statistics.getmaximum()
+                                   for statistics in times])
+                elif kind == "log":
+                    minimum = min([self.getstats(column).getminimum()
+                                   for column in columns])
+                if maximum is None:
+                    maximum = max([self.getmaxpoint(column)
+                                   for column in columns])
+                scales.append(Scale(maximum, lengths[axis], kind, minimum))
+            self.scales = tuple(scales)
+        return self.scales
+
+    def getpixels(self, column, axis):
+        """
+        Returns a column of input data converted to pixels of an axis by
+        C{Scale.getpixels}, an array if the numeric backend holds the
+        column. If the scale of the axis is the identity the column is
+        returned unchanged. The values of a time axis are the timestamps of
+        the column, read by C{svgstats.Columnstats.gettimes}. Each column is
+        converted once for each axis.
+
+        @param column: is the column of input data
+        @type column: C{tuple or Columnview}
+        @param axis: is 0 for the x-axis and 1 for the y-axis
+        @type axis: C{number}
+        @return: the pixels of the values of the column
+        @rtype: C{list or array}
+        """
+        scale = self.getscales()[axis]
+        if scale.factor is None:
+            return column
+        key = (self.lval.getkey(column), axis)
+        pixels = self.pixelcolumns.get(key)
+        if pixels is None:
+            statistics = self.lval.getstats(column)
+            if scale.kind == "time":
+                statistics = statistics.gettimes()
+            values = statistics.getarray()
+            if values is False:
+                values = statistics.getnumbers()
+            pixels = scale.getpixels(values)
+            statistics = Columnstats(pixels)
+            if isarray(pixels):
+                statistics.array = pixels
+            self.pixelcolumns[key] = pixels
+            self.pixelstats[id(pixels)] = statistics
+        return pixels
+
+    def getstats(self, column):
+        """
+        Returns the statistics of a column of input data, kept by the
+        dataset, or of a column of pixels given by C{getpixels}, kept by the
+        chart.
+
+        @param column: is the column
+        @type column: C{tuple or Columnview or list or array}
+        @rtype: C{svgstats.Columnstats}
+        """
+        statistics = self.pixelstats.get(id(column))
+        if statistics is None:
+            return self.lval.getstats(column)
+        return statistics
+
     # PARA TRANSFORMAR LA LISTA DE REGRESION A LAS COORDENADAS NORMALES
     def regtocoordenates(self, lval, ymaxpoint):
         """
@@ -2922,7 +4228,8 @@ class Scatterplot:
             >>> Xcoordenate = float(lval[i])
             ... Ycoordenate = float(ymaxpoint) - float(lval[i])
         
-        Where "i" is the position of value within the list.
+        Where "i" is the position of value within the list. The values are
+        converted to pixels by the scales of the axes (C{Scale.map}).
         
         @param lval: list of values
         @type lval: C{list}
@@ -2932,11 +4239,12 @@ class Scatterplot:
         @return: List of SVG coordenates
         @rtype: C{number}
         """
+        xscale, yscale = self.getscales()
         newlpoints = []
         for num in range(len(lval)):
-            xcoordenate = float(lval[num][int(self.xcolumn) - 1])
-            ycoordenate = float(ymaxpoint) \
-                          - float(lval[num][int(self.ycolumn) - 1])
+            xcoordenate = float(xscale.map(lval[num][int(self.xcolumn) - 1]))
+            ycoordenate = float(yscale.map(ymaxpoint)) \
+                          - float(yscale.map(lval[num][int(self.ycolumn) - 1]))
             newlpoints.append([xcoordenate, ycoordenate])
         return newlpoints
 
@@ -2959,29 +4267,353 @@ class Scatterplot:
         @rtype: C{string}
         
         """
-        if sym == "circle":
-            shapepoint = Circle(str(xpoint), str(ypoint), size / 2, 1, "black",
-                                color)
-        elif sym == "square":
-            shapepoint = Rectangle(size, size, str(xpoint - size / 2),
-                                   str(ypoint - size / 2), sym, color)
-        elif sym == "triangle":
-            trianglepoints = [[xpoint, ypoint - size / 2], [xpoint - size / 2,
-                                                            ypoint + size / 2], [xpoint + size / 2,
-                                                                                 ypoint + size / 2]]
-            shapepoint = Polygon(trianglepoints, sym, color)
-        elif sym == "invertedtriangle":
-            invertedtrianglepoints = [[xpoint - size / 2, ypoint - size / 2],
-                                      [xpoint, ypoint + size / 2], [xpoint +
-                                                                    size / 2, ypoint - size / 2]]
-            shapepoint = Polygon(invertedtrianglepoints, sym, color)
-        elif sym == "diamond":
-            diamondpoints = [[xpoint, ypoint - size / 2], [xpoint + size / 2,
-                                                           ypoint], [xpoint, ypoint + size / 2],
-                             [xpoint - size / 2, ypoint]]
-            shapepoint = Polygon(diamondpoints, sym, color)
-        strshape = shapepoint.printsvg()
-        return strshape
+        return rendermarkers([xpoint], [ypoint], sym, color, size)[0]
+
+    def getpointshapes(self, ymaxaxis):
+        """
+        Auxiliary function that returns the SVG code of all the points of the
+        chart. The points of each series are written at once by the function
+        C{rendermarkers} and the points of the series are alternated: the
+        first point of each series, then the second one... Each series draws
+        as many points as the first one at most.
+
+        If C{self.cull} is True, the markers hidden by a later marker of the
+        same series at the same pixel are removed by C{svgsample.cull}
+        before they are written. The rest of the markers keep their order,
+        so the picture does not change.
+
+        @param ymaxaxis: Is the length in pixels of the y-axis.
+        @type ymaxaxis: C{number}
+
+        @return: SVG code of each point.
+        @rtype: C{list of string}
+        """
+        allseries = self.getseries()
+        length = len(self.lval[allseries[0].xcolumn - 1])
+        shapes = []
+        orders = []
+        for cont, series in enumerate(allseries):
+            xpoints, ypoints = self.getcoordenates(
+                self.getpixels(self.lval[series.xcolumn - 1], 0),
+                self.getpixels(self.lval[series.ycolumn - 1], 1),
+                ymaxaxis, length)
+            if self.cull:
+                positions = cull(xpoints, ypoints)
+                xpoints = take(xpoints, positions)
+                ypoints = take(ypoints, positions)
+                # position of each marker in the alternated order
+                orders.append(translate(positions, cont, len(allseries)))
+            shapes.append(rendermarkers(xpoints, ypoints, series.sym,
+                                        series.color, self.ptsize))
+        if len(shapes) == 1:
+            return shapes[0]
+        if self.cull:
+            shapes = list(chain.from_iterable(shapes))
+            return [shapes[position]
+                    for position in argsort(concatenate(orders))]
+        return list(chain.from_iterable(zip(*shapes)))
+
+    def getcoordenates(self, xvalues, yvalues, ymaxaxis, length=None):
+        """
+        Auxiliary function that returns the SVG coordinates of the points
+        given by two columns of input data:
+
+            >>> Xcoordenate = int(xvalue) + int(self.xorigin)
+            ... Ycoordenate = int(self.yorigin) + ymaxaxis - int(yvalue)
+
+        If the numeric backend holds both columns as arrays of integers the
+        coordinates of all the points are computed at once and returned as
+        arrays, that the batched renderers write without converting each
+        value.
+
+        @param xvalues: is the column of the X component, in pixels
+        @type xvalues: C{list}
+        @param yvalues: is the column of the Y component, in pixels
+        @type yvalues: C{list}
+        @param ymaxaxis: Is the length in pixels of the y-axis.
+        @type ymaxaxis: C{number}
+        @param length: is the maximum number of points, by default the
+        length of C{xvalues}
+        @type length: C{number}
+
+        @return: X-coordenates and Y-coordenates of the points
+        @rtype: C{list or array, list or array}
+        """
+        if length is None:
+            length = len(xvalues)
+        xarray = self.getstats(xvalues).getarray()
+        yarray = self.getstats(yvalues).getarray()
+        if isintegral(xarray) and isintegral(yarray):
+            return (translate(xarray[:length], int(self.xorigin)),
+                    translate(yarray[:length], int(self.yorigin) + ymaxaxis,
+                              -1))
+        return ([int(xvalue) + int(self.xorigin)
+                 for xvalue in islice(xvalues, length)],
+                [int(self.yorigin) + ymaxaxis - int(yvalue)
+                 for yvalue in islice(yvalues, length)])
+
+    def getdensitycells(self):
+        """
+        Auxiliary function that returns the cells of the density map of the
+        points of all the series: the coordinates of each cell in pixels
+        and its number of points, given by
+        C{svgdensity.getcells}. The columns are taken as arrays if the
+        numeric backend holds them.
+
+        @return: X coordinates, Y coordinates and counts of the cells
+        @rtype: C{(list, list, list)}
+        """
+        return getcells(self.getdensitypairs(), self.density)
+
+    def getdensitypairs(self):
+        """
+        Auxiliary function that returns the columns of the X and Y
+        components of all the series in pixels, as arrays if the numeric
+        backend holds them or as lists of numbers otherwise.
+
+        @return: X and Y columns of each series
+        @rtype: C{list of (list or array, list or array)}
+        """
+        pairs = []
+        for series in self.getseries():
+            columns = []
+            for axis, column in enumerate((series.xcolumn, series.ycolumn)):
+                statistics = self.getstats(
+                    self.getpixels(self.lval[column - 1], axis))
+                values = statistics.getarray()
+                if values is False:
+                    values = statistics.getnumbers()
+                columns.append(values)
+            pairs.append(tuple(columns))
+        return pairs
+
+    def getrasterimage(self, xmaxaxis, ymaxaxis):
+        """
+        Auxiliary function that returns the density map drawn as a raster:
+        the points of all the series are counted in the pixels of side
+        C{size} of the area of the axes (C{svgdensity.rasterize}) and the
+        counts are written as a PNG image. The time is linear in the number
+        of points and the size of the image depends only on the size of the
+        chart.
+
+        @param xmaxaxis: Is the length in pixels of the x-axis.
+        @type xmaxaxis: C{number}
+        @param ymaxaxis: Is the length in pixels of the y-axis.
+        @type ymaxaxis: C{number}
+
+        @return: the image and the maximum count of a pixel
+        @rtype: C{(Image, number)}
+        """
+        size = self.density[1]
+        width, height = getrastersize(xmaxaxis, ymaxaxis, size)
+        counts = rasterize(self.getdensitypairs(), width, height, size)
+        png, maxcount = getrasterpng(counts, width, height)
+        # each pixel is centred on its value
+        return (Image(self.xorigin - size / 2.0,
+                      self.yorigin + ymaxaxis - (height - 0.5) * size,
+                      width * size, height * size, png, "densityraster"),
+                maxcount)
+
+    def getdensityshapes(self, cells, ymaxaxis):
+        """
+        Auxiliary function that returns the SVG code of the cells of the
+        density map, written at once by the function C{rendercells}. The
+        hexagons are written with two decimals at most.
+
+        @param cells: are the cells returned by C{getdensitycells}
+        @type cells: C{(list, list, list)}
+        @param ymaxaxis: Is the length in pixels of the y-axis.
+        @type ymaxaxis: C{number}
+
+        @return: SVG code of each cell.
+        @rtype: C{list of string}
+        """
+        xs, ys, counts = cells
+        method, size = self.density
+        precision = None
+        if method == "grid":
+            offsets = [(0, -size), (size, -size), (size, 0), (0, 0)]
+        else:
+            half = size * sqrt(3) / 2
+            offsets = [(0, -size), (half, -size / 2.0), (half, size / 2.0),
+                       (0, size), (-half, size / 2.0), (-half, -size / 2.0)]
+            precision = 2
+            if numberprecision is not None:
+                precision = min(precision, numberprecision)
+        return rendercells(translate(xs, int(self.xorigin)),
+                           translate(ys, int(self.yorigin) + ymaxaxis, -1),
+                           offsets,
+                           [RAMP[level] for level in getlevels(counts)],
+                           "densitycell", precision)
+
+    def getaxisticks(self, maxaxis, scale=None):
+        """
+        Auxiliary function that returns the values written on an axis. The
+        first one is the increment C{self.yinc} chosen by the user and it is
+        followed by the multiples of the increment from zero while they do not
+        exceed the maximum value of the axis.
+
+        If the increment is not positive or it gives more than
+        C{svgscale.MAXTICKS} values, the values are the round numbers given
+        by C{svgscale.getticks}. The logarithmic axes are numbered with the
+        powers of ten given by C{svgscale.getlogticks}.
+
+        @param maxaxis: Is the maximum value of the axis.
+        @type maxaxis: C{number}
+        @param scale: is the scale of the axis, or None
+        @type scale: C{Scale}
+
+        @return: Values of the numbering of the axis
+        @rtype: C{list}
+        """
+        if scale is not None and scale.kind == "log":
+            return getlogticks(scale.minimum, maxaxis)
+        if not isbounded(0, maxaxis, int(self.yinc)):
+            return getticks(0, maxaxis)
+        ticks = []
+        inc = self.yinc
+        cont = 0
+        while int(inc) <= maxaxis:
+            ticks.append(inc)
+            inc = int(self.yinc) * cont
+            cont += 1
+        return ticks
+
+    def getaxisshapes(self, xmaxaxis, ymaxaxis, fontsize):
+        """
+        Auxiliary function that returns the SVG code of the numbering of both
+        axes, written at once by the function C{renderticks}. The values are
+        the ones of the data and they are placed at their pixels. A time
+        axis is numbered with the round timestamps given by
+        C{svgscale.gettimeticks}, written by C{svgtime.formattime}.
+
+        @param xmaxaxis: Is the length in pixels of the x-axis.
+        @type xmaxaxis: C{number}
+        @param ymaxaxis: Is the length in pixels of the y-axis.
+        @type ymaxaxis: C{number}
+        @param fontsize: is the font size of the numbers.
+        @type fontsize: C{number}
+
+        @return: SVG code of each tick of the y-axis and the x-axis.
+        @rtype: C{list of string}
+        """
+        xscale, yscale = self.getscales()
+        yticks = self.getaxisticks(yscale.maximum, yscale)
+        if xscale.kind == "time":
+            xticks, unit = gettimeticks(xscale.minimum, xscale.maximum)
+            xlabels = [formattime(xtick, unit) for xtick in xticks]
+        else:
+            xticks = self.getaxisticks(xscale.maximum, xscale)
+            xlabels = xticks
+        return renderticks([self.xorigin] * len(yticks),
+                           [self.yorigin + ymaxaxis - yscale.getpixel(ytick)
+                            for ytick in yticks], fontsize, yticks) + \
+               renderticks([self.xorigin + xscale.getpixel(xtick)
+                            for xtick in xticks],
+                           [self.yorigin + ymaxaxis] * len(xticks), fontsize,
+                           xlabels, True)
+
+    def getscene(self):
+        """
+        Returns the scene graph of the dispersion diagram: a group with the
+        axes, the numbering of the axes, the points, the regression lines, the
+        labels, the legend and the title, in this order. The points and the
+        numbering are batches that will be written when the scene is
+        serialized.
+
+        @return: Scene graph of the scatter plot.
+        @rtype: C{Group}
+        """
+        fontsize = 10
+        scatlegendsize = 7
+        self.ptsize = float(self.ptsize)
+        xscale, yscale = self.getscales()
+        xmaxaxis, ymaxaxis = xscale.length, yscale.length
+        scene = Group()
+        # the raster of the density map is drawn under the axes
+        maxcount = 0
+        if self.density is not None and self.density[0] == "raster":
+            raster, maxcount = self.getrasterimage(xmaxaxis, ymaxaxis)
+            scene.append(raster)
+        # draw lines axis
+        scene.append(Line(self.xorigin, self.yorigin, self.xorigin,
+                          self.yorigin + ymaxaxis, "no"))
+        scene.append(Line(self.xorigin, self.yorigin + ymaxaxis,
+                          self.xorigin + xmaxaxis, self.yorigin + ymaxaxis,
+                          "no"))
+        scene.append(Batch(self.getaxisshapes, [xmaxaxis, ymaxaxis, fontsize],
+                           "axis"))
+
+        # draw points, or the density map of the points
+        if self.density is None:
+            scene.append(Batch(self.getpointshapes, [ymaxaxis], "points"))
+        elif self.density[0] != "raster":
+            cells = self.getdensitycells()
+            scene.append(Batch(self.getdensityshapes, [cells, ymaxaxis],
+                               "density"))
+            maxcount = max(cells[2]) if len(cells[2]) else 0
+
+        # draw regression line
+        allseries = self.getseries()
+        if self.corr and self.corrband:
+            band = scene.append(Group("regband", "fill-opacity:0.2"))
+            for cont, series in enumerate(allseries):
+                band.append(Linepath(self.xorigin, self.yorigin,
+                                     "regband" + str(cont + 1),
+                                     self.regtocoordenates(
+                                         self.getregressionband(
+                                             self.lval, series=series),
+                                         self.getmaxpoint(
+                                             self.lval[series.ycolumn - 1])),
+                                     series.color, series.color))
+        if self.corr:
+            for cont, series in enumerate(allseries):
+                lpoints = self.regtocoordenates(
+                    self.getregressionline(self.lval, series),
+                    self.getmaxpoint(self.lval[series.ycolumn - 1]))
+                scene.append(Linepath(self.xorigin, self.yorigin,
+                                      Series.getid("regline", cont), lpoints,
+                                      "none", series.color))
+
+        # draw the axis labels
+        if self.xlabel != "":
+            scene.append(Text(self.xorigin + (xmaxaxis / 2), 1.5 *
+                              self.yorigin + ymaxaxis, fontsize, self.xlabel))
+        if self.ylabel != "":
+            scene.append(Verticaltext(self.xorigin - self.xorigin / 2,
+                                      self.yorigin + (ymaxaxis / 2),
+                                      fontsize, self.ylabel, 0))
+
+        # draw the legend
+        if self.legend:
+            for cont, series in enumerate(allseries):
+                ypos = self.yorigin + ymaxaxis + 70
+                if cont:
+                    ypos = ypos + cont * 1.5 * scatlegendsize
+                rectid = "scatrect" + str(cont + 1)
+                if cont == 0:
+                    rectid = "scatect1"
+                scene.append(Hcolumn(series.name, self.xorigin, ypos,
+                                     series.color, scatlegendsize,
+                                     scatlegendsize, "scatlegend1", rectid,
+                                     "scatext" + str(cont + 1)))
+        # draw the colour ramp of the density map, the highest level on top
+        if self.density is not None and maxcount:
+            ranges = getranges(maxcount)
+            ranges.reverse()
+            for cont, (level, lowest, highest) in enumerate(ranges):
+                text = str(lowest)
+                if highest > lowest:
+                    text = text + "-" + str(highest)
+                scene.append(Hcolumn(text, self.xorigin + xmaxaxis + 20,
+                                     self.yorigin + cont * 1.5 * 10,
+                                     RAMP[level], 10, 10, "densitylegend",
+                                     "densityrect" + str(level + 1),
+                                     "densitytext" + str(level + 1)))
+        if self.title != "":
+            scene.append(Text((self.xorigin + xmaxaxis) / 2,
+                              self.yorigin / 2, 14, self.title))
+        return scene
 
     def printsvg(self):
 
@@ -3076,111 +4708,10 @@ class Scatterplot:
         @return: SVG code for scatter plot graph.
         @rtype: C{string}
         """
-        fontsize = 10
-        scatlegendsize = 7
         try:
-            self.ptsize = float(self.ptsize)
-            xmaxaxis, ymaxaxis = self.getmaxaxis(self.lval)
-            # draw lines axis
-            vline = Line(self.xorigin, self.yorigin, self.xorigin,
-                         self.yorigin + ymaxaxis, "no")
-            hline = Line(self.xorigin, self.yorigin + ymaxaxis,
-                         self.xorigin + xmaxaxis,
-                         self.yorigin + ymaxaxis, "no")
-            string = vline.printsvg() + hline.printsvg()
-            cont = 0
-            auxinc = int(self.yinc)
-            while int(self.yinc) <= ymaxaxis:
-                ylinetext = Linetext(self.xorigin, self.yorigin + ymaxaxis -
-                                     int(self.yinc), fontsize, self.yinc)
-                string += ylinetext.printsvg()
-                self.yinc = auxinc * cont
-                cont += 1
-            cont = 0
-            self.yinc = auxinc
-            while int(self.yinc) <= xmaxaxis:
-                xlinetext = Linetextvertical(self.xorigin + int(self.yinc),
-                                             self.yorigin + ymaxaxis, fontsize,
-                                             self.yinc)
-                string += xlinetext.printsvg()
-                self.yinc = auxinc * cont
-                cont += 1
-
-            # draw points
-            for cont in range(len(self.lval[int(self.xcolumn) - 1])):
-                xpoint = int(self.lval[int(self.xcolumn) - 1][cont]) \
-                         + int(self.xorigin)
-                ypoint = int(self.yorigin) + ymaxaxis \
-                         - int(self.lval[int(self.ycolumn) - 1][cont])
-
-                string += self.getsvgpoint(xpoint, ypoint, self.ptsym,
-                                           self.ptcolor, self.ptsize)
-
-                if (len(self.lval) > int(self.xcolumn2)):
-                    ycolumn2 = len(self.lval)
-                    xpoint2 = int(self.lval[int(self.xcolumn2) - 1]
-                                  [cont]) + int(self.xorigin)
-                    ypoint2 = int(self.yorigin) + ymaxaxis - \
-                              int(self.lval[int(ycolumn2) - 1][cont])
-                    string += self.getsvgpoint(xpoint2, ypoint2, self.pt2sym,
-                                               self.pt2color, self.ptsize)
-
-            # draw regression line
-            if self.corr:
-                lpoints = self.regtocoordenates(
-                    self.getregressionline(self.lval),
-                    self.getmaxpoint(self.lval[int(
-                        self.ycolumn) - 1]))
-                regline = Linepath(self.xorigin, self.yorigin, "regline",
-                                   lpoints, "none", self.ptcolor)
-                if (len(self.lval) > int(self.xcolumn2)):
-                    lpoints2 = self.regtocoordenates(self.getregressionline(
-                        self.lval[2:]), self.getmaxpoint(
-                        self.lval[int(ycolumn2) - 1]))
-                    regline2 = Linepath(self.xorigin, self.yorigin, "regline2",
-                                        lpoints2, "none", self.pt2color)
-                    string += regline.printsvg() + regline2.printsvg()
-                else:
-                    string += regline.printsvg()
-
-            # draw the axis labels
-            if self.xlabel != "":
-                xtext = Text(self.xorigin + (xmaxaxis / 2), 1.5 * \
-                             self.yorigin + ymaxaxis, fontsize, self.xlabel)
-                string += xtext.printsvg()
-            if self.ylabel != "":
-                ytext = Verticaltext(self.xorigin - self.xorigin / 2,
-                                     self.yorigin + (ymaxaxis / 2),
-                                     fontsize, self.ylabel, 0)
-                string += ytext.printsvg()
-
-            # draw the legend
-            if self.legend:
-                scatlegend1 = Hcolumn(self.name, self.xorigin,
-                                      self.yorigin + ymaxaxis + 70,
-                                      self.ptcolor, scatlegendsize,
-                                      scatlegendsize, "scatlegend1",
-                                      "scatect1", "scatext1")
-                if (len(self.lval) > int(self.xcolumn2)):
-                    scatlegend2 = Hcolumn(self.name2, self.xorigin,
-                                          self.yorigin + ymaxaxis + 70 +
-                                          1.5 * scatlegendsize, self.pt2color,
-                                          scatlegendsize, scatlegendsize,
-                                          "scatlegend1", "scatrect2",
-                                          "scatext2")
-                    string += scatlegend1.printsvg() + scatlegend2.printsvg()
-                else:
-                    string += scatlegend1.printsvg()
-            if self.title != "":
-                scattitle = Text((self.xorigin + xmaxaxis) / 2,
-                                 self.yorigin / 2, 14, self.title)
-                string += scattitle.printsvg()
-            return string
+            return self.getscene().printsvg()
         except IndexError:
-            print("The number of columns in data file must be equal to the" \
-                  + "maximum value indicated by the parameters x, y, x2, y2\n" \
-                  + "Please review the input data \nFor help use --help")
-            sys.exit(2)
+            raise InputError(COLUMNSERROR)
 
         ###############################################################################
 
@@ -3229,20 +4760,25 @@ class Lineplot(Scatterplot):
     which will be transformed to SVG coordinates and ordered by a B{sorting
     algorithm} to represent the line of points correctly. 
         
-    For this diagram we have chosen the fastest sorting algorithm called
-    B{Quicksort}.   
+    The data of a line chart usually are already ordered (a time series), so
+    the order of the X column is checked first and the points are only sorted
+    if it is needed, with the stable sort of Python.
 
     """
 
     def __init__(self, lval, xorigin, yorigin, xcolumn, ycolumn, yinc,
                  fillcolor, ptsize, ptsym, ptcolor, xlabel, ylabel,
                  xcolumn2, ycolumn2, pt2sym, pt2color, name, name2, legend,
-                 fillcolor2, title):
+                 fillcolor2, title, downsample=None, simplify=0,
+                 series=None, width=None, height=None, xscale=None,
+                 yscale=None):
 
         Scatterplot.__init__(self, lval, xorigin, yorigin, xcolumn, ycolumn,
                              xcolumn2, ycolumn2, yinc, ptsize, ptsym, pt2sym,
                              ptcolor, pt2color, False, xlabel, ylabel, name,
-                             name2, legend, title)
+                             name2, legend, title, False, series,
+                             width=width, height=height, xscale=xscale,
+                             yscale=yscale)
         # {Style
         self.fillcolor = fillcolor
         """@ivar:Is the fill color of the lower area of the dotted line for the
@@ -3253,8 +4789,37 @@ class Lineplot(Scatterplot):
         second set of data
         @type: C{string}"""
         # }
+        self.downsample = getsampling(downsample)
+        """@ivar: Method and size of the downsampling of each series, given
+        as C{lttb:N} (N points) or C{minmax:W} (envelope of the columns of W
+        pixels), or None to draw all the points.
+        @type: C{(string, number)}"""
+        self.simplify = float(simplify)
+        """@ivar: Tolerance in pixels of the simplification of the dotted
+        lines, or 0 to draw all their points.
+        @type: C{number}"""
+        if self.simplify < 0:
+            raise ValueError("The tolerance must be a positive number")
 
-    def transformtocoordenates(self, lval, ymaxpoint):
+    def getseries(self):
+        """
+        Returns the list of series drawn by the chart as
+        C{Scatterplot.getseries}. The series given by the arguments of the
+        chart fill the lower area of their lines with C{fillcolor} and
+        C{fillcolor2}.
+
+        @return: series of the chart
+        @rtype: C{list of Series}
+        """
+        if self.series is not None:
+            return self.series
+        series = Scatterplot.getseries(self)
+        series[0].fillcolor = self.fillcolor
+        if len(series) > 1:
+            series[1].fillcolor = self.fillcolor2
+        return series
+
+    def transformtocoordenates(self, lval, ymaxpoint, series=None):
         """
         Helper function that transforms each coordinate given in the 
         input file to SVG coordinates as follows:        
@@ -3263,100 +4828,214 @@ class Lineplot(Scatterplot):
             ... Ycoordenate = int(ymaxpoint) - 
             ...               int(lval[int(self.ycolumn) - 1][num])
         
-        Where "num" is the position of value within the list.
+        Where "num" is the position of value within the list. The columns
+        are converted to pixels first by C{getpixels}. If the numeric
+        backend holds both columns as arrays of integers all the coordinates
+        are computed at once.
         
         @param lval: list of input data
         @type lval: C{list}
         @param ymaxpoint: Is the maximum value from the list of input data in
         the y-axis. 
         @type ymaxpoint: C{number}
+        @param series: is the series, or None to use the columns C{xcolumn}
+        and C{ycolumn} of C{lval}
+        @type series: C{Series}
         @return: List of SVG coordenates
         @rtype: C{number}        
         """
+        xvalues, yvalues = self.getcolumns(lval, series)
+        xvalues = self.getpixels(xvalues, 0)
+        yvalues = self.getpixels(yvalues, 1)
+        xarray = self.getstats(xvalues).getarray()
+        yarray = self.getstats(yvalues).getarray()
+        if isintegral(xarray) and isintegral(yarray) and \
+                len(yarray) >= len(xarray):
+            return topoints(xarray, translate(yarray[:len(xarray)],
+                                              int(ymaxpoint), -1))
         newlpoints = []
-        for num in range(len(lval[int(self.xcolumn) - 1])):
-            xcoordenate = int(lval[int(self.xcolumn) - 1][num])
-            ycoordenate = (int(ymaxpoint) -
-                           int(lval[int(self.ycolumn) - 1][num]))
+        for num in range(len(xvalues)):
+            xcoordenate = int(xvalues[num])
+            ycoordenate = (int(ymaxpoint) - int(yvalues[num]))
             newlpoints.append([xcoordenate, ycoordenate])
         return newlpoints
 
-    def ordenatewithquicksort(self, lval, first, last):
+    def ordenatepoints(self, lpoints, xvalues):
         """
-        Returns the parameter list passed by ascending order using the method 
-        for this fast quicksort ordenation.
-        
-        Quicksort is a sorting algorithm that, on average, makes O(nlogn) 
-        comparisons to sort n items. It is often faster in practice than 
-        other O(nlogn) algorithms.
-        
-        First divides a large list into two smaller sub-lists: the low elements 
-        and the high elements. Thus, can then recursively sort the sub-lists.
-        
-        The steps are:
-        
-           1. Pick an element, called a pivot, from the list.
-           2. Reorder the list so that all elements with values less than the 
-              pivot come before the pivot, while all elements with values 
-              greater than the pivot come after it (equal values can go either
-              way). After this partitioning, the pivot is in its final
-              position. This is called the partition operation.
-           3. Recursively sort the sub-list of lesser elements and the
-              sub-list of greater elements.
+        Returns the list of points sorted in ascending order of the
+        X-coordinate.
 
-        The base case of the recursion are lists of size zero or one, which
-        never need to be sorted.
-        
-        In simple pseudocode, the algorithm might be expressed as this:
+        The points are taken in order from the column C{xvalues}, so if the
+        values of the column are already in ascending order the list is
+        returned unchanged. The order of the column is checked once in a
+        single pass by C{Columnstats.issorted} and kept in the dataset.
 
-              \>>>    function quicksort(list)
-              ...     create empty lists less and greater
-              ...     if length(list) <= 1
-              ...         return list 
-              ...         // an list of zero or one elements is already sorted
-              ...         // select and remove a pivot value pivo' from list
-              ...     for each x in list
-              ...         if x <= pivot then append  to less
-              ...         else append x to greater
-              ...    return concatenate(quicksort(less), pivot, 
-              ...                       quicksort(greater))
+        Otherwise the positions of the points are sorted by the
+        X-coordinate with a stable sort (O(nlogn), the points with the same
+        X keep the order of the input data) and the list is rebuilt in that
+        order:
 
-        @param lval: Is the list to be ordered. 
-        @type lval: C{list}
-        @param first: first element of the sublist
-        @type first: C{number}
-        @param last: last element of the sublist 
-        @type last: C{number}        
+            \>>> positions = argsort([point[0] for point in lpoints])
+            ... lpoints = [lpoints[position] for position in positions]
+
+        If the numeric backend holds the column as an array of integers the
+        positions are computed directly from the array.
+
+        @param lpoints: Is the list of points [X,Y] to be ordered.
+        @type lpoints: C{list}
+        @param xvalues: is the column of input data of the X-coordinates
+        @type xvalues: C{list}
         @return: Ordered list in ascending.
-        @rtype: C{list}      
-        """
-        ivar = first
-        jvar = last
-        lpivot = []
-        pivot = ((int(lval[first][int(self.xcolumn) - 1]) +
-                  int(lval[last][int(self.xcolumn) - 1])) / 2)
-        lpivot.append(pivot)
-        while ivar < jvar:
-            while int(lval[ivar][int(self.xcolumn) - 1]) < pivot:
-                ivar += 1
-            while int(lval[jvar][int(self.xcolumn) - 1]) > pivot:
-                jvar -= 1
-            if ivar <= jvar:
-                aux1 = int(lval[ivar][int(self.xcolumn) - 1])
-                aux2 = int(lval[ivar][int(self.ycolumn) - 1])
-                lval[ivar][int(self.xcolumn) - 1] = \
-                    lval[jvar][int(self.xcolumn) - 1]
-                lval[ivar][int(self.ycolumn) - 1] = \
-                    lval[jvar][int(self.ycolumn) - 1]
-                lval[jvar][int(self.xcolumn) - 1] = aux1
-                lval[jvar][int(self.ycolumn) - 1] = aux2
-                ivar += 1
-                jvar -= 1
-        if first < jvar:
-            lval = self.ordenatewithquicksort(lval, first, jvar)
-        if last > ivar:
-            lval = self.ordenatewithquicksort(lval, ivar, last)
-        return lval
+        @rtype: C{list}
+        """
+        xstatistics = self.getstats(xvalues)
+        if xstatistics.issorted():
+            return lpoints
+        xarray = xstatistics.getarray()
+        if isintegral(xarray) and len(xarray) == len(lpoints):
+            positions = argsort(xarray)
+        else:
+            positions = argsort([point[0] for point in lpoints])
+        return [lpoints[position] for position in positions]
+
+    def getlinepoints(self, lval, ymaxaxis, series=None):
+        """
+        Returns the points of the dotted line of a series in SVG coordinates,
+        sorted by X and reduced by the downsampling C{self.downsample} if it
+        is specified. The coordinates are the ones of the function
+        C{transformtocoordenates}, the downsampling does not depend on the
+        translation of the points.
+
+        If the series is downsampled and the numeric backend holds its
+        columns as arrays of integers, the arrays are sorted and reduced
+        and only the points that remain are built.
+
+        @param lval: list of input data
+        @type lval: C{list}
+        @param ymaxaxis: Is the length in pixels of the y-axis.
+        @type ymaxaxis: C{number}
+        @param series: is the series, or None to use the columns C{xcolumn}
+        and C{ycolumn} of C{lval}
+        @type series: C{Series}
+        @return: List of SVG coordenates
+        @rtype: C{list}
+        """
+        xvalues, yvalues = self.getcolumns(lval, series)
+        xvalues = self.getpixels(xvalues, 0)
+        yvalues = self.getpixels(yvalues, 1)
+        xstatistics = self.getstats(xvalues)
+        xarray = xstatistics.getarray()
+        yarray = self.getstats(yvalues).getarray()
+        if self.downsample is None or not isintegral(xarray) or \
+                not isintegral(yarray) or len(yarray) < len(xarray):
+            lpoints = self.transformtocoordenates(lval, ymaxaxis, series)
+            lpoints = self.ordenatepoints(lpoints, xvalues)
+            return downsample(lpoints, self.downsample)
+        yarray = translate(yarray[:len(xarray)], int(ymaxaxis), -1)
+        if not xstatistics.issorted():
+            positions = argsort(xarray)
+            xarray = take(xarray, positions)
+            yarray = take(yarray, positions)
+        positions = getpositions(xarray, yarray, self.downsample)
+        return topoints(take(xarray, positions), take(yarray, positions))
+
+    def getsampleshapes(self, lines):
+        """
+        Auxiliary function that returns the SVG code of the points of the
+        chart when the series are downsampled: only the points that remain
+        in the dotted lines are drawn. As in C{getpointshapes}, the points of
+        the series are alternated.
+
+        @param lines: points of each series in SVG coordinates, in the order
+        of C{getseries}
+        @type lines: C{list of list}
+
+        @return: SVG code of each point.
+        @rtype: C{list of string}
+        """
+        xorigin = int(self.xorigin)
+        yorigin = int(self.yorigin)
+        shapes = []
+        for series, lpoints in zip(self.getseries(), lines):
+            shapes.append(rendermarkers(
+                [point[0] + xorigin for point in lpoints],
+                [point[1] + yorigin for point in lpoints],
+                series.sym, series.color, self.ptsize))
+        if len(shapes) == 1:
+            return shapes[0]
+        return list(chain.from_iterable(zip(*shapes)))
+
+    def getscene(self):
+        """
+        Returns the scene graph of the line graph: a group with the axes, the
+        numbering of the axes, the dotted lines, the points, the labels, the
+        legend and the title, in this order.
+
+        @return: Scene graph of the line graph.
+        @rtype: C{Group}
+        """
+        # find the maximum value of x and y to determine the size of each axis
+        fontsize = 10
+        linelegendsize = 10
+        self.ptsize = float(self.ptsize)
+        xscale, yscale = self.getscales()
+        xmaxaxis, ymaxaxis = xscale.length, yscale.length
+        scene = Group()
+        # draw lines axis
+        scene.append(Line(self.xorigin, self.yorigin, self.xorigin,
+                          self.yorigin + ymaxaxis, "no"))
+        scene.append(Line(self.xorigin, self.yorigin + ymaxaxis,
+                          self.xorigin + xmaxaxis, self.yorigin + ymaxaxis,
+                          "no"))
+        # Draw the axis
+        scene.append(Batch(self.getaxisshapes, [xmaxaxis, ymaxaxis, fontsize],
+                           "axis"))
+        # create axes and the path defined by the dotted line of each series
+        allseries = self.getseries()
+        lines = []
+        for cont, series in enumerate(allseries):
+            lpoints = self.getlinepoints(self.lval, ymaxaxis, series)
+            lines.append(lpoints)
+            # initial and end point of the path
+            lpointsordenate = [[lpoints[0][0], ymaxaxis]] + lpoints + \
+                              [[self.getmaxpoint(self.getpixels(
+                                  self.lval[series.xcolumn - 1], 0)),
+                                ymaxaxis]]
+            scene.append(Linepath(self.xorigin, self.yorigin,
+                                  Series.getid("plotline", cont),
+                                  lpointsordenate, series.fillcolor,
+                                  series.color, self.simplify))
+        # draw points
+        if self.downsample is None:
+            scene.append(Batch(self.getpointshapes, [ymaxaxis], "points"))
+        else:
+            scene.append(Batch(self.getsampleshapes, [lines], "points"))
+
+        # draw the axis labels
+        if self.xlabel != "":
+            scene.append(Text(self.xorigin + (xmaxaxis / 2), 1.5 * self.yorigin
+                              + ymaxaxis, fontsize, self.xlabel))
+        if self.ylabel != "":
+            scene.append(Verticaltext(self.xorigin - self.xorigin / 2,
+                                      self.yorigin + (ymaxaxis / 2),
+                                      fontsize, self.ylabel, 0))
+
+        # draw the legend
+        if self.legend:
+            for cont, series in enumerate(allseries):
+                ypos = 1.75 * self.yorigin + ymaxaxis
+                if cont:
+                    ypos = 1.8 * self.yorigin + ymaxaxis + \
+                           cont * linelegendsize
+                scene.append(Line(self.xorigin, ypos,
+                                  self.xorigin + linelegendsize, ypos, "no",
+                                  series.color))
+                scene.append(Text(self.xorigin + 2 * linelegendsize, ypos,
+                                  fontsize, series.name))
+        if self.title != "":
+            scene.append(Text((self.xorigin + xmaxaxis) / 2,
+                              self.yorigin / 2, 12, self.title))
+        return scene
 
     def printsvg(self):
 
@@ -3377,10 +5056,10 @@ class Lineplot(Scatterplot):
                   function: B{transformtocoordenates(self.lval, ymaxpoint)}. 
                   The resulting value will be stored in a list called 
                   B{I{"lpoints"}}.
-                - Sort the list of points previously obtained by the quicksort
-                  algorithm in ascending. B{ordenatewithquicksort(lpoints, 0,
-                  len(lpoints)-1)}. Store the resulting list in the variable
-                  "lpointsordenate".
+                - Sort the list of points previously obtained in ascending
+                  order of X, unless the X column is already ordered.
+                  B{ordenatepoints(lpoints, xvalues)}. Store the resulting list
+                  in the variable "lpointsordenate".
                 - Finally insert two additional points on the list.
                     - Insert in the first position, a point whose x-coordinate
                       will be the first value in the list and whose
@@ -3430,122 +5109,7 @@ class Lineplot(Scatterplot):
               
         """
 
-        # find the maximum value of x and y to determine the size of each axis
-        fontsize = 10
-        linelegendsize = 10
         try:
-            self.ptsize = float(self.ptsize)
-            xmaxaxis, ymaxaxis = self.getmaxaxis(self.lval)
-            # draw lines axis
-            vline = Line(self.xorigin, self.yorigin, self.xorigin,
-                         self.yorigin + ymaxaxis, "no")
-            hline = Line(self.xorigin, self.yorigin + ymaxaxis,
-                         self.xorigin + xmaxaxis,
-                         self.yorigin + ymaxaxis, "no")
-            string = vline.printsvg() + hline.printsvg()
-            # Draw the axis
-            cont = 0
-            auxinc = int(self.yinc)
-            while int(self.yinc) <= ymaxaxis:
-                ylinetext = Linetext(self.xorigin, self.yorigin + ymaxaxis -
-                                     int(self.yinc), fontsize, self.yinc)
-                string += ylinetext.printsvg()
-                self.yinc = auxinc * cont
-                cont += 1
-            cont = 0
-            self.yinc = auxinc
-            while int(self.yinc) <= xmaxaxis:
-                linextext = Linetextvertical(self.xorigin + int(self.yinc),
-                                             self.yorigin + ymaxaxis, fontsize,
-                                             self.yinc)
-                string += linextext.printsvg()
-                self.yinc = auxinc * cont
-                cont += 1
-            # create axes and the path defined by the dotted line
-            lpoints = self.transformtocoordenates(self.lval, ymaxaxis)
-            lpointsordenate = list(self.ordenatewithquicksort(lpoints,
-                                                              int(self.xcolumn) - 1, len(lpoints) - 1))
-            # initial and end point of the path
-            lpointsordenate.insert(0, [lpointsordenate[0][0], ymaxaxis])
-            lpointsordenate.append([self.getmaxpoint(self.lval
-                                                     [int(self.xcolumn) - 1]), ymaxaxis])
-            plotline = Linepath(self.xorigin, self.yorigin, "plotline",
-                                lpointsordenate, self.fillcolor, self.ptcolor)
-            string += plotline.printsvg()
-
-            if (len(self.lval) > int(self.xcolumn2)):
-                lpoints2 = self.transformtocoordenates(self.lval[2:], ymaxaxis)
-                lpointsordenate2 = list(self.ordenatewithquicksort(lpoints2,
-                                                                   int(self.xcolumn) - 1, len(lpoints2) - 1))
-                lpointsordenate2.insert(0, [lpointsordenate2[0][0], ymaxaxis])
-                lpointsordenate2.append([self.getmaxpoint(self.lval
-                                                          [int(self.xcolumn2) - 1]), ymaxaxis])
-                plotline2 = Linepath(self.xorigin, self.yorigin, "plotline2",
-                                     lpointsordenate2, self.fillcolor2,
-                                     self.pt2color)
-                string += plotline2.printsvg()
-                # draw points
-            for cont in range(len(self.lval[int(self.xcolumn) - 1])):
-                xpoint = int(self.lval[int(self.xcolumn) - 1][cont]) \
-                         + int(self.xorigin)
-                ypoint = int(self.yorigin) + ymaxaxis \
-                         - int(self.lval[int(self.ycolumn) - 1][cont])
-
-                string += self.getsvgpoint(xpoint, ypoint, self.ptsym,
-                                           self.ptcolor, self.ptsize)
-
-                if (len(self.lval) > int(self.xcolumn2)):
-                    ycolumn2 = len(self.lval)
-                    xpoint2 = int(self.lval[int(self.xcolumn2) - 1]
-                                  [cont]) + int(self.xorigin)
-                    ypoint2 = int(self.yorigin) + ymaxaxis - \
-                              int(self.lval[int(ycolumn2) - 1][cont])
-                    string += self.getsvgpoint(xpoint2, ypoint2, self.pt2sym,
-                                               self.pt2color, self.ptsize)
-
-            # draw the axis labels
-            if self.xlabel != "":
-                xtext = Text(self.xorigin + (xmaxaxis / 2), 1.5 * self.yorigin
-                             + ymaxaxis, fontsize, self.xlabel)
-                string += xtext.printsvg()
-            if self.ylabel != "":
-                ytext = Verticaltext(self.xorigin - self.xorigin / 2,
-                                     self.yorigin + (ymaxaxis / 2),
-                                     fontsize, self.ylabel, 0)
-                string += ytext.printsvg()
-
-            # draw the legend
-            if self.legend:
-                linelegend = Line(self.xorigin, 1.75 * self.yorigin + ymaxaxis,
-                                  self.xorigin + linelegendsize,
-                                  1.75 * self.yorigin + ymaxaxis, "no",
-                                  self.ptcolor)
-                textlegend = Text(self.xorigin + 2 * linelegendsize,
-                                  1.75 * self.yorigin + ymaxaxis, fontsize,
-                                  self.name)
-                if (len(self.lval) > int(self.xcolumn2)):
-                    linelegend2 = Line(self.xorigin, 1.8 * self.yorigin +
-                                       ymaxaxis + linelegendsize, self.xorigin
-                                       + linelegendsize, 1.8 * self.yorigin +
-                                       ymaxaxis + linelegendsize, "no",
-                                       self.pt2color)
-                    textlegend2 = Text(self.xorigin + 2 * linelegendsize,
-                                       1.8 * self.yorigin + ymaxaxis +
-                                       linelegendsize, fontsize, self.name2)
-                    string += linelegend.printsvg() + textlegend.printsvg() + \
-                              linelegend2.printsvg() + textlegend2.printsvg()
-                else:
-                    string += linelegend.printsvg() + textlegend.printsvg()
-            if self.title != "":
-                lineplottitle = Text((self.xorigin + xmaxaxis) / 2,
-                                     self.yorigin / 2, 12, self.title)
-                string += lineplottitle.printsvg()
-            return string
+            return self.getscene().printsvg()
         except IndexError:
-            print("The number of columns in data file must be equal to the" \
-                  + " maximum value indicated by the parameters x, y, x2, y2" \
-                  + "\nPlease review the input data \nFor help use --help" \
-                  + "\npysvg 0.0.4-Oct2011\nCopyright (C) 2011 Isabel Rodriguez" \
-                  + "\nYou can see the full documentation at URL:" \
-                  + " \"http://www.pysvg/orgfree.com\"")
-            sys.exit(2)
+            raise InputError(COLUMNSERROR)
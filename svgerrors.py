@@ -0,0 +1,77 @@
+# pySVG is vector graphics program for python that converts data
+# entered by a .txt file in an SVG graphic.
+#
+# Copyright (C) 2011 Isabel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+This module contains the exceptions raised by the charts and by the
+function C{svgrender.render}. The modules of pySVG do not print messages
+nor stop the interpreter: they raise these exceptions, and only the command
+line (C{pySVG.main}) writes their messages and exits with status 2::
+
+    \>>> try:
+    ...     svg = render("scat", "data.txt", x=1, y=2)
+    ... except InputError as error:
+    ...     reject(str(error))
+
+Both exceptions are also a C{ValueError}, so the code that catches the
+errors of the values of the charts catches them too.
+"""
+__docformat__ = 'epytext en'
+
+
+###############################################################################
+## Constants
+###############################################################################
+
+
+COLUMNSERROR = "The number of columns in data file must be equal to the " \
+               "maximum value indicated by the parameters x, y, x2, y2"
+"""Message of the charts whose data fields are not columns of the data."""
+NUMERICERROR = "The input values must be numeric, can not be strings"
+"""Message of the charts whose values are not numbers."""
+
+
+###############################################################################
+## Classes
+###############################################################################
+
+
+class PysvgError(Exception):
+    """
+    Base class of the errors of pySVG.
+    """
+
+###############################################################################
+
+
+class InputError(PysvgError, ValueError):
+    """
+    Error of the input data: a file that can not be read, columns of
+    different length, values that are not numeric, or fewer columns than
+    the data fields chosen by the options.
+    """
+
+###############################################################################
+
+
+class OptionError(PysvgError, ValueError):
+    """
+    Error of the options of a chart: an unknown chart or option, or a value
+    that is not valid for its option.
+    """
+
+###############################################################################
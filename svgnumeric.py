@@ -0,0 +1,336 @@
+# pySVG is vector graphics program for python that converts data
+# entered by a .txt file in an SVG graphic.
+#
+# Copyright (C) 2011 Isabel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+This module contains the numeric backend of the charts: the conversion of
+the columns of input data to arrays and the operations made with all the
+values of a column at once (translations of the coordinates, statistics).
+
+If the package NumPy is installed the columns are kept as NumPy arrays and
+the operations are vectorized. Otherwise, or after C{setbackend("python")},
+every function works with plain lists in pure Python and returns the same
+values, except the sums of floats of C{getmoments}: NumPy adds them in
+another order, so the regression lines and bands of a chart may differ in
+the last digits with each backend. The cache of C{svgcache} keeps the
+documents of each backend apart::
+
+    \>>> xs = toarray([95, 150, 84])
+    ... tolist(translate(xs, 100))
+    ... [195, 250, 184]
+"""
+__docformat__ = 'epytext en'
+
+
+###############################################################################
+## Imports
+###############################################################################
+
+
+from math import log10
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+###############################################################################
+## Constants
+###############################################################################
+
+
+BACKENDS = ("numpy", "python")
+"""Names of the backends that can be chosen with C{setbackend}."""
+backend = numpy
+"""Module used to vectorize the operations, or None to use pure Python. By
+default it is NumPy if it is installed."""
+
+
+###############################################################################
+## Functions
+###############################################################################
+
+
+def setbackend(name):
+    """
+    Chooses the backend of the numeric operations.
+
+    @param name: is the name of the backend, C{numpy} or C{python}
+    @type name: C{string}
+    @raise ValueError: If the backend is unknown or NumPy is not installed.
+    """
+    global backend
+    if name not in BACKENDS:
+        raise ValueError("Unknown backend: " + str(name))
+    if name == "numpy" and numpy is None:
+        raise ValueError("The backend numpy needs the package NumPy")
+    if name == "numpy":
+        backend = numpy
+    else:
+        backend = None
+
+
+def isarray(values):
+    """
+    Returns True if C{values} is an array of the NumPy backend.
+
+    @param values: is a list or an array of numbers
+    @type values: C{list or array}
+    @rtype: C{boolean}
+    """
+    return numpy is not None and isinstance(values, numpy.ndarray)
+
+
+def isintegral(values):
+    """
+    Returns True if C{values} is an array of integers. The arrays of
+    integers give the same coordinates as the function C{int} applied to
+    each value of the input data, so the charts only vectorize these ones.
+
+    @param values: is a list or an array of numbers
+    @type values: C{list or array}
+    @rtype: C{boolean}
+    """
+    return isarray(values) and values.dtype.kind == "i"
+
+
+def toarray(column):
+    """
+    Returns the values of a column of input data as an array of the backend:
+    an array of integers if all the values are integers and an array of
+    floats otherwise. Without backend, or if the values do not fit in the
+    array, it returns None and the column is processed in pure Python. The
+    values that are not finite are not numeric, as in C{svgstats.tonumber}.
+
+    @param column: is the list of values of the column
+    @type column: C{list of number or string}
+    @return: the array of the values, or None
+    @rtype: C{array}
+    @raise ValueError: If a value is not numeric or not finite.
+    """
+    if backend is None:
+        return None
+    try:
+        if all([type(value) is str for value in column]):
+            try:
+                return backend.fromiter(map(int, column), backend.int64,
+                                        len(column))
+            except ValueError:
+                return backend.fromiter(map(float, column), backend.float64,
+                                        len(column))
+        values = backend.array(column)
+    except OverflowError:
+        return None
+    if values.dtype.kind not in "if":
+        return None
+    if values.dtype.kind == "f" and not bool(backend.isfinite(values).all()):
+        raise ValueError("The values must be finite")
+    return values
+
+
+def tolist(values):
+    """
+    Returns the numbers of an array as a list of Python numbers, to be
+    written by C{svgelements.formatnumbers}. The floats without decimal part
+    are returned as integers, which are written faster and with the same
+    text. Lists are returned unchanged.
+
+    @param values: is a list or an array of numbers
+    @type values: C{list or array}
+    @rtype: C{list of number}
+    """
+    if not isarray(values):
+        return values
+    if values.dtype.kind == "f" and len(values) and \
+            bool((numpy.floor(values) == values).all()) and \
+            bool((abs(values) < 1e15).all()):
+        return values.astype(numpy.int64).tolist()
+    return values.tolist()
+
+
+def translate(values, offset, factor=1):
+    """
+    Returns the coordinates C{offset + factor * value} of a list of values.
+    The translations of the charts are made with C{factor} 1 (the X
+    component) or -1 (the Y component, that grows downwards in SVG).
+
+    @param values: is a list or an array of numbers
+    @type values: C{list or array}
+    @param offset: is the value added to each coordinate
+    @type offset: C{number}
+    @param factor: is the value that multiplies each coordinate, 1 or -1
+    @type factor: C{number}
+    @return: the translated values, an array if C{values} is an array
+    @rtype: C{list or array}
+    """
+    if isarray(values):
+        if factor == 1:
+            return values + offset
+        return offset - values if factor == -1 else offset + factor * values
+    if factor == 1:
+        return [value + offset for value in values]
+    if factor == -1:
+        return [offset - value for value in values]
+    return [offset + factor * value for value in values]
+
+
+def topixels(values, factor):
+    """
+    Returns the pixels of a list of values on an axis with C{factor} pixels
+    for each unit: the integer part of each C{value * factor}, as the
+    function C{int}. An array gives a new read-only array of integers, that
+    the charts draw with the vectorized translations.
+
+    \>>> tolist(topixels(toarray([5, 12.5, 20]), 0.5))
+    ... [2, 6, 10]
+
+    @param values: is a list or an array of numbers
+    @type values: C{list or array}
+    @param factor: is the number of pixels of a unit
+    @type factor: C{number}
+    @rtype: C{list or array}
+    @raise ValueError: If a value is not finite.
+    """
+    if isarray(values):
+        values = values * factor
+        if not bool((abs(values) < 2 ** 62).all()):
+            raise ValueError("The input values must be finite")
+        pixels = values.astype(numpy.int64)
+        pixels.flags.writeable = False
+        return pixels
+    try:
+        return [int(value * factor) for value in values]
+    except OverflowError:
+        raise ValueError("The input values must be finite")
+
+
+def logarithm(values):
+    """
+    Returns the decimal logarithm of each value of a list or an array, used
+    by the logarithmic scales of the axes. An array gives an array of
+    floats.
+
+    @param values: is a list or an array of numbers
+    @type values: C{list or array}
+    @rtype: C{list or array}
+    @raise ValueError: If a value is not positive.
+    """
+    if isarray(values):
+        if not bool((values > 0).all()):
+            raise ValueError("The values of a logarithmic axis must be "
+                             "positive")
+        return numpy.log10(values)
+    if not all([value > 0 for value in values]):
+        raise ValueError("The values of a logarithmic axis must be positive")
+    return [log10(value) for value in values]
+
+
+def topoints(xvalues, yvalues):
+    """
+    Returns the list of points [X,Y] given by the values of two lists or
+    arrays of the same length. The points are new lists of Python numbers,
+    so they can be modified.
+
+    @param xvalues: are the X components of the points
+    @type xvalues: C{list or array}
+    @param yvalues: are the Y components of the points
+    @type yvalues: C{list or array}
+    @rtype: C{list of list}
+    """
+    if isarray(xvalues) and isarray(yvalues):
+        return numpy.column_stack((xvalues, yvalues)).tolist()
+    return [[xvalue, yvalue] for xvalue, yvalue in zip(xvalues, yvalues)]
+
+
+def concatenate(parts):
+    """
+    Returns the values of several lists or arrays one after another: an
+    array if all of them are arrays and a list otherwise.
+
+    @param parts: are the lists or the arrays
+    @type parts: C{list of list or array}
+    @rtype: C{list or array}
+    """
+    if len(parts) and all([isarray(values) for values in parts]):
+        return numpy.concatenate(parts)
+    result = []
+    for values in parts:
+        result.extend(tolist(values))
+    return result
+
+
+def take(values, positions):
+    """
+    Returns the values of a list or an array that are in the given
+    positions, in the order of the positions.
+
+    @param values: is a list or an array of numbers
+    @type values: C{list or array}
+    @param positions: are the positions of the values
+    @type positions: C{list of number}
+    @return: the values, an array if C{values} is an array
+    @rtype: C{list or array}
+    """
+    if isarray(values):
+        return values[positions]
+    return [values[position] for position in positions]
+
+
+def argsort(values):
+    """
+    Returns the positions of the values of a list or array in ascending
+    order of the values. The sort is stable: the positions of equal values
+    keep their order.
+
+    \>>> argsort([30, 10, 20, 10])
+    ... [1, 3, 2, 0]
+
+    @param values: is a list or an array of numbers
+    @type values: C{list or array}
+    @rtype: C{list of number}
+    """
+    if isarray(values):
+        return numpy.argsort(values, kind="stable").tolist()
+    return sorted(range(len(values)), key=values.__getitem__)
+
+
+def getmoments(xvalues, yvalues):
+    """
+    Returns the number of points, the averages, the sums of the squared
+    deviations of each component and the sum of the products of the
+    deviations of two arrays of the same length, computed with the averages
+    in two passes so that they do not lose precision as the method of
+    Welford used in pure Python.
+
+    @param xvalues: is the array of the X component
+    @type xvalues: C{array}
+    @param yvalues: is the array of the Y component
+    @type yvalues: C{array}
+    @return: count, averagex, averagey, sumsquaresx, sumsquaresy and
+    sumproducts
+    @rtype: C{tuple}
+    """
+    count = len(xvalues)
+    if count == 0:
+        return 0, 0.0, 0.0, 0.0, 0.0, 0.0
+    averagex = float(xvalues.mean(dtype=numpy.float64))
+    averagey = float(yvalues.mean(dtype=numpy.float64))
+    deltax = xvalues - averagex
+    deltay = yvalues - averagey
+    return (count, averagex, averagey, float(numpy.dot(deltax, deltax)),
+            float(numpy.dot(deltay, deltay)), float(numpy.dot(deltax, deltay)))
@@ -0,0 +1,366 @@
+# pySVG is vector graphics program for python that converts data
+# entered by a .txt file in an SVG graphic.
+#
+# Copyright (C) 2011 Isabel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+This module contains the library interface of pySVG: the function
+C{render} draws a chart in the current interpreter and returns the SVG
+document, without printing anything nor stopping the interpreter, so the
+charts can be drawn by a long-running program::
+
+    \>>> svg = render("scat", "data.txt", x=1, y=2, corr=True)
+    ... svg = render("bardiagram", [["a", "b"], [10, 20]], color="red")
+
+The options have the names of the options of the command line without the
+dashes (C{xlbl}, C{yinc}, C{xscale}...) and the same default values; the
+options without value of the command line (C{legend}, C{corr}...) are
+booleans. The errors are raised as the exceptions of C{svgerrors}: an
+C{OptionError} if the chart or an option is not valid, and an
+C{InputError} if the input data can not be drawn.
+
+The precision of the numbers and the cache of their texts are global to
+the module C{svgelements}, so C{render} draws one chart at a time: it can
+be called by several threads, but they wait for each other while a chart
+is drawn (C{lock}). The input files are read without waiting.
+"""
+__docformat__ = 'epytext en'
+
+
+###############################################################################
+## Imports
+###############################################################################
+
+
+import svgelements
+import threading
+from filetext import readinputfile
+from svgdata import getdataset
+from svgerrors import COLUMNSERROR, InputError, OptionError, PysvgError
+
+
+###############################################################################
+## Constants
+###############################################################################
+
+
+PREFABS = ("bardiagram", "bardiagram3d", "pie", "scat", "lines")
+"""Names of the charts."""
+OPTIONS = {"x": 1, "y": 2, "x2": 3, "y2": 3, "xorigin": 100, "yorigin": 100,
+           "delim": 25, "vals": False, "yrange": 0, "yinc": 10, "ygrid": "no",
+           "barwidth": 25, "color": "none", "color2": "none", "colorfld": 3,
+           "values": 2, "labels": 1, "radius": 100, "legend": False,
+           "name": "Enter_text", "name2": "Enter_text", "title": "",
+           "animate": False, "filtered": False, "corr": False,
+           "corrband": False, "ptsize": 4, "ptsym": "circle",
+           "pt2sym": "square", "ptcolor": "red", "pt2color": "blue",
+           "xlbl": "", "ylbl": "", "precision": None, "downsample": None,
+           "simplify": 0, "series": None, "names": "", "colors": "",
+           "density": None, "cull": False, "width": None, "height": None,
+           "xscale": None, "yscale": None}
+"""Options of the charts with their default values."""
+ALIASES = {"fill": "color", "fill2": "color2"}
+"""Other names of the options, as in the command line."""
+INTEGERS = ("x", "y", "x2", "y2", "delim", "yrange", "yinc", "barwidth",
+            "colorfld", "values", "labels")
+"""Options whose value must be an integer."""
+NUMBERS = ("xorigin", "yorigin", "radius", "ptsize", "simplify")
+"""Options whose value must be a number."""
+FLAGS = ("vals", "legend", "animate", "filtered", "corr", "corrband", "cull")
+"""Options without value of the command line, whose value is a boolean."""
+TRUES = ("true", "yes", "on", "1")
+"""Texts of the value True of the options C{FLAGS}, in any case."""
+FALSES = ("false", "no", "off", "0", "")
+"""Texts of the value False of the options C{FLAGS}, in any case."""
+lock = threading.Lock()
+"""Lock held by C{render} while a chart is drawn with its precision."""
+
+
+###############################################################################
+## Functions
+###############################################################################
+
+
+def getoptions(options):
+    """
+    Returns the options of a chart: the default values of C{OPTIONS}
+    changed by the given ones. The values of the options C{INTEGERS} are
+    converted to integers, the values of the options C{NUMBERS} to numbers
+    (integers if they have no decimals) and the values of the options
+    C{FLAGS} to booleans (C{getflag}), so the same options give the same
+    values whether they are texts of the command line or numbers:
+
+        \>>> getoptions({"x": "01", "ptsize": "4.0"}) == getoptions({})
+        ... True
+
+    @param options: are the options given by the user
+    @type options: C{dictionary}
+    @rtype: C{dictionary}
+    @raise OptionError: If an option is unknown or its value is not a
+    number or a boolean.
+    """
+    values = dict(OPTIONS)
+    for name, value in options.items():
+        name = ALIASES.get(name, name)
+        if name not in OPTIONS:
+            raise OptionError("Unknown option: " + str(name))
+        if name in FLAGS:
+            values[name] = getflag(name, value)
+            continue
+        try:
+            if name in INTEGERS:
+                value = int(value)
+            elif name in NUMBERS:
+                value = float(value)
+                if value.is_integer():
+                    value = int(value)
+        except (TypeError, ValueError, OverflowError):
+            raise OptionError("The option " + name + " must be numeric")
+        values[name] = value
+    return values
+
+
+def getflag(name, value):
+    """
+    Returns the boolean value of an option of C{FLAGS}: a boolean, the
+    integers 0 and 1, or one of the texts C{TRUES} and C{FALSES}.
+
+        \>>> getflag("corr", "Yes"), getflag("legend", 0)
+        ... (True, False)
+
+    @param name: is the name of the option
+    @type name: C{string}
+    @param value: is the value given by the user
+    @type value: C{boolean or number or string}
+    @rtype: C{boolean}
+    @raise OptionError: If the value is not one of them.
+    """
+    if isinstance(value, bool):
+        return value
+    if type(value) is int and value in (0, 1):
+        return value == 1
+    if isinstance(value, str):
+        if value.lower() in TRUES:
+            return True
+        if value.lower() in FALSES:
+            return False
+    raise OptionError("The option " + name + " must be true or false")
+
+
+def getseries(text, names, colors, styles):
+    """
+    Returns the series of a scatter plot or a line chart given by the
+    option C{--series}, a list of pairs of data fields X:Y separated by
+    commas:
+
+        \>>> getseries("1:2,1:3,1:4", "", "", [])
+
+    The series take in order the symbol, the color, the name and the fill
+    color of C{styles}, the colors and the names of the lists C{colors} and
+    C{names} separated by commas, and the styles of
+    C{svgelements.Series.getstyles} when they are not given.
+
+    @param text: is the value of the option C{--series}, or None
+    @type text: C{string}
+    @param names: are the legend labels separated by commas
+    @type names: C{string}
+    @param colors: are the colors separated by commas
+    @type colors: C{string}
+    @param styles: are the symbol, the color, the name and the fill color of
+    the first series
+    @type styles: C{list of tuple}
+    @return: the series, or None if the option is not given
+    @rtype: C{list of svgelements.Series}
+    @raise ValueError: If a pair of data fields is not valid.
+    """
+    if text is None:
+        return None
+    names = names.split(",") if names else []
+    colors = colors.split(",") if colors else []
+    series = []
+    for position, pair in enumerate(text.split(",")):
+        columns = pair.split(":")
+        if len(columns) != 2:
+            raise ValueError("The series must be pairs of data fields X:Y")
+        sym, color = svgelements.Series.getstyles(position)
+        name, fillcolor = "Series " + str(position + 1), "none"
+        if position < len(styles):
+            sym, color, name, fillcolor = styles[position]
+        if position < len(colors) and colors[position] != "":
+            color = colors[position]
+        if position < len(names) and names[position] != "":
+            name = names[position]
+        series.append(svgelements.Series(columns[0], columns[1], sym, color,
+                                         name, fillcolor))
+    return series
+
+
+def getchart(prefab, lval, options):
+    """
+    Returns the chart of the given name drawn with the input data and the
+    options.
+
+    @param prefab: is the name of the chart, one of C{PREFABS}
+    @type prefab: C{string}
+    @param lval: is the input data
+    @type lval: C{svgdata.Dataset}
+    @param options: are the options of the chart, given by C{getoptions}
+    @type options: C{dictionary}
+    @return: the chart, with the method C{printsvg}
+    @rtype: C{Bardiagram or Bardiagram3d or Piechart or Scatterplot or
+    Lineplot}
+    @raise OptionError: If a symbol of the points is unknown.
+    @raise ValueError: If an option is not valid.
+    """
+    o = options
+    if prefab in ("scat", "lines"):
+        # the points are drawn when the chart is printed, check them before
+        for name in ("ptsym", "pt2sym"):
+            if o[name] not in svgelements.Series.symbols:
+                raise OptionError("Unknown point symbol: " + str(o[name]))
+    if prefab == "bardiagram":
+        return svgelements.Bardiagram(lval=lval, xorigin=o["xorigin"],
+                                      yorigin=o["yorigin"], xcolumn=o["x"],
+                                      ycolumn=o["y"], ycolumn2=o["y2"],
+                                      barwidth=o["barwidth"],
+                                      delim=o["delim"], vals=o["vals"],
+                                      yinc=o["yinc"], yrange=o["yrange"],
+                                      ygrid=o["ygrid"], fillcolor=o["color"],
+                                      fillcolor2=o["color2"], name=o["name"],
+                                      name2=o["name2"], title=o["title"],
+                                      legend=o["legend"], height=o["height"],
+                                      yscale=o["yscale"])
+    if prefab == "pie":
+        return svgelements.Piechart(xorigin=o["xorigin"],
+                                    yorigin=o["yorigin"], radius=o["radius"],
+                                    listvalues=lval, values=o["values"],
+                                    labels=o["labels"],
+                                    colorfld=o["colorfld"],
+                                    legend=o["legend"], animate=o["animate"],
+                                    filtered=o["filtered"], title=o["title"])
+    if prefab == "bardiagram3d":
+        return svgelements.Bardiagram3d(lval=lval, xcolumn=o["x"],
+                                        ycolumn=o["y"],
+                                        barwidth=o["barwidth"],
+                                        xorigin=o["xorigin"],
+                                        yorigin=o["yorigin"],
+                                        delim=o["delim"], vals=o["vals"],
+                                        yinc=o["yinc"], yrange=o["yrange"],
+                                        ygrid=o["ygrid"],
+                                        filtered=o["filtered"],
+                                        fillcolor=o["color"],
+                                        title=o["title"], legend=o["legend"],
+                                        name=o["name"], height=o["height"],
+                                        yscale=o["yscale"])
+    if prefab == "scat":
+        series = getseries(o["series"], o["names"], o["colors"],
+                           [(o["ptsym"], o["ptcolor"], o["name"], "none"),
+                            (o["pt2sym"], o["pt2color"], o["name2"],
+                             "none")])
+        return svgelements.Scatterplot(lval=lval, xorigin=o["xorigin"],
+                                       yorigin=o["yorigin"], xcolumn=o["x"],
+                                       ycolumn=o["y"], xcolumn2=o["x2"],
+                                       ycolumn2=o["y2"], yinc=o["yinc"],
+                                       ptsize=o["ptsize"], ptsym=o["ptsym"],
+                                       pt2sym=o["pt2sym"],
+                                       ptcolor=o["ptcolor"],
+                                       pt2color=o["pt2color"],
+                                       corr=o["corr"], xlabel=o["xlbl"],
+                                       ylabel=o["ylbl"], name=o["name"],
+                                       name2=o["name2"], legend=o["legend"],
+                                       title=o["title"],
+                                       corrband=o["corrband"], series=series,
+                                       density=o["density"], cull=o["cull"],
+                                       width=o["width"], height=o["height"],
+                                       xscale=o["xscale"], yscale=o["yscale"])
+    series = getseries(o["series"], o["names"], o["colors"],
+                       [(o["ptsym"], o["ptcolor"], o["name"], o["color"]),
+                        (o["pt2sym"], o["pt2color"], o["name2"],
+                         o["color2"])])
+    return svgelements.Lineplot(lval=lval, xorigin=o["xorigin"],
+                                yorigin=o["yorigin"], xcolumn=o["x"],
+                                ycolumn=o["y"], xcolumn2=o["x2"],
+                                ycolumn2=o["y2"], yinc=o["yinc"],
+                                ptsize=o["ptsize"], ptsym=o["ptsym"],
+                                pt2sym=o["pt2sym"], ptcolor=o["ptcolor"],
+                                pt2color=o["pt2color"], xlabel=o["xlbl"],
+                                ylabel=o["ylbl"], name=o["name"],
+                                name2=o["name2"], legend=o["legend"],
+                                title=o["title"], fillcolor=o["color"],
+                                fillcolor2=o["color2"],
+                                downsample=o["downsample"],
+                                simplify=o["simplify"], series=series,
+                                width=o["width"], height=o["height"],
+                                xscale=o["xscale"], yscale=o["yscale"])
+
+
+def render(prefab, data, **options):
+    """
+    Returns the SVG document of a chart: the header of
+    C{svgelements.Svgelements} and the code of the chart.
+
+    The input data is a path of a data file, read by
+    C{filetext.readinputfile}, a list of columns or a C{svgdata.Dataset}.
+    A dataset keeps the statistics of its columns, so the charts drawn from
+    the same dataset read each column only once. The precision of the
+    numbers (option C{precision}) is restored when the chart is drawn, and
+    the charts of several threads are drawn one after another.
+
+    @param prefab: is the name of the chart, one of C{PREFABS}
+    @type prefab: C{string}
+    @param data: is the input data
+    @type data: C{string or list or svgdata.Dataset}
+    @param options: are the options of the chart (see C{OPTIONS})
+    @type options: C{dictionary}
+    @return: the SVG document
+    @rtype: C{string}
+    @raise OptionError: If the chart or an option is not valid.
+    @raise InputError: If the input data can not be read or drawn with the
+    options.
+    """
+    if prefab not in PREFABS:
+        raise OptionError("PREFABNAME= [bardiagram | bardiabram3d | pie | "
+                          "scat |lines]")
+    options = getoptions(options)
+    if isinstance(data, str):
+        data = readinputfile(data)
+    lval = getdataset(data)
+    with lock:
+        precision = svgelements.numberprecision
+        try:
+            try:
+                svgelements.setprecision(options["precision"])
+                chart = getchart(prefab, lval, options)
+            except PysvgError:
+                raise
+            except IndexError:
+                raise InputError(COLUMNSERROR)
+            except ArithmeticError as error:
+                raise InputError(str(error))
+            except (TypeError, ValueError) as error:
+                raise OptionError(str(error))
+            try:
+                chartsvg = chart.printsvg()
+            except PysvgError:
+                raise
+            except IndexError:
+                raise InputError(COLUMNSERROR)
+            except (ArithmeticError, ValueError) as error:
+                raise InputError(str(error))
+        finally:
+            svgelements.setprecision(precision)
+        begin, end = svgelements.Svgelements().printsvg()
+    return begin + chartsvg + end
@@ -0,0 +1,439 @@
+# pySVG is vector graphics program for python that converts data
+# entered by a .txt file in an SVG graphic.
+#
+# Copyright (C) 2011 Isabel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+This module contains the downsampling of the series of the line charts. A
+line chart of millions of points is drawn in a few hundreds of pixels, so
+most of its points can not be seen. The series are reduced to a fixed number
+of points that keep its shape before they are written, so the size of the
+SVG document does not depend on the size of the input data.
+
+The downsampling is chosen with a text C{method:size}, as the option
+C{--downsample} of the command line::
+
+    \>>> sampling = getsampling("lttb:500")
+    ... points = downsample(points, sampling)
+
+There are two methods:
+    - B{lttb:N}: the series is reduced to N points that keep its shape
+      (Largest Triangle Three Buckets).
+    - B{minmax:W}: the series is divided in columns of W pixels (1 by
+      default) and the first, the minimum, the maximum and the last point of
+      each column are kept, so no peak of the series is lost.
+
+Besides, the lines can be simplified by C{simplify}, that removes the
+points of the nearly straight stretches of a line that are closer than a
+tolerance to the simplified line, and the markers of a scatter plot can be
+culled by C{cull}, that removes the markers hidden by another marker of the
+same series drawn at the same pixel.
+"""
+__docformat__ = 'epytext en'
+
+
+###############################################################################
+## Imports
+###############################################################################
+
+
+from svgnumeric import isarray, numpy, toarray
+
+
+###############################################################################
+## Constants
+###############################################################################
+
+
+SAMPLINGS = ("lttb", "minmax")
+"""Names of the downsampling methods."""
+
+
+###############################################################################
+## Functions
+###############################################################################
+
+
+def getsampling(text):
+    """
+    Returns the downsampling given by a text C{method:size}, where
+    C{method} is one of C{SAMPLINGS}. The size is the number of points of
+    the reduced series for the method C{lttb}, and the width in pixels of
+    the columns for the method C{minmax}, 1 if it is not given.
+
+    @param text: is the text of the downsampling, or None
+    @type text: C{string}
+    @return: the method and the size, or None if there is no downsampling
+    @rtype: C{(string, number)}
+    @raise ValueError: If the method is unknown or the size is not a number
+    greater than 2 (C{lttb}) or than 0 (C{minmax}).
+    """
+    if text is None or text == "":
+        return None
+    method, separator, size = str(text).partition(":")
+    if method not in SAMPLINGS:
+        raise ValueError("Unknown downsampling method: " + method)
+    if method == "minmax":
+        size = int(size or 1)
+        if size < 1:
+            raise ValueError("The width of the columns must be positive")
+    else:
+        size = int(size)
+        if size < 3:
+            raise ValueError("The downsampling size must be greater than 2")
+    return method, size
+
+
+def downsample(points, sampling):
+    """
+    Returns a series of points reduced with the downsampling returned by
+    C{getsampling}. The points must be sorted by the X component.
+
+    @param points: is the list of points [X,Y] of the series
+    @type points: C{list}
+    @param sampling: is the method and the size of the downsampling, or None
+    @type sampling: C{(string, number)}
+    @return: the points of the reduced series
+    @rtype: C{list}
+    """
+    if sampling is None:
+        return points
+    if sampling[0] == "minmax":
+        return list(envelope(points, sampling[1]))
+    if len(points) <= sampling[1]:
+        return points
+    positions = getpositions([point[0] for point in points],
+                             [point[1] for point in points], sampling)
+    return [points[position] for position in positions]
+
+
+def getpositions(xvalues, yvalues, sampling):
+    """
+    Returns the positions of the points that remain in a series reduced
+    with the downsampling returned by C{getsampling}. The series is given by
+    the lists or the arrays of its components, sorted by the X component.
+
+    @param xvalues: are the X components of the points
+    @type xvalues: C{list or array}
+    @param yvalues: are the Y components of the points
+    @type yvalues: C{list or array}
+    @param sampling: is the method and the size of the downsampling
+    @type sampling: C{(string, number)}
+    @return: the positions of the points of the reduced series
+    @rtype: C{list of number}
+    @raise ValueError: If the method is unknown.
+    """
+    method, size = sampling
+    if method == "lttb":
+        return lttb(xvalues, yvalues, size)
+    if method == "minmax":
+        if isarray(xvalues) and isarray(yvalues):
+            return minmax(xvalues, yvalues, size)
+        return [point[2] for point in
+                envelope(zip(xvalues, yvalues, range(len(xvalues))), size)]
+    raise ValueError("Unknown downsampling method: " + str(method))
+
+
+def lttb(xvalues, yvalues, size):
+    """
+    Returns the positions of C{size} points of a series chosen with the
+    algorithm Largest Triangle Three Buckets. The first and the last points
+    are kept and the rest of the series is divided in C{size - 2} buckets of
+    the same number of points. From each bucket it is chosen the point that
+    forms the largest triangle with the point chosen in the previous bucket
+    and the average point of the next bucket::
+
+        \>>> area = abs((xa - xc) * (y - ya) - (xa - x) * (yc - ya))
+
+    The peaks and valleys of the line are kept even if the series is reduced
+    to a few points. The series is read once, so the time is linear in the
+    number of points. If the components are arrays of the numeric backend
+    the areas of each bucket are computed at once.
+
+    @param xvalues: are the X components of the points, in ascending order
+    @type xvalues: C{list or array}
+    @param yvalues: are the Y components of the points
+    @type yvalues: C{list or array}
+    @param size: is the number of points of the reduced series
+    @type size: C{number}
+    @return: the positions of the points of the reduced series
+    @rtype: C{list of number}
+    """
+    length = len(xvalues)
+    if size >= length or size < 3:
+        return list(range(length))
+    vectorized = isarray(xvalues) and isarray(yvalues)
+    every = float(length - 2) / (size - 2)
+    positions = [0]
+    xa, ya = xvalues[0], yvalues[0]
+    first = 1
+    for bucket in range(size - 2):
+        last = int((bucket + 1) * every) + 1
+        # average point of the next bucket, the last point for the last one
+        nextlast = min(int((bucket + 2) * every) + 1, length)
+        if vectorized:
+            xc = float(xvalues[last:nextlast].mean())
+            yc = float(yvalues[last:nextlast].mean())
+            areas = abs((xa - xc) * (yvalues[first:last] - ya) -
+                        (xa - xvalues[first:last]) * (yc - ya))
+            chosen = first + int(areas.argmax())
+        else:
+            xc = float(sum(xvalues[last:nextlast])) / (nextlast - last)
+            yc = float(sum(yvalues[last:nextlast])) / (nextlast - last)
+            # the point of the bucket with the largest triangle
+            largest = -1.0
+            chosen = first
+            xbase = xa - xc
+            ybase = yc - ya
+            for position in range(first, last):
+                area = abs(xbase * (yvalues[position] - ya) -
+                           (xa - xvalues[position]) * ybase)
+                if area > largest:
+                    largest = area
+                    chosen = position
+        positions.append(chosen)
+        xa, ya = xvalues[chosen], yvalues[chosen]
+        first = last
+    positions.append(length - 1)
+    return positions
+
+
+def envelope(points, width=1):
+    """
+    Generator of the points of a series reduced to its envelope: the series
+    is divided in columns of C{width} pixels of the X component and the
+    first, the minimum, the maximum and the last point of each column are
+    kept, in their order in the series. Unlike C{lttb}, the short peaks of
+    the series are never lost.
+
+    The points are read in a single pass and only the four points of the
+    current column are kept in memory, so C{points} can be any iterator,
+    for instance the points read one by one from a file, and the whole
+    series is never built::
+
+        \>>> for point in envelope(readpoints(datafile)):
+        ...     lpoints.append(point)
+
+    @param points: are the points [X,Y] of the series, sorted by X
+    @type points: C{iterable}
+    @param width: is the width of the columns in pixels
+    @type width: C{number}
+    @return: the points of the reduced series
+    @rtype: C{generator}
+    """
+    bucket = None
+    for position, point in enumerate(points):
+        column = point[0] // width
+        if bucket is not None and column == bucket[0]:
+            if point[1] < bucket[2][1][1]:
+                bucket[2] = (position, point)
+            elif point[1] > bucket[3][1][1]:
+                bucket[3] = (position, point)
+            bucket[4] = (position, point)
+            continue
+        if bucket is not None:
+            for kept in getbucketpoints(bucket):
+                yield kept
+        entry = (position, point)
+        # column, first, minimum, maximum and last point
+        bucket = [column, entry, entry, entry, entry]
+    if bucket is not None:
+        for kept in getbucketpoints(bucket):
+            yield kept
+
+
+def getbucketpoints(bucket):
+    """
+    Returns the points kept from a column of C{envelope}, without repeating
+    the points that are at the same time first, last, minimum or maximum.
+
+    @param bucket: is the column, and the position and the point of its
+    first, minimum, maximum and last point
+    @type bucket: C{list}
+    @return: the points in their order in the series
+    @rtype: C{list}
+    """
+    entries = dict(bucket[1:])
+    return [entries[position] for position in sorted(entries)]
+
+
+def minmax(xvalues, yvalues, width=1):
+    """
+    Returns the positions of the points kept by C{envelope} from a series
+    given by two arrays of the numeric backend. The columns, and the first,
+    the minimum, the maximum and the last point of each one, are found with
+    operations on the whole arrays.
+
+    @param xvalues: are the X components of the points, in ascending order
+    @type xvalues: C{array}
+    @param yvalues: are the Y components of the points
+    @type yvalues: C{array}
+    @param width: is the width of the columns in pixels
+    @type width: C{number}
+    @return: the positions of the points of the reduced series
+    @rtype: C{list of number}
+    """
+    length = min(len(xvalues), len(yvalues))
+    if length == 0:
+        return []
+    columns = xvalues[:length] // width
+    yvalues = yvalues[:length]
+    changes = numpy.concatenate(([True], columns[1:] != columns[:-1]))
+    firsts = numpy.flatnonzero(changes)
+    lasts = numpy.append(firsts[1:], length) - 1
+    buckets = numpy.cumsum(changes) - 1
+    kept = [firsts, lasts]
+    for reduction in (numpy.minimum, numpy.maximum):
+        extremes = reduction.reduceat(yvalues, firsts)
+        candidates = numpy.flatnonzero(yvalues == extremes[buckets])
+        # the first point of each column with the extreme value
+        kept.append(candidates[numpy.unique(buckets[candidates],
+                                            return_index=True)[1]])
+    return numpy.unique(numpy.concatenate(kept)).tolist()
+
+
+def simplify(xvalues, yvalues, epsilon):
+    """
+    Returns the positions of the points that remain in a line simplified by
+    the algorithm of Douglas-Peucker. The first and the last points are
+    kept. The point of the line farthest from the segment that joins them is
+    kept if its distance is greater than C{epsilon}, and then the same is
+    done with the two parts of the line at both sides of that point, until
+    no point is farther than C{epsilon} from the simplified line::
+
+        \>>> distance = abs(dy * (x - x1) - dx * (y - y1)) / sqrt(dx*dx+dy*dy)
+
+    The parts of the line that remain to be simplified are kept in a stack
+    instead of using recursion, so there is no limit to the number of points
+    of the line. If the numeric backend is available the distances of the
+    points of each part are computed at once.
+
+    @param xvalues: are the X components of the points of the line
+    @type xvalues: C{list or array}
+    @param yvalues: are the Y components of the points of the line
+    @type yvalues: C{list or array}
+    @param epsilon: is the tolerance in pixels, 0 to keep all the points
+    @type epsilon: C{number}
+    @return: the positions of the points of the simplified line
+    @rtype: C{list of number}
+    """
+    length = min(len(xvalues), len(yvalues))
+    if epsilon <= 0 or length < 3:
+        return list(range(length))
+    xarray = toarray(xvalues)
+    yarray = toarray(yvalues)
+    vectorized = xarray is not None and yarray is not None
+    tolerance = float(epsilon) * epsilon
+    keep = [False] * length
+    keep[0] = keep[length - 1] = True
+    stack = [(0, length - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        xfirst, yfirst = xvalues[first], yvalues[first]
+        xdelta = xvalues[last] - xfirst
+        ydelta = yvalues[last] - yfirst
+        norm = xdelta * xdelta + ydelta * ydelta
+        if norm:
+            # squared distance to the segment multiplied by its squared length
+            threshold = tolerance * norm
+        else:
+            # squared distance to the point where the segment is collapsed
+            threshold = tolerance
+        if vectorized:
+            xs = xarray[first + 1:last] - xfirst
+            ys = yarray[first + 1:last] - yfirst
+            if norm:
+                distances = ydelta * xs - xdelta * ys
+                distances *= distances
+            else:
+                distances = xs * xs + ys * ys
+            farthest = int(distances.argmax())
+            largest = float(distances[farthest])
+            farthest += first + 1
+        else:
+            largest = -1.0
+            farthest = first
+            for position in range(first + 1, last):
+                xs = xvalues[position] - xfirst
+                ys = yvalues[position] - yfirst
+                if norm:
+                    distance = ydelta * xs - xdelta * ys
+                    distance *= distance
+                else:
+                    distance = xs * xs + ys * ys
+                if distance > largest:
+                    largest = distance
+                    farthest = position
+        if largest > threshold:
+            keep[farthest] = True
+            stack.append((first, farthest))
+            stack.append((farthest, last))
+    return [position for position in range(length) if keep[position]]
+
+
+def cull(xvalues, yvalues):
+    """
+    Returns the positions of the markers of a series that remain visible
+    when the markers are drawn in order at the pixels given by the integer
+    coordinates C{xvalues} and C{yvalues}: the last marker of each pixel,
+    that covers the ones drawn before it, in ascending order. As all the
+    markers of a series have the same shape and colour, drawing only these
+    ones gives the same picture.
+
+    The pixels already drawn are kept in a set, or with the numeric backend
+    in a bitmap of the pixels of the chart that keeps the last position of
+    each one (C{numpy.unique} is used instead if the bitmap would be much
+    larger than the series).
+
+    \>>> cull([10, 12, 10, 10], [5, 5, 5, 6])
+    ... [1, 2, 3]
+
+    @param xvalues: are the X coordinates of the markers
+    @type xvalues: C{list or array of int}
+    @param yvalues: are the Y coordinates of the markers
+    @type yvalues: C{list or array of int}
+    @return: the positions of the visible markers
+    @rtype: C{list or array of int}
+    """
+    length = min(len(xvalues), len(yvalues))
+    if isarray(xvalues) and isarray(yvalues) and length:
+        xvalues = xvalues[:length]
+        yvalues = yvalues[:length]
+        xminimum = int(xvalues.min())
+        yminimum = int(yvalues.min())
+        height = int(yvalues.max()) - yminimum + 1
+        pixels = (int(xvalues.max()) - xminimum + 1) * height
+        if pixels < 2 ** 62:
+            keys = (xvalues - xminimum) * height + (yvalues - yminimum)
+            if pixels <= 4 * length + 2 ** 20:
+                last = numpy.full(pixels, -1, numpy.int64)
+                numpy.maximum.at(last, keys, numpy.arange(length))
+                return numpy.sort(last[last >= 0])
+            # the first of each pixel in the reversed series
+            keys, positions = numpy.unique(keys[::-1], return_index=True)
+            return numpy.sort(length - 1 - positions)
+    seen = set()
+    add = seen.add
+    positions = []
+    for position in range(length - 1, -1, -1):
+        pixel = (xvalues[position], yvalues[position])
+        if pixel not in seen:
+            add(pixel)
+            positions.append(position)
+    positions.reverse()
+    return positions
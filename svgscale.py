@@ -0,0 +1,468 @@
+# pySVG is vector graphics program for python that converts data
+# entered by a .txt file in an SVG graphic.
+#
+# Copyright (C) 2011 Isabel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+This module contains the scales of the axes of the charts: the conversion
+of the values of the input data to pixels and the numbering of the axes.
+
+By default an axis has a pixel for each unit of the data, so a column of
+values around 1e7 would give a chart ten million pixels high. The scale of
+an axis maps the range from zero to the maximum value onto a fixed length
+in pixels, given by the options C{--width} and C{--height} of the command
+line, or C{MAXLENGTH} pixels when the data does not fit in it::
+
+    \>>> scale = Scale(20000000, 500)
+    ... scale.getpixel(10000000), scale.length
+    ... (250, 500)
+
+The numbering of an axis is the list of multiples of the increment chosen by
+the user, unless it has more than C{MAXTICKS} values or the increment is not
+positive. Then the axis is numbered with about C{TICKS} round values, the
+multiples of 1, 2 or 5 times a power of ten (C{getticks}), so the size of
+the document does not depend on the magnitude of the data.
+
+The scales of kind C{log} (options C{--xscale=log} and C{--yscale=log})
+map the decimal logarithm of the values, for data that spans several orders
+of magnitude. The axis starts at the power of ten below the minimum value,
+it has C{DECADE} pixels for each power of ten unless its length is given,
+and it is numbered with the powers of ten (C{getlogticks})::
+
+    \>>> scale = Scale(250000, kind="log", minimum=3)
+    ... scale.length, scale.getpixel(1000), getlogticks(1, 250000)
+    ... (540, 300, [1, 10, 100, 1000, 10000, 100000])
+
+The scales of kind C{time} (option C{--xscale=time}) map the timestamps of
+the x-axis, read once by C{svgtime.totimes}, from the first one to the last
+one onto C{TIMELENGTH} pixels unless the length is given. The axis is
+numbered with round seconds, minutes, hours, days, months or years
+(C{gettimeticks}), computed from the calendar unit and not from the span of
+the data::
+
+    \>>> gettimeticks(0, 3 * 86400)
+    ... ([0, 43200, 86400, ..., 259200], 'minute')
+"""
+__docformat__ = 'epytext en'
+
+
+###############################################################################
+## Imports
+###############################################################################
+
+
+from math import ceil, floor, log10
+from svgnumeric import logarithm, topixels, translate
+from svgstats import tonumber
+from svgtime import DAY, getdate, getdays
+
+
+###############################################################################
+## Constants
+###############################################################################
+
+
+MAXLENGTH = 4096
+"""Maximum length in pixels of an axis whose length is not given."""
+TICKS = 10
+"""Number of values of the numbering of an axis chosen by C{getticks}."""
+MAXTICKS = 50
+"""Maximum number of values of the numbering of an axis with the increment
+chosen by the user."""
+STEPS = (1, 2, 5, 10)
+"""Increments of the numbering of the axes, times a power of ten."""
+KINDS = ("linear", "log", "time")
+"""Names of the kinds of scales."""
+DECADE = 100
+"""Length in pixels of a power of ten of a logarithmic axis whose length is
+not given."""
+TIMELENGTH = 600
+"""Length in pixels of a time axis whose length is not given."""
+TIMESTEPS = ((1, "second"), (2, "second"), (5, "second"), (10, "second"),
+             (15, "second"), (30, "second"), (60, "minute"), (120, "minute"),
+             (300, "minute"), (600, "minute"), (900, "minute"),
+             (1800, "minute"), (3600, "minute"), (7200, "minute"),
+             (10800, "minute"), (21600, "minute"), (43200, "minute"),
+             (DAY, "day"), (2 * DAY, "day"), (7 * DAY, "day"),
+             (14 * DAY, "day"))
+"""Increments in seconds of the numbering of the time axes, with the unit of
+their labels. The weeks start on Monday."""
+MONTHSTEPS = (1, 2, 3, 6)
+"""Increments in months of the numbering of the time axes."""
+MONTH = 30.44 * DAY
+"""Average number of seconds of a month."""
+MONDAY = 4 * DAY
+"""Seconds of the first Monday after 1970-01-01."""
+
+
+###############################################################################
+## Classes
+###############################################################################
+
+
+class Scale:
+    """
+    Conversion of the values of an axis, from zero to the maximum value of
+    the data, to pixels. Without length the scale is the identity, a pixel
+    for each unit, while the maximum value is not greater than
+    C{MAXLENGTH}. The identity returns the values unchanged, so the charts
+    of small values are drawn as they were without scale.
+
+    \>>> Scale(300).getpixel("150"), Scale(300, 600).getpixel("150")
+    ... (150, 300)
+
+    A scale of kind C{log} converts the decimal logarithm of the values,
+    from the power of ten below the minimum value, and a scale of kind
+    C{time} converts the seconds of the timestamps from the minimum value.
+    """
+
+    def __init__(self, maximum, length=None, kind="linear", minimum=None):
+        """
+        @param maximum: is the maximum value of the axis
+        @type maximum: C{number}
+        @param length: is the length of the axis in pixels, or None
+        @type length: C{number}
+        @param kind: is the kind of scale, C{linear}, C{log} or C{time}
+        @type kind: C{string}
+        @param minimum: is the minimum value of the data, used by the
+        scales of kind C{log} and C{time}
+        @type minimum: C{number}
+        @raise ValueError: If the scale is C{log} and the minimum value is
+        not positive.
+        """
+        self.kind = kind
+        """@ivar: is the kind of scale, C{linear}, C{log} or C{time}
+        @type: C{string}"""
+        self.maximum = maximum
+        """@ivar: is the maximum value of the axis, in units of the data
+        @type: C{number}"""
+        self.minimum = 0
+        """@ivar: is the value of the origin of the axis, zero, a power of
+        ten or the first timestamp
+        @type: C{number}"""
+        self.offset = 0
+        """@ivar: is the logarithm of C{minimum} in the scales of kind
+        C{log}
+        @type: C{number}"""
+        self.factor = None
+        """@ivar: is the number of pixels of a unit of the data, or of a
+        power of ten in the scales of kind C{log}, or None if the scale is
+        the identity
+        @type: C{number}"""
+        self.length = maximum
+        """@ivar: is the length of the axis in pixels
+        @type: C{number}"""
+        if kind == "log":
+            if minimum is None or not minimum > 0:
+                raise ValueError("The values of a logarithmic axis must be "
+                                 "positive")
+            self.offset = int(floor(log10(minimum)))
+            self.minimum = getpower(self.offset)
+            span = max(log10(maximum) - self.offset, 1)
+            if length is None:
+                length = min(int(ceil(DECADE * span)), MAXLENGTH)
+            self.factor = length / span
+            self.length = length
+        elif kind == "time":
+            self.minimum = minimum
+            if length is None:
+                length = TIMELENGTH
+            self.factor = 1.0
+            if maximum > minimum:
+                self.factor = length / float(maximum - minimum)
+            self.length = length
+        else:
+            if length is None and maximum > MAXLENGTH:
+                length = MAXLENGTH
+            if length is not None:
+                self.factor = 1.0
+                if maximum > 0:
+                    self.factor = length / float(maximum)
+                    self.length = length
+
+    def map(self, value):
+        """
+        Returns the position in pixels of a value, with its decimals. The
+        identity returns the value unchanged.
+
+        @param value: is the value of the data
+        @type value: C{number or string}
+        @rtype: C{number or string}
+        """
+        if self.factor is None:
+            return value
+        if self.kind == "log":
+            return (log10(float(value)) - self.offset) * self.factor
+        if self.kind == "time":
+            return (value - self.minimum) * float(self.factor)
+        return float(value) * self.factor
+
+    def getpixel(self, value):
+        """
+        Returns the pixel of a value: the integer part of its position, as
+        the function C{svgnumeric.topixels} computes the pixels of the
+        points. The identity returns the value as a number.
+
+        @param value: is the value of the data
+        @type value: C{number or string}
+        @rtype: C{number}
+        @raise ValueError: If the value is not numeric.
+        """
+        if self.factor is None:
+            return tonumber(value)
+        if self.kind != "linear":
+            return int(self.map(value))
+        return int(tonumber(value) * self.factor)
+
+    def getpixels(self, values):
+        """
+        Returns the pixels of a list or an array of values, computed at once
+        by C{svgnumeric.topixels}. The logarithms of the values of the
+        scales of kind C{log} are computed at once by
+        C{svgnumeric.logarithm}, and the timestamps of the scales of kind
+        C{time} are translated to the origin at once.
+
+        @param values: is a list or an array of numbers
+        @type values: C{list or array}
+        @rtype: C{list or array}
+        @raise ValueError: If a value is not finite, or not positive in a
+        scale of kind C{log}.
+        """
+        if self.factor is None:
+            return values
+        if self.kind == "log":
+            values = translate(logarithm(values), -self.offset)
+        elif self.kind == "time":
+            values = translate(values, -self.minimum)
+        return topixels(values, self.factor)
+
+###############################################################################
+
+
+###############################################################################
+## Functions
+###############################################################################
+
+
+def getlength(text):
+    """
+    Returns the length in pixels of an axis given by the options
+    C{--width} and C{--height}, or None if it is not given.
+
+    @param text: is the length, or None
+    @type text: C{string or number}
+    @rtype: C{number}
+    @raise ValueError: If the length is not a positive number.
+    """
+    if text is None:
+        return None
+    length = tonumber(text)
+    if not length > 0:
+        raise ValueError("The length of an axis must be a positive number")
+    return length
+
+
+def getkind(text, time=False):
+    """
+    Returns the kind of scale given by the options C{--xscale} and
+    C{--yscale}: C{linear} if it is not given.
+
+    @param text: is the kind of scale, or None
+    @type text: C{string}
+    @param time: is True if the axis can be a time axis
+    @type time: C{boolean}
+    @rtype: C{string}
+    @raise ValueError: If the kind of scale is unknown, or it is C{time}
+    and the axis can not be a time axis.
+    """
+    if text is None:
+        return "linear"
+    if text not in KINDS:
+        raise ValueError("Unknown scale: " + str(text))
+    if text == "time" and not time:
+        raise ValueError("Only the x-axis of the scatter plots and the line "
+                         "charts can be a time axis")
+    return text
+
+
+def getpower(exponent):
+    """
+    Returns the power of ten of an integer exponent: an integer if the
+    exponent is not negative and a float rounded to its decimals otherwise.
+
+    @param exponent: is the exponent
+    @type exponent: C{number}
+    @rtype: C{number}
+    """
+    if exponent >= 0:
+        return 10 ** exponent
+    return round(10.0 ** exponent, -exponent)
+
+
+def isbounded(start, maximum, step):
+    """
+    Returns True if the numbering of an axis with the increment C{step},
+    from C{start} to C{maximum}, has C{MAXTICKS} values at most.
+
+    @param start: is the first value of the numbering
+    @type start: C{number}
+    @param maximum: is the maximum value of the axis
+    @type maximum: C{number}
+    @param step: is the increment chosen by the user
+    @type step: C{number}
+    @rtype: C{boolean}
+    """
+    return step > 0 and maximum - start < step * MAXTICKS
+
+
+def getstep(span, count=TICKS):
+    """
+    Returns the increment of the numbering of an axis of length C{span} in
+    units of the data with about C{count} values: the smallest value of
+    C{STEPS} times a power of ten that is not smaller than C{span / count}.
+
+    \>>> getstep(20000000), getstep(3)
+    ... (2000000, 0.5)
+
+    @param span: is the length of the axis in units of the data
+    @type span: C{number}
+    @param count: is the number of values of the numbering
+    @type count: C{number}
+    @return: the increment, an integer if it is not smaller than 1
+    @rtype: C{number}
+    """
+    if not span > 0:
+        return 1
+    rough = span / float(count)
+    exponent = int(floor(log10(rough)))
+    for step in STEPS:
+        if step * 10.0 ** exponent >= rough:
+            break
+    if exponent >= 0:
+        return step * 10 ** exponent
+    return round(step * 10.0 ** exponent, -exponent)
+
+
+def getticks(minimum, maximum, count=TICKS):
+    """
+    Returns the numbering of an axis from C{minimum} to C{maximum}: the
+    multiples of the increment given by C{getstep} between both values.
+    There are C{2 * count + 1} values at most, whatever the magnitude of the
+    data.
+
+    \>>> getticks(0, 45), getticks(0, 1.2)
+    ... ([0, 5, 10, 15, 20, 25, 30, 35, 40, 45], [0, 0.2, 0.4, 0.6, 0.8, 1])
+
+    @param minimum: is the minimum value of the axis
+    @type minimum: C{number}
+    @param maximum: is the maximum value of the axis
+    @type maximum: C{number}
+    @param count: is the number of values of the numbering
+    @type count: C{number}
+    @rtype: C{list of number}
+    """
+    minimum = tonumber(minimum)
+    maximum = tonumber(maximum)
+    if maximum < minimum:
+        return []
+    step = getstep(maximum - minimum, count)
+    first = int(ceil(minimum / float(step) - 1e-9))
+    last = int(floor(maximum / float(step) + 1e-9))
+    if isinstance(step, int):
+        return [step * cont for cont in range(first, last + 1)]
+    decimals = int(ceil(-log10(step) - 1e-9)) + 1
+    ticks = [round(step * cont, decimals) for cont in range(first, last + 1)]
+    return [int(tick) if tick.is_integer() else tick for tick in ticks]
+
+
+def getlogticks(minimum, maximum, count=TICKS):
+    """
+    Returns the numbering of a logarithmic axis from C{minimum} to
+    C{maximum}: the powers of ten between both values, computed from their
+    exponents. If there are more than C{count} powers only one of every few
+    ones is kept, and if there is only one power the multiples 2 and 5 of
+    the powers are added.
+
+    \>>> getlogticks(1, 250000), getlogticks(10, 60)
+    ... ([1, 10, 100, 1000, 10000, 100000], [10, 20, 50])
+
+    @param minimum: is the minimum value of the axis, a power of ten
+    @type minimum: C{number}
+    @param maximum: is the maximum value of the axis
+    @type maximum: C{number}
+    @param count: is the maximum number of powers of ten
+    @type count: C{number}
+    @rtype: C{list of number}
+    """
+    first = int(ceil(log10(minimum) - 1e-9))
+    last = int(floor(log10(maximum) + 1e-9))
+    if last <= first:
+        return [getpower(first) * step for step in STEPS[:3]
+                if getpower(first) * step <= maximum]
+    step = int(ceil((last - first + 1) / float(count)))
+    return [getpower(exponent) for exponent in range(first, last + 1, step)]
+
+
+def gettimeticks(minimum, maximum, count=TICKS):
+    """
+    Returns the numbering of a time axis from C{minimum} to C{maximum}
+    seconds: the multiples of the smallest increment of C{TIMESTEPS},
+    C{MONTHSTEPS} or years that gives C{count} values at most, aligned with
+    the calendar in UTC. The values are computed from the first and the last
+    ones, so the cost does not depend on the span of the data.
+
+    \>>> gettimeticks(1321488000, 1329264000)
+    ... ([1322697600, 1325376000, 1328054400], 'month')
+
+    @param minimum: is the first timestamp of the axis, in seconds
+    @type minimum: C{number}
+    @param maximum: is the last timestamp of the axis, in seconds
+    @type maximum: C{number}
+    @param count: is the maximum number of values of the numbering
+    @type count: C{number}
+    @return: the seconds of the values and the unit of their labels, for
+    C{svgtime.formattime}
+    @rtype: C{(list of number, string)}
+    """
+    if maximum < minimum:
+        return [], "second"
+    rough = (maximum - minimum) / float(count)
+    for step, unit in TIMESTEPS:
+        if step >= rough:
+            origin = MONDAY if step >= 7 * DAY else 0
+            first = int(ceil((minimum - origin) / float(step)))
+            last = int(floor((maximum - origin) / float(step)))
+            return [origin + step * cont
+                    for cont in range(first, last + 1)], unit
+    year, month, day = getdate(int(floor(minimum / float(DAY))))
+    index = year * 12 + month - 1
+    if getdays(year, month, 1) * DAY < minimum:
+        index += 1
+    for step in MONTHSTEPS:
+        if step * MONTH >= rough:
+            unit = "month"
+            break
+    else:
+        step = 12 * max(int(getstep(rough / (12 * MONTH), 1)), 1)
+        unit = "year"
+    index = int(ceil(index / float(step))) * step
+    ticks = []
+    while True:
+        tick = getdays(index // 12, index % 12 + 1, 1) * DAY
+        if tick > maximum:
+            return ticks, unit
+        ticks.append(tick)
+        index += step
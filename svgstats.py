@@ -0,0 +1,602 @@
+# pySVG is vector graphics program for python that converts data
+# entered by a .txt file in an SVG graphic.
+#
+# Copyright (C) 2011 Isabel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+This module contains the statistics needed by the charts: count, averages,
+variances and covariance of a series of points, computed in a single pass
+over the input data.
+
+The values are accumulated with the method of Welford, which updates the
+average and the sums of squared deviations with each new point instead of
+adding the squares of the values, so the result does not lose precision
+when the values are large or close to each other::
+
+    \>>> n = n + 1
+    ... deltax = x - averagex
+    ... averagex = averagex + deltax / n
+    ... averagey = averagey + (y - averagey) / n
+    ... sumsquaresx = sumsquaresx + deltax * (x - averagex)
+    ... sumproducts = sumproducts + deltax * (y - averagey)
+"""
+__docformat__ = 'epytext en'
+
+
+###############################################################################
+## Imports
+###############################################################################
+
+
+from math import isfinite, sqrt
+from svgnumeric import isarray, isintegral, toarray, getmoments
+from svgtime import totimes
+
+
+###############################################################################
+## Constants
+###############################################################################
+
+
+TSTUDENT = (12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262,
+            2.228, 2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101,
+            2.093, 2.086, 2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052,
+            2.048, 2.045, 2.042)
+"""Two-sided 95% quantiles of the Student's t distribution from 1 to 30
+degrees of freedom. For more degrees of freedom the normal quantile 1.96 is
+used."""
+
+
+###############################################################################
+## Classes
+###############################################################################
+
+
+class Statistics:
+    """
+    Accumulator of the statistics of a series of points (X,Y): number of
+    points, averages, variances and covariance. The points can be added one
+    by one with the method C{add} or all at once when the object is created.
+
+    \>>> statistics = Statistics(["1", "2", "3"], ["2", "4", "7"])
+    ... statistics.getaverage()
+    ... (2.0, 4.333333333333333)
+    ... statistics.getcovariance()
+    ... 1.6666666666666667
+    """
+
+    def __init__(self, xvalues=None, yvalues=None):
+        """
+        @param xvalues: values of the X component of the points
+        @type xvalues: C{list of number or string}
+        @param yvalues: values of the Y component of the points. If it is
+        not specified the Y component is equal to the X component, to get the
+        statistics of a single list of values.
+        @type yvalues: C{list of number or string}
+        """
+        self.count = 0
+        """@ivar: is the number of points accumulated
+        @type: C{number}"""
+        self.averagex = 0.0
+        """@ivar: is the average of the X component
+        @type: C{float}"""
+        self.averagey = 0.0
+        """@ivar: is the average of the Y component
+        @type: C{float}"""
+        self.sumsquaresx = 0.0
+        """@ivar: is the sum of the squared deviations of the X component
+        from its average
+        @type: C{float}"""
+        self.sumsquaresy = 0.0
+        """@ivar: is the sum of the squared deviations of the Y component
+        from its average
+        @type: C{float}"""
+        self.sumproducts = 0.0
+        """@ivar: is the sum of the products of the deviations of both
+        components from their averages
+        @type: C{float}"""
+        if xvalues is not None:
+            if yvalues is None:
+                yvalues = xvalues
+            self.extend(xvalues, yvalues)
+
+    def add(self, xvalue, yvalue=None):
+        """
+        Adds a point to the statistics.
+
+        @param xvalue: is the X component of the point
+        @type xvalue: C{number or string}
+        @param yvalue: is the Y component of the point, by default equal to
+        the X component
+        @type yvalue: C{number or string}
+        """
+        xvalue = float(xvalue)
+        if yvalue is None:
+            yvalue = xvalue
+        else:
+            yvalue = float(yvalue)
+        self.count += 1
+        deltax = xvalue - self.averagex
+        deltay = yvalue - self.averagey
+        self.averagex += deltax / self.count
+        self.averagey += deltay / self.count
+        self.sumsquaresx += deltax * (xvalue - self.averagex)
+        self.sumsquaresy += deltay * (yvalue - self.averagey)
+        self.sumproducts += deltax * (yvalue - self.averagey)
+
+    def extend(self, xvalues, yvalues):
+        """
+        Adds a list of points to the statistics in a single pass. This is the
+        same as calling C{add} for each point, with the accumulators kept in
+        local variables.
+
+        If both components are arrays of the numeric backend the statistics
+        of the new points are computed at once by C{svgnumeric.getmoments}
+        and then combined with the accumulated ones. The floats are added in
+        another order, so the results may differ in the last digits.
+
+        @param xvalues: values of the X component of the points
+        @type xvalues: C{list of number or string}
+        @param yvalues: values of the Y component of the points
+        @type yvalues: C{list of number or string}
+        """
+        if isarray(xvalues) and isarray(yvalues):
+            count = min(len(xvalues), len(yvalues))
+            self.combine(*getmoments(xvalues[:count], yvalues[:count]))
+            return
+        count = self.count
+        averagex = self.averagex
+        averagey = self.averagey
+        sumsquaresx = self.sumsquaresx
+        sumsquaresy = self.sumsquaresy
+        sumproducts = self.sumproducts
+        for xvalue, yvalue in zip(xvalues, yvalues):
+            xvalue = float(xvalue)
+            yvalue = float(yvalue)
+            count += 1
+            deltax = xvalue - averagex
+            deltay = yvalue - averagey
+            averagex += deltax / count
+            averagey += deltay / count
+            sumsquaresx += deltax * (xvalue - averagex)
+            deltay2 = yvalue - averagey
+            sumsquaresy += deltay * deltay2
+            sumproducts += deltax * deltay2
+        self.count = count
+        self.averagex = averagex
+        self.averagey = averagey
+        self.sumsquaresx = sumsquaresx
+        self.sumsquaresy = sumsquaresy
+        self.sumproducts = sumproducts
+
+    def combine(self, count, averagex, averagey, sumsquaresx, sumsquaresy,
+                sumproducts):
+        """
+        Adds to the statistics the points of other statistics, given by
+        their accumulators. The averages and sums of the union are obtained
+        from the difference between the averages of both parts:
+
+            - B{Sxx = Sxx1 + Sxx2 + (x2-x1)*(x2-x1)*n1*n2/n}
+
+        @param count: is the number of new points
+        @type count: C{number}
+        @param averagex: is the average of the X component of the new points
+        @type averagex: C{float}
+        @param averagey: is the average of the Y component of the new points
+        @type averagey: C{float}
+        @param sumsquaresx: is the sum of the squared deviations of the X
+        component of the new points
+        @type sumsquaresx: C{float}
+        @param sumsquaresy: is the sum of the squared deviations of the Y
+        component of the new points
+        @type sumsquaresy: C{float}
+        @param sumproducts: is the sum of the products of the deviations of
+        the new points
+        @type sumproducts: C{float}
+        """
+        if count == 0:
+            return
+        if self.count == 0:
+            self.count = count
+            self.averagex = averagex
+            self.averagey = averagey
+            self.sumsquaresx = sumsquaresx
+            self.sumsquaresy = sumsquaresy
+            self.sumproducts = sumproducts
+            return
+        total = self.count + count
+        weight = float(self.count) * count / total
+        deltax = averagex - self.averagex
+        deltay = averagey - self.averagey
+        self.averagex += deltax * count / total
+        self.averagey += deltay * count / total
+        self.sumsquaresx += sumsquaresx + deltax * deltax * weight
+        self.sumsquaresy += sumsquaresy + deltay * deltay * weight
+        self.sumproducts += sumproducts + deltax * deltay * weight
+        self.count = total
+
+    def getaverage(self):
+        """
+        Returns the averages of both components.
+
+        @return: average of X and average of Y
+        @rtype: C{float,float}
+        @raise ZeroDivisionError: If there are no points.
+        """
+        if self.count == 0:
+            raise ZeroDivisionError("There are no points")
+        return self.averagex, self.averagey
+
+    def getvariance(self):
+        """
+        Returns the variances of both components:
+
+            - B{Var(X)= S{sum}((xi-S{Delta}x)*(xi-S{Delta}x))/n}
+
+        @return: variance of X and variance of Y
+        @rtype: C{float,float}
+        @raise ZeroDivisionError: If there are no points.
+        """
+        return self.sumsquaresx / self.count, self.sumsquaresy / self.count
+
+    def getcovariance(self):
+        """
+        Returns the covariance of the two components:
+
+            - B{Cov(X,Y)= S{sum}((xi-S{Delta}x)*(yi-S{Delta}y))/n}
+
+        @return: covariance of X and Y
+        @rtype: C{float}
+        @raise ZeroDivisionError: If there are no points.
+        """
+        return self.sumproducts / self.count
+
+    def getslope(self):
+        """
+        Returns the slope of the regression line of Y on X,
+        B{b=(S{sigma}xy/(S{sigma}x*S{sigma}x))}. If all the values of X are
+        equal the slope is 0, the line is horizontal at the average of Y.
+
+        @return: slope of the regression line
+        @rtype: C{float}
+        """
+        if self.sumsquaresx == 0:
+            return 0.0
+        return self.sumproducts / self.sumsquaresx
+
+    def getintercept(self):
+        """
+        Returns the intercept point of the regression line of Y on X,
+        B{a=S{Delta}y-b*S{Delta}x}.
+
+        @return: value of the regression line at x = 0
+        @rtype: C{float}
+        """
+        return self.averagey - self.getslope() * self.averagex
+
+    def getresidualvariance(self):
+        """
+        Returns the variance of the points around the regression line of Y
+        on X, with n - 2 degrees of freedom:
+
+            - B{s*s = (Syy - Sxy*Sxy/Sxx)/(n-2)}
+
+        @return: residual variance, or 0 if there are less than three points
+        @rtype: C{float}
+        """
+        if self.count < 3:
+            return 0.0
+        sumsquares = self.sumsquaresy
+        if self.sumsquaresx != 0:
+            sumsquares -= self.sumproducts * self.sumproducts / \
+                          self.sumsquaresx
+        return max(sumsquares, 0.0) / (self.count - 2)
+
+    def getconfidence(self, xvalue):
+        """
+        Returns the half width of the 95% confidence interval of the
+        regression line at C{xvalue}, the band that contains the true line
+        with a probability of 95%:
+
+            - B{t*s*sqrt(1/n + (x-S{Delta}x)*(x-S{Delta}x)/Sxx)}
+
+        @param xvalue: is the X value where the interval is computed
+        @type xvalue: C{number}
+        @return: half width of the interval, 0 if there are less than three
+        points
+        @rtype: C{float}
+        """
+        if self.count < 3:
+            return 0.0
+        degrees = self.count - 2
+        if degrees <= len(TSTUDENT):
+            quantile = TSTUDENT[degrees - 1]
+        else:
+            quantile = 1.96
+        spread = 1.0 / self.count
+        if self.sumsquaresx != 0:
+            deviation = float(xvalue) - self.averagex
+            spread += deviation * deviation / self.sumsquaresx
+        return quantile * sqrt(self.getresidualvariance() * spread)
+
+
+###############################################################################
+
+
+class Columnstats:
+    """
+    Summary of a column of input data: number of values, minimum, maximum,
+    sum, average, variance and whether the values are sorted. Each summary is
+    computed the first time it is requested and kept in the object, so the
+    column is read only once whatever the number of charts or functions that
+    need it.
+
+    The values read from the input file are strings. They are converted to
+    integers, or to floats if they have decimals, by C{getnumbers}. If the
+    numeric backend is available they are also kept as an array by
+    C{getarray} and the summaries are computed with the array.
+
+    \>>> statistics = Columnstats(["3", "1", "2.5"])
+    ... statistics.getmaximum()
+    ... 3
+    ... statistics.getsum()
+    ... 6.5
+    """
+
+    def __init__(self, column):
+        """
+        @param column: is the list of values of the column
+        @type column: C{list of number or string}
+        """
+        self.column = column
+        """@ivar: is the list of values of the column
+        @type: C{list}"""
+        self.numbers = None
+        """@ivar: are the values of the column converted to numbers, or None
+        if they have not been converted yet
+        @type: C{list of number}"""
+        self.array = None
+        """@ivar: are the values of the column as an array of the numeric
+        backend, False if the backend can not hold them, or None if they have
+        not been converted yet
+        @type: C{array}"""
+        self.minimum = None
+        """@ivar: is the minimum value of the column, or None if it has not
+        been computed yet
+        @type: C{number}"""
+        self.maximum = None
+        """@ivar: is the maximum value of the column, or None if it has not
+        been computed yet
+        @type: C{number}"""
+        self.total = None
+        """@ivar: is the sum of the values of the column, or None if it has
+        not been computed yet
+        @type: C{number}"""
+        self.statistics = None
+        """@ivar: are the average and the variance of the column, or None if
+        they have not been computed yet
+        @type: C{Statistics}"""
+        self.ordered = None
+        """@ivar: is True if the values are in ascending order, or None if it
+        has not been checked yet
+        @type: C{boolean}"""
+        self.times = None
+        """@ivar: are the statistics of the timestamps of the column, or None
+        if they have not been read yet
+        @type: C{Columnstats}"""
+
+    def getnumbers(self):
+        """
+        Returns the values of the column converted to numbers.
+
+        @return: values of the column
+        @rtype: C{list of number}
+        @raise ValueError: If a value is not numeric.
+        """
+        if self.numbers is None:
+            values = self.getarray()
+            if isintegral(values):
+                self.numbers = values.tolist()
+            else:
+                self.numbers = [tonumber(value) for value in self.column]
+        return self.numbers
+
+    def getarray(self):
+        """
+        Returns the values of the column as an array of the numeric backend
+        C{svgnumeric}. The array is shared by all the charts of the data, so
+        it is read-only: the transformations of the values return new
+        arrays.
+
+        @return: array of the values, or False if there is no backend
+        @rtype: C{array}
+        @raise ValueError: If a value is not numeric.
+        """
+        if self.array is None:
+            self.array = toarray(self.column)
+            if self.array is None:
+                self.array = False
+            else:
+                self.array.flags.writeable = False
+        return self.array
+
+    def gettimes(self):
+        """
+        Returns the statistics of the values of the column read as
+        timestamps by C{svgtime.totimes}: seconds from 1970-01-01 UTC. The
+        timestamps are read once and shared by all the charts of the data.
+
+        @rtype: C{Columnstats}
+        @raise ValueError: If a value is not a timestamp.
+        """
+        if self.times is None:
+            times = totimes(self.column)
+            self.times = Columnstats(times)
+            if isarray(times):
+                times.flags.writeable = False
+                self.times.array = times
+        return self.times
+
+    def getcount(self):
+        """
+        Returns the number of values of the column.
+
+        @rtype: C{number}
+        """
+        return len(self.column)
+
+    def getminimum(self):
+        """
+        Returns the minimum value of the column.
+
+        @rtype: C{number}
+        @raise IndexError: If the column is empty.
+        """
+        if self.minimum is None:
+            values = self.getarray()
+            if values is not False:
+                if not len(values):
+                    raise IndexError("The column is empty")
+                self.minimum = self.getvalue(values.argmin())
+            else:
+                numbers = self.getnumbers()
+                if not numbers:
+                    raise IndexError("The column is empty")
+                self.minimum = min(numbers)
+        return self.minimum
+
+    def getmaximum(self):
+        """
+        Returns the maximum value of the column.
+
+        @rtype: C{number}
+        @raise IndexError: If the column is empty.
+        """
+        if self.maximum is None:
+            values = self.getarray()
+            if values is not False:
+                if not len(values):
+                    raise IndexError("The column is empty")
+                self.maximum = self.getvalue(values.argmax())
+            else:
+                numbers = self.getnumbers()
+                if not numbers:
+                    raise IndexError("The column is empty")
+                self.maximum = max(numbers)
+        return self.maximum
+
+    def getvalue(self, position):
+        """
+        Returns a value of the column converted to a number, the same number
+        that is in the list returned by C{getnumbers}.
+
+        @param position: is the position of the value in the column
+        @type position: C{number}
+        @rtype: C{number}
+        """
+        if self.numbers is not None:
+            return self.numbers[position]
+        return tonumber(self.column[position])
+
+    def getsum(self):
+        """
+        Returns the sum of the values of the column.
+
+        @rtype: C{number}
+        """
+        if self.total is None:
+            values = self.getarray()
+            if isintegral(values) and len(values) and \
+                    int(abs(values).max()) * len(values) < 2 ** 63:
+                self.total = int(values.sum())
+            else:
+                self.total = sum(self.getnumbers())
+        return self.total
+
+    def getmean(self):
+        """
+        Returns the average of the values of the column.
+
+        @rtype: C{float}
+        @raise ZeroDivisionError: If the column is empty.
+        """
+        if self.statistics is None:
+            values = self.getarray()
+            if values is False:
+                values = self.getnumbers()
+            self.statistics = Statistics(values)
+        return self.statistics.getaverage()[0]
+
+    def getvariance(self):
+        """
+        Returns the variance of the values of the column.
+
+        @rtype: C{float}
+        @raise ZeroDivisionError: If the column is empty.
+        """
+        if self.statistics is None:
+            values = self.getarray()
+            if values is False:
+                values = self.getnumbers()
+            self.statistics = Statistics(values)
+        return self.statistics.getvariance()[0]
+
+    def issorted(self):
+        """
+        Returns True if the values of the column are in ascending order.
+
+        @rtype: C{boolean}
+        """
+        if self.ordered is None:
+            values = self.getarray()
+            if values is not False:
+                self.ordered = bool((values[1:] >= values[:-1]).all())
+                return self.ordered
+            numbers = self.getnumbers()
+            self.ordered = True
+            for cont in range(1, len(numbers)):
+                if numbers[cont] < numbers[cont - 1]:
+                    self.ordered = False
+                    break
+        return self.ordered
+
+
+###############################################################################
+## Functions
+###############################################################################
+
+
+def tonumber(value):
+    """
+    Returns a value of the input data as a number: an integer if it has no
+    decimals or a float otherwise. Numbers are returned unchanged. The
+    infinite values and the values that are not a number (C{inf}, C{nan}
+    or C{1e999}) can not be drawn, so they are not numeric.
+
+    @param value: is the value to convert
+    @type value: C{number or string}
+    @return: the value as a number
+    @rtype: C{number}
+    @raise ValueError: If the value is not numeric or not finite.
+    """
+    if not isinstance(value, (int, float)):
+        try:
+            return int(value)
+        except ValueError:
+            value = float(value)
+    if isinstance(value, float) and not isfinite(value):
+        raise ValueError("The value is not finite: " + str(value))
+    return value
@@ -0,0 +1,274 @@
+# pySVG is vector graphics program for python that converts data
+# entered by a .txt file in an SVG graphic.
+#
+# Copyright (C) 2011 Isabel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+This module contains the timestamps of the time axes: the conversion of a
+column of input data to seconds from 1970-01-01 UTC and the calendar
+computations used to number the axes.
+
+A column of timestamps has numbers of seconds (epoch values) or dates and
+times in the ISO-8601 format, without spaces::
+
+    2011-11-17
+    2011-11-17T09:30
+    2011-11-17T09:30:15
+    2011-11-17T09:30:15.250+01:00
+
+The times without zone are taken as UTC. If the numeric backend is
+installed and all the timestamps of a column have the same fixed format
+(without decimals or zone), the digits of all of them are read at once from
+an array of bytes; otherwise each timestamp is read by C{parsetime}, with
+the days of each date computed once::
+
+    \>>> tolist(totimes(("2011-11-17T09:30", "1970-01-02T00:00")))
+    ... [1321522200, 86400]
+"""
+__docformat__ = 'epytext en'
+
+
+###############################################################################
+## Imports
+###############################################################################
+
+
+import svgnumeric
+from svgnumeric import numpy, toarray
+
+
+###############################################################################
+## Constants
+###############################################################################
+
+
+FORMATS = {10: "YYYY-MM-DD", 16: "YYYY-MM-DDTHH:MM",
+           19: "YYYY-MM-DDTHH:MM:SS"}
+"""Fixed formats of the timestamps read at once, by length."""
+DAY = 86400
+"""Number of seconds of a day."""
+
+
+###############################################################################
+## Functions
+###############################################################################
+
+
+def getdays(year, month, day):
+    """
+    Returns the number of days from 1970-01-01 to a date of the proleptic
+    Gregorian calendar. It only uses integer operations, so it gives the
+    same result for numbers and for arrays of numbers.
+
+    \>>> getdays(2011, 11, 17)
+    ... 15295
+
+    @param year: is the year
+    @type year: C{number or array}
+    @param month: is the month, from 1 to 12
+    @type month: C{number or array}
+    @param day: is the day of the month
+    @type day: C{number or array}
+    @rtype: C{number or array}
+    """
+    year = year - (month <= 2)
+    era = year // 400
+    yearofera = year - era * 400
+    dayofyear = (153 * ((month + 9) % 12) + 2) // 5 + day - 1
+    dayofera = yearofera * 365 + yearofera // 4 - yearofera // 100 + \
+               dayofyear
+    return era * 146097 + dayofera - 719468
+
+
+def getdate(days):
+    """
+    Returns the date of a number of days from 1970-01-01, the inverse of
+    C{getdays}.
+
+    @param days: is the number of days
+    @type days: C{number}
+    @return: the year, the month and the day of the month
+    @rtype: C{(number, number, number)}
+    """
+    days = days + 719468
+    era = days // 146097
+    dayofera = days - era * 146097
+    yearofera = (dayofera - dayofera // 1460 + dayofera // 36524 -
+                 dayofera // 146096) // 365
+    dayofyear = dayofera - (365 * yearofera + yearofera // 4 -
+                            yearofera // 100)
+    monthindex = (5 * dayofyear + 2) // 153
+    day = dayofyear - (153 * monthindex + 2) // 5 + 1
+    month = monthindex + 3 if monthindex < 10 else monthindex - 9
+    return yearofera + era * 400 + (month <= 2), month, day
+
+
+def parsetime(text, dates=None):
+    """
+    Returns the seconds from 1970-01-01 UTC of a timestamp: an epoch value
+    or an ISO-8601 date with optional time, decimals of the seconds and zone
+    (C{Z} or C{+HH:MM}). The seconds are an integer unless the timestamp has
+    decimals.
+
+    @param text: is the timestamp
+    @type text: C{string or number}
+    @param dates: is a dictionary that keeps the days of the dates already
+    read, or None
+    @type dates: C{dictionary}
+    @rtype: C{number}
+    @raise ValueError: If the text is not a timestamp.
+    """
+    if isinstance(text, (int, float)):
+        return text
+    if len(text) < 10 or text[4] != "-" or text[7] != "-":
+        try:
+            return int(text)
+        except ValueError:
+            return float(text)
+    date = text[:10]
+    days = None if dates is None else dates.get(date)
+    if days is None:
+        year, month, day = int(date[:4]), int(date[5:7]), int(date[8:10])
+        if not (1 <= month <= 12 and 1 <= day <= 31) or \
+                not date[:4].isdigit():
+            raise ValueError("Invalid timestamp: " + text)
+        days = getdays(year, month, day)
+        if dates is not None:
+            dates[date] = days
+    seconds = days * DAY
+    rest = text[10:]
+    if rest.endswith("Z"):
+        rest = rest[:-1]
+    elif len(rest) >= 6 and rest[-6] in "+-" and rest[-3] == ":":
+        zone = int(rest[-5:-3]) * 3600 + int(rest[-2:]) * 60
+        seconds -= zone if rest[-6] == "+" else -zone
+        rest = rest[:-6]
+    if rest == "":
+        return seconds
+    if rest[0] != "T" or len(rest) < 6 or rest[3] != ":":
+        raise ValueError("Invalid timestamp: " + text)
+    hours, minutes = int(rest[1:3]), int(rest[4:6])
+    seconds += hours * 3600 + minutes * 60
+    if len(rest) > 6:
+        if rest[6] != ":":
+            raise ValueError("Invalid timestamp: " + text)
+        if len(rest) > 9:
+            return seconds + float(rest[7:])
+        seconds += int(rest[7:9])
+    return seconds
+
+
+def totimes(column):
+    """
+    Returns the seconds from 1970-01-01 UTC of all the timestamps of a
+    column: an array of the numeric backend, or a list of numbers without
+    backend. The columns of epoch values are converted as the other
+    numeric columns.
+
+    @param column: are the timestamps
+    @type column: C{tuple or Columnview}
+    @rtype: C{list or array}
+    @raise ValueError: If a value is not a timestamp.
+    """
+    if not len(column) or not isinstance(column[0], str) or \
+            len(column[0]) < 10 or column[0][4] != "-":
+        values = toarray(column)
+        if values is None:
+            values = [parsetime(value) for value in column]
+        return values
+    if svgnumeric.backend is not None:
+        times = toarraytimes(column)
+        if times is not None:
+            return times
+    dates = {}
+    times = [parsetime(value, dates) for value in column]
+    if svgnumeric.backend is not None:
+        return toarray(times)
+    return times
+
+
+def toarraytimes(column):
+    """
+    Returns the seconds of a column of timestamps of the same fixed format
+    of C{FORMATS}, read at once from an array of bytes of the numeric
+    backend, or None if the timestamps do not have the same format.
+
+    @param column: are the timestamps
+    @type column: C{tuple or Columnview}
+    @rtype: C{array}
+    @raise ValueError: If a date or a time is out of range.
+    """
+    length = len(column[0])
+    pattern = FORMATS.get(length)
+    if pattern is None:
+        return None
+    try:
+        data = numpy.array(column, dtype="S" + str(length))
+    except UnicodeEncodeError:
+        return None
+    characters = data.view(numpy.uint8).reshape(len(column), length)
+    # the shorter timestamps are padded with zeros
+    if bool((characters[:, -1] == 0).any()):
+        return None
+    isdigit = numpy.array([letter in "YMDHS" for letter in pattern])
+    digits = characters[:, isdigit].astype(numpy.int64) - 48
+    if bool(((digits < 0) | (digits > 9)).any()):
+        return None
+    for position, letter in enumerate(pattern):
+        if letter not in "YMDHS" and \
+                not bool((characters[:, position] == ord(letter)).all()):
+            return None
+    year = digits[:, 0] * 1000 + digits[:, 1] * 100 + digits[:, 2] * 10 + \
+           digits[:, 3]
+    month = digits[:, 4] * 10 + digits[:, 5]
+    day = digits[:, 6] * 10 + digits[:, 7]
+    if not bool(((month >= 1) & (month <= 12) & (day >= 1) &
+                 (day <= 31)).all()):
+        raise ValueError("Invalid timestamp in the column")
+    times = getdays(year, month, day) * DAY
+    for position, factor in ((8, 36000), (9, 3600), (10, 600), (11, 60),
+                             (12, 10), (13, 1)):
+        if position < digits.shape[1]:
+            times += digits[:, position] * factor
+    return times
+
+
+def formattime(seconds, unit):
+    """
+    Returns the text of a timestamp written on a time axis, with the
+    precision of the unit of its numbering: C{year} (2011), C{month}
+    (2011-11), C{day} (2011-11-17), C{minute} (11-17 09:30) or C{second}
+    (09:30:15).
+
+    @param seconds: are the seconds from 1970-01-01 UTC
+    @type seconds: C{number}
+    @param unit: is the unit of the numbering
+    @type unit: C{string}
+    @rtype: C{string}
+    """
+    days = int(seconds // DAY)
+    year, month, day = getdate(days)
+    if unit == "year":
+        return "%04d" % year
+    if unit == "month":
+        return "%04d-%02d" % (year, month)
+    if unit == "day":
+        return "%04d-%02d-%02d" % (year, month, day)
+    rest = int(seconds - days * DAY)
+    if unit == "minute":
+        return "%02d-%02d %02d:%02d" % (month, day, rest // 3600,
+                                        rest // 60 % 60)
+    return "%02d:%02d:%02d" % (rest // 3600, rest // 60 % 60, rest % 60)